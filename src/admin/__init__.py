@@ -7,6 +7,9 @@ from .analytics import (
 from .analytics import (
     LeaderBoardAdmin as LeaderBoardAdmin,
 )
+from .analytics import (
+    LeaderBoardArchiveAdmin as LeaderBoardArchiveAdmin,
+)
 from .app_settings import AppSettingsAdmin as AppSettingsAdmin
 from .attempt_answer import (
     UserAnswerInline as UserAnswerInline,
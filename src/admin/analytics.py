@@ -1,6 +1,11 @@
 from django.contrib import admin
 
-from src.models.analytics import Contribution, DailyActivity, LeaderBoard
+from src.models.analytics import (
+    Contribution,
+    DailyActivity,
+    LeaderBoard,
+    LeaderBoardArchive,
+)
 
 
 @admin.register(Contribution)
@@ -61,6 +66,7 @@ class LeaderBoardAdmin(admin.ModelAdmin):
         "total_score",
         "branch",
         "time_period",
+        "period_start",
     )
     list_filter = ("time_period", "branch")
     search_fields = ("user__email",)
@@ -78,7 +84,7 @@ class LeaderBoardAdmin(admin.ModelAdmin):
         (
             "Context",
             {
-                "fields": ("time_period", "branch", "sub_branch"),
+                "fields": ("time_period", "period_start", "branch", "sub_branch"),
             },
         ),
         (
@@ -97,6 +103,27 @@ class LeaderBoardAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(LeaderBoardArchive)
+class LeaderBoardArchiveAdmin(admin.ModelAdmin):
+    list_display = (
+        "rank",
+        "user",
+        "total_score",
+        "branch",
+        "time_period",
+        "period_start",
+    )
+    list_filter = ("time_period", "period_start", "branch")
+    search_fields = ("user__email",)
+
+    # Archived standings are frozen
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(DailyActivity)
 class DailyActivityAdmin(admin.ModelAdmin):
     list_display = (
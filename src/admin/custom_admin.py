@@ -20,6 +20,7 @@ class CustomAdminSite(admin.AdminSite):
                 "Contribution",
                 "DailyActivity",
                 "LeaderBoard",
+                "LeaderBoardArchive",
                 "PlatformStats",
                 "StudyCollection",
                 "UserProgress",
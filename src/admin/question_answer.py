@@ -100,12 +100,12 @@ class QuestionAdmin(admin.ModelAdmin):
 
     @admin.action(description="Mark selected questions as Public")
     def make_public(self, request, queryset):
-        updated = queryset.update(status="PUBLIC", is_public=True)
+        updated = Question.set_status_many(queryset, "PUBLIC", is_public=True)
         self.message_user(request, f"{updated} questions marked as public.")
 
     @admin.action(description="Mark selected questions as Draft")
     def make_draft(self, request, queryset):
-        updated = queryset.update(status="DRAFT", is_public=False)
+        updated = Question.set_status_many(queryset, "DRAFT", is_public=False)
         self.message_user(request, f"{updated} questions marked as draft.")
 
 
@@ -64,6 +64,7 @@ class UserProgressAdmin(admin.ModelAdmin):
         "user",
         "category",
         "accuracy_percentage",
+        "mastery_score",
         "questions_attempted",
     )
     list_filter = ("category",)
@@ -87,6 +88,17 @@ class UserProgressAdmin(admin.ModelAdmin):
                 ),
             },
         ),
+        (
+            "Mastery",
+            {
+                "fields": (
+                    "mastery_score",
+                    "difficulty_mastery",
+                    "weak_topics",
+                    "mastery_updated_at",
+                ),
+            },
+        ),
     )
 
 
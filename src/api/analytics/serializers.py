@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from src.models.analytics import Contribution, DailyActivity
+from src.models.analytics import ActivityRollup, Contribution, DailyActivity
 
 
 class ContributionSerializer(serializers.ModelSerializer):
@@ -39,3 +39,19 @@ class DailyActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = DailyActivity
         fields = "__all__"
+
+
+class ActivityRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ActivityRollup
+        fields = [
+            "granularity",
+            "bucket_start",
+            "branch",
+            "category",
+            "attempts",
+            "answers",
+            "questions_added",
+            "questions_approved",
+            "active_users",
+        ]
@@ -1,13 +1,21 @@
+from datetime import date, datetime, timedelta
+
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from src.api.analytics.serializers import (
+    ActivityRollupSerializer,
     ContributionSerializer,
     DailyActivitySerializer,
 )
-from src.models.analytics import Contribution, DailyActivity
+from src.models.analytics import ActivityRollup, Contribution, DailyActivity
+
+# Longest series the rollups endpoint returns in one response
+MAX_ROLLUP_BUCKETS = 1000
 
 
 class ContributionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -54,3 +62,53 @@ class DailyActivityViewSet(viewsets.ReadOnlyModelViewSet):
         permissions.IsAdminUser
     ]  # Only admins should see raw stats? Or public?
     # PlatformStats is public aggregated. DailyActivity is detailed. Let's keep Admin.
+
+    @action(detail=False, methods=["get"])
+    def rollups(self, request):
+        """
+        Activity series from the rollups. Query params: start and end
+        (YYYY-MM-DD, default the last 30 days), granularity (HOUR, DAY, WEEK
+        or MONTH, default by span), and branch or category ids (default the
+        platform total).
+        """
+        params = request.query_params
+        try:
+            end = date.fromisoformat(params.get("end") or str(timezone.localdate()))
+            start = date.fromisoformat(
+                params.get("start") or str(end - timedelta(days=30))
+            )
+            branch = int(params.get("branch") or 0) or None
+            category = int(params.get("category") or 0) or None
+        except ValueError:
+            raise ValidationError(
+                {"detail": "start and end are YYYY-MM-DD; branch and category are ids."}
+            ) from None
+        if end < start:
+            raise ValidationError({"end": "end is before start."})
+
+        since = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+        until = timezone.make_aware(datetime.combine(end, datetime.max.time()))
+        granularity = params.get("granularity") or ActivityRollup.granularity_for(
+            until - since
+        )
+        bucket = {
+            ActivityRollup.HOUR: timedelta(hours=1),
+            ActivityRollup.DAY: timedelta(days=1),
+            ActivityRollup.WEEK: timedelta(weeks=1),
+            ActivityRollup.MONTH: timedelta(days=28),
+        }.get(granularity)
+        if bucket is None:
+            raise ValidationError({"granularity": "Unknown granularity."})
+        if (until - since) / bucket > MAX_ROLLUP_BUCKETS:
+            raise ValidationError(
+                {"granularity": "Too many buckets; use a coarser granularity."}
+            )
+
+        rows = ActivityRollup.series(granularity, since, until, branch, category)
+        return Response(
+            {
+                "granularity": granularity,
+                "up_to": ActivityRollup.high_water_mark(),
+                "results": ActivityRollupSerializer(rows, many=True).data,
+            }
+        )
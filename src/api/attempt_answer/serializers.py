@@ -39,6 +39,7 @@ class UserAttemptSerializer(serializers.ModelSerializer):
             "percentage",
             "status",
             "mode",
+            "category_breakdown",
             "user_answers",
             "created_at",
         ]
@@ -51,6 +52,7 @@ class UserAttemptSerializer(serializers.ModelSerializer):
             "total_score",
             "percentage",
             "status",
+            "category_breakdown",
             "user_answers",
             "created_at",
         ]
@@ -61,3 +63,37 @@ class StartAttemptSerializer(serializers.Serializer):
     mode = serializers.ChoiceField(
         choices=UserAttempt.MODE_CHOICES, default="MOCK_TEST"
     )
+
+
+class BatchAnswerItemSerializer(serializers.Serializer):
+    # Plain integer ids so the whole batch is resolved in bulk by the model
+    question = serializers.IntegerField()
+    selected_answer = serializers.IntegerField(required=False, allow_null=True)
+    time_taken_seconds = serializers.IntegerField(
+        required=False, allow_null=True, min_value=0
+    )
+    is_marked_for_review = serializers.BooleanField(required=False, default=False)
+
+
+class BatchAnswerSerializer(serializers.Serializer):
+    answers = BatchAnswerItemSerializer(many=True, allow_empty=False)
+
+
+class AttemptSessionSerializer(serializers.Serializer):
+    current_index = serializers.IntegerField(required=False, min_value=0)
+    marked = serializers.ListField(child=serializers.IntegerField(), required=False)
+    # {question_id: selected_answer_id or null}
+    drafts = serializers.DictField(
+        child=serializers.IntegerField(allow_null=True), required=False
+    )
+    flush = serializers.BooleanField(required=False, default=False)
+
+    def validate_drafts(self, value):
+        try:
+            return {
+                int(question_id): selected for question_id, selected in value.items()
+            }
+        except ValueError:
+            raise serializers.ValidationError(
+                "Draft keys must be question ids."
+            ) from None
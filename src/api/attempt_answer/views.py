@@ -1,5 +1,9 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -7,14 +11,19 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from src.api.attempt_answer.serializers import (
+    AttemptSessionSerializer,
+    BatchAnswerSerializer,
     StartAttemptSerializer,
     UserAnswerSerializer,
     UserAttemptSerializer,
 )
 from src.api.permissions import IsOwnerOrReadOnly
-from src.models.attempt_answer import UserAnswer, UserAttempt
+from src.models.attempt_answer import AttemptResult, UserAnswer, UserAttempt
 from src.models.mocktest import MockTest
 
+# Result snapshots never change, so clients may reuse them for a day
+RESULTS_MAX_AGE = 60 * 60 * 24
+
 
 class UserAttemptViewSet(viewsets.ModelViewSet):
     """
@@ -65,6 +74,87 @@ class UserAttemptViewSet(viewsets.ModelViewSet):
             UserAttemptSerializer(attempt).data, status=status.HTTP_201_CREATED
         )
 
+    @action(detail=True, methods=["post"], url_path="answers/batch")
+    def submit_answers_batch(self, request, pk=None):
+        """
+        Save many answers for an in-progress attempt in one request.
+        Payload: { "answers": [{ "question": 1, "selected_answer": 3,
+                                 "time_taken_seconds": 20 }, ...] }
+        """
+        attempt = self.get_object()
+        if attempt.status != "IN_PROGRESS":
+            return Response(
+                {"detail": "Attempt is not in progress."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = BatchAnswerSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            answers = attempt.save_answers(serializer.validated_data["answers"])
+        except DjangoValidationError as e:
+            return Response({"detail": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "saved": len(answers),
+                "answers": UserAnswerSerializer(answers, many=True).data,
+            }
+        )
+
+    @action(detail=True, methods=["get", "patch"], url_path="session")
+    def session(self, request, pk=None):
+        """
+        Read or autosave the exam session state of an in-progress attempt.
+        Heartbeats only touch the cache; drafts reach UserAnswer in batches.
+        Payload: { "current_index": 4, "marked": [12], "drafts": {"12": 45},
+                   "flush": false }
+        """
+        state = UserAttempt.get_cached_session(pk)
+        if state is None or state["user_id"] != request.user.id:
+            attempt = self.get_object()
+            if attempt.status != "IN_PROGRESS":
+                return Response(
+                    {"detail": "Attempt is not in progress."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            state = attempt.get_session_state()
+
+        if request.method == "PATCH":
+            if state["deadline"] and timezone.now() > state["deadline"]:
+                return Response(
+                    {"detail": "Time is up for this attempt."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            serializer = AttemptSessionSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            data = serializer.validated_data
+            try:
+                state = UserAttempt.update_session_state(
+                    state,
+                    current_index=data.get("current_index"),
+                    marked=data.get("marked"),
+                    drafts=data.get("drafts"),
+                )
+                if data["flush"]:
+                    state = UserAttempt.flush_session(state)
+            except DjangoValidationError as e:
+                return Response(
+                    {"detail": e.messages}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response(
+            {
+                "attempt_id": state["attempt_id"],
+                "current_index": state["current_index"],
+                "marked": sorted(state["marked"]),
+                "drafts": state["drafts"],
+                "time_remaining": UserAttempt.seconds_until(state["deadline"]),
+                "pending_writes": len(state["dirty"]),
+            }
+        )
+
     @action(detail=True, methods=["post"], url_path="submit")
     def submit_attempt(self, request, pk=None):
         """
@@ -77,21 +167,42 @@ class UserAttemptViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        attempt.complete_attempt()
+        try:
+            attempt.complete_attempt()
+        except DjangoValidationError as e:
+            return Response({"detail": e.messages}, status=status.HTTP_400_BAD_REQUEST)
         return Response(UserAttemptSerializer(attempt).data)
 
     @action(detail=True, methods=["get"], url_path="results")
     def get_results(self, request, pk=None):
         """
         Get detailed results with correct answers.
+        Served from the snapshot captured at completion, with ETag support.
         """
-        attempt = self.get_object()
-        if attempt.status != "COMPLETED":
-            return Response(
-                {"detail": "Attempt not completed yet."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        return Response(UserAttemptSerializer(attempt).data)
+        try:
+            snapshot = AttemptResult.objects.filter(
+                attempt_id=pk, attempt__user=request.user
+            ).first()
+        except (ValueError, DjangoValidationError):
+            # Malformed ids get the same 404 as get_object gives them
+            raise Http404 from None
+        if snapshot is None:
+            attempt = self.get_object()
+            if attempt.status != "COMPLETED":
+                return Response(
+                    {"detail": "Attempt not completed yet."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            # Attempts completed before snapshots existed get one lazily
+            snapshot = AttemptResult.capture(attempt)
+
+        headers = {"ETag": snapshot.etag}
+        if snapshot.etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        else:
+            response = Response(snapshot.payload, headers=headers)
+        patch_cache_control(response, private=True, max_age=RESULTS_MAX_AGE)
+        return response
 
 
 class UserAnswerViewSet(viewsets.ModelViewSet):
@@ -103,4 +103,14 @@ urlpatterns = [
         views.export_reports_csv,
         name="export_reports",
     ),
+    path(
+        "export/<str:name>/background/",
+        views.export_in_background,
+        name="export_in_background",
+    ),
+    path(
+        "export/download/<str:filename>/",
+        views.download_export,
+        name="download_export",
+    ),
 ]
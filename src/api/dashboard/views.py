@@ -3,7 +3,6 @@ Dashboard views for managing contributions, questions, and platform analytics.
 Provides a custom admin-like interface for moderation and monitoring.
 """
 
-import csv
 import json
 import logging
 from datetime import timedelta
@@ -12,12 +11,25 @@ from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.core.paginator import Paginator
 from django.db.models import Q
-from django.http import HttpResponse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
+from src.exports import (
+    EXPORTS,
+    clean_params,
+    csv_lines,
+    export_path,
+    export_storage,
+)
 from src.models import (
+    ActivityRollup,
     Category,
     Contribution,
     DailyActivity,
@@ -25,16 +37,23 @@ from src.models import (
     PlatformStats,
     Question,
     QuestionReport,
+    QuestionSignature,
 )
+from src.search import search_questions
+from src.tasks import export_dashboard_csv
 
 logger = logging.getLogger(__name__)
 
 # PlatformStats uses singleton pattern with ID 1
 PLATFORM_STATS_SINGLETON_ID = 1
 
-# CSV export string length limits
-CSV_QUESTION_TEXT_LIMIT = 200
-CSV_SHORT_TEXT_LIMIT = 100
+# Activity chart ranges (days, title); anything beyond a week reads the rollups
+CHART_RANGES = {
+    "7d": (7, "Last 7 Days"),
+    "90d": (90, "Last 90 Days"),
+    "1y": (365, "Last Year"),
+    "5y": (5 * 365, "Last 5 Years"),
+}
 
 
 @staff_member_required
@@ -53,16 +72,41 @@ def dashboard_index(request):
         "question", "reported_by"
     ).order_by("-created_at")[:5]
 
-    # Activity data for chart (last 7 days)
+    chart_range = request.GET.get("range")
+    if chart_range not in CHART_RANGES:
+        chart_range = "7d"
+    if chart_range == "7d":
+        activity_data = _daily_chart_data()
+    else:
+        activity_data = _rollup_chart_data(*CHART_RANGES[chart_range])
+
+    return render(
+        request,
+        "dashboard/index.html",
+        {
+            "stats": stats,
+            "recent_contributions": recent_contributions,
+            "recent_reports": recent_reports,
+            "activity_data": json.dumps(activity_data),
+            "chart_range": chart_range,
+            "chart_ranges": list(CHART_RANGES),
+        },
+    )
+
+
+def _daily_chart_data():
+    """Last 7 days from DailyActivity, including new registrations."""
     end_date = timezone.now().date()
     start_date = end_date - timedelta(days=6)
-    activities = DailyActivity.objects.filter(
-        date__range=[start_date, end_date]
-    ).order_by("date")
+    activities = DailyActivity.get_activity_range(
+        start_date, end_date, fill_missing=True
+    )
 
     activity_data = {
+        "title": "Daily Activity (Last 7 Days)",
+        "users_label": "New Users",
         "labels": [],
-        "new_users": [],
+        "users": [],
         "questions_added": [],
         "tests_taken": [],
     }
@@ -80,24 +124,42 @@ def dashboard_index(request):
         activity_data["labels"].append(d.strftime("%b %d"))
         if d in existing_dates:
             a = existing_dates[d]
-            activity_data["new_users"].append(a.new_users)
+            activity_data["users"].append(a.new_users)
             activity_data["questions_added"].append(a.questions_added)
             activity_data["tests_taken"].append(a.mock_tests_taken)
         else:
-            activity_data["new_users"].append(0)
+            activity_data["users"].append(0)
             activity_data["questions_added"].append(0)
             activity_data["tests_taken"].append(0)
+    return activity_data
 
-    return render(
-        request,
-        "dashboard/index.html",
-        {
-            "stats": stats,
-            "recent_contributions": recent_contributions,
-            "recent_reports": recent_reports,
-            "activity_data": json.dumps(activity_data),
-        },
-    )
+
+def _rollup_chart_data(days, period):
+    """Longer ranges from the pre-aggregated ActivityRollup buckets."""
+    end = timezone.now()
+    start = end - timedelta(days=days)
+    granularity = ActivityRollup.granularity_for(end - start)
+    rows = {
+        row.bucket_start: row for row in ActivityRollup.series(granularity, start, end)
+    }
+    label_format = "%b %Y" if granularity == ActivityRollup.MONTH else "%b %d, %Y"
+    granularity_label = dict(ActivityRollup.GRANULARITY_CHOICES)[granularity]
+
+    activity_data = {
+        "title": f"{granularity_label} Activity ({period})",
+        "users_label": "Active Users",
+        "labels": [],
+        "users": [],
+        "questions_added": [],
+        "tests_taken": [],
+    }
+    for bucket_start in ActivityRollup.bucket_starts(granularity, start, end):
+        row = rows.get(bucket_start)
+        activity_data["labels"].append(bucket_start.strftime(label_format))
+        activity_data["users"].append(row.active_users if row else 0)
+        activity_data["questions_added"].append(row.questions_added if row else 0)
+        activity_data["tests_taken"].append(row.attempts if row else 0)
+    return activity_data
 
 
 @staff_member_required
@@ -263,10 +325,7 @@ def questions_list(request):
     if difficulty:
         questions = questions.filter(difficulty_level=difficulty)
     if search:
-        questions = questions.filter(
-            Q(question_text_en__icontains=search)
-            | Q(question_text_np__icontains=search)
-        )
+        questions = search_questions(questions, search)
 
     # Get counts
     public_count = Question.objects.filter(status="PUBLIC").count()
@@ -344,39 +403,31 @@ def check_duplicate(request, pk):
     """Check for duplicate questions."""
     question = get_object_or_404(Question, pk=pk)
 
-    # Find potential duplicates
+    # Find potential duplicates through the MinHash/LSH index
     duplicates = []
     has_exact_match = False
 
-    # Check exact match
-    exact_matches = Question.objects.filter(
-        Q(question_text_en__iexact=question.question_text_en)
-        | Q(question_text_np__iexact=question.question_text_np)
-    ).exclude(id=question.id)
-
-    for match in exact_matches:
-        duplicates.append({"question": match, "similarity": "exact", "score": 100})
-        has_exact_match = True
-
-    # Check partial matches (simple word overlap)
-    words = set(question.question_text_en.lower().split())
-    similar_questions = (
-        Question.objects.filter(category=question.category)
-        .exclude(id=question.id)[:100]
-    )
+    matches = dict(QuestionSignature.index(question).find_similar(0.5, limit=10))
+    similar_questions = Question.objects.filter(id__in=matches)
 
     for similar in similar_questions:
-        if similar.id in [d["question"].id for d in duplicates]:
-            continue
-        similar_words = set(similar.question_text_en.lower().split())
-        if words and similar_words:
-            overlap = len(words & similar_words) / max(len(words), len(similar_words))
-            if overlap > 0.5:
-                score = int(overlap * 100)
-                similarity = "high" if overlap > 0.7 else "medium"
-                duplicates.append(
-                    {"question": similar, "similarity": similarity, "score": score}
-                )
+        exact = (
+            similar.question_text_en.lower() == question.question_text_en.lower()
+            or similar.question_text_np == question.question_text_np
+        )
+        overlap = matches[similar.id]
+        if exact:
+            has_exact_match = True
+            similarity = "exact"
+        else:
+            similarity = "high" if overlap > 0.7 else "medium"
+        duplicates.append(
+            {
+                "question": similar,
+                "similarity": similarity,
+                "score": 100 if exact else int(overlap * 100),
+            }
+        )
 
     # Sort by score
     duplicates.sort(key=lambda x: x["score"], reverse=True)
@@ -463,49 +514,28 @@ def resolve_report(request, pk):
 # =============================================================================
 
 
+def _selected_ids(request, field):
+    """Integer ids posted under field; invalid values are logged and skipped."""
+    valid_ids = []
+    for value in request.POST.getlist(field):
+        try:
+            valid_ids.append(int(value))
+        except (ValueError, TypeError):
+            logger.warning("Invalid %s value: %s", field, value)
+    return valid_ids
+
+
 @staff_member_required
 @require_POST
 def bulk_approve_contributions(request):
     """Approve multiple contributions at once."""
-    contribution_ids = request.POST.getlist("contribution_ids")
-    if not contribution_ids:
+    if not request.POST.getlist("contribution_ids"):
         messages.error(request, "No contributions selected.")
         return redirect("dashboard:contributions")
 
-    # Convert to integers and filter valid IDs
-    valid_ids = []
-    for cid in contribution_ids:
-        try:
-            valid_ids.append(int(cid))
-        except (ValueError, TypeError):
-            logger.warning("Invalid contribution ID: %s", cid)
-
-    # Fetch all contributions in a single query
-    contributions = Contribution.objects.filter(
-        pk__in=valid_ids, status="PENDING"
-    ).select_related("user", "question")
-
-    approved_count = 0
-    notifications_to_create = []
-
-    for contribution in contributions:
-        contribution.approve_contribution()
-        notifications_to_create.append(
-            Notification(
-                user=contribution.user,
-                notification_type="CONTRIBUTION_APPROVED",
-                title_en="Contribution Approved!",
-                title_np="योगदान स्वीकृत भयो!",
-                message_en="Your question has been approved.",
-                message_np="तपाईंको प्रश्न स्वीकृत भएको छ।",
-                related_question=contribution.question,
-            )
-        )
-        approved_count += 1
-
-    # Bulk create notifications
-    if notifications_to_create:
-        Notification.objects.bulk_create(notifications_to_create)
+    approved_count = Contribution.approve_many(
+        Contribution.objects.filter(pk__in=_selected_ids(request, "contribution_ids"))
+    )
 
     messages.success(request, f"{approved_count} contributions have been approved.")
     return redirect("dashboard:contributions")
@@ -515,49 +545,18 @@ def bulk_approve_contributions(request):
 @require_POST
 def bulk_reject_contributions(request):
     """Reject multiple contributions at once."""
-    contribution_ids = request.POST.getlist("contribution_ids")
     rejection_reason = request.POST.get(
         "rejection_reason", "Did not meet quality standards."
     )
 
-    if not contribution_ids:
+    if not request.POST.getlist("contribution_ids"):
         messages.error(request, "No contributions selected.")
         return redirect("dashboard:contributions")
 
-    # Convert to integers
-    valid_ids = []
-    for cid in contribution_ids:
-        try:
-            valid_ids.append(int(cid))
-        except (ValueError, TypeError):
-            logger.warning("Invalid contribution ID: %s", cid)
-
-    # Fetch all contributions in a single query
-    contributions = Contribution.objects.filter(
-        pk__in=valid_ids, status="PENDING"
-    ).select_related("user", "question")
-
-    rejected_count = 0
-    notifications_to_create = []
-
-    for contribution in contributions:
-        contribution.reject_contribution(rejection_reason)
-        notifications_to_create.append(
-            Notification(
-                user=contribution.user,
-                notification_type="GENERAL",
-                title_en="Contribution Not Approved",
-                title_np="योगदान स्वीकृत भएन",
-                message_en=f"Your question was not approved. Reason: {rejection_reason}",
-                message_np=f"तपाईंको प्रश्न स्वीकृत भएन। कारण: {rejection_reason}",
-                related_question=contribution.question,
-            )
-        )
-        rejected_count += 1
-
-    # Bulk create notifications
-    if notifications_to_create:
-        Notification.objects.bulk_create(notifications_to_create)
+    rejected_count = Contribution.reject_many(
+        Contribution.objects.filter(pk__in=_selected_ids(request, "contribution_ids")),
+        rejection_reason,
+    )
 
     messages.warning(request, f"{rejected_count} contributions have been rejected.")
     return redirect("dashboard:contributions")
@@ -567,46 +566,13 @@ def bulk_reject_contributions(request):
 @require_POST
 def bulk_make_public(request):
     """Make multiple approved contributions public at once."""
-    contribution_ids = request.POST.getlist("contribution_ids")
-
-    if not contribution_ids:
+    if not request.POST.getlist("contribution_ids"):
         messages.error(request, "No contributions selected.")
         return redirect("dashboard:contributions")
 
-    # Convert to integers
-    valid_ids = []
-    for cid in contribution_ids:
-        try:
-            valid_ids.append(int(cid))
-        except (ValueError, TypeError):
-            logger.warning("Invalid contribution ID: %s", cid)
-
-    # Fetch all contributions in a single query
-    contributions = Contribution.objects.filter(
-        pk__in=valid_ids, status="APPROVED"
-    ).select_related("user", "question")
-
-    public_count = 0
-    notifications_to_create = []
-
-    for contribution in contributions:
-        contribution.make_public()
-        notifications_to_create.append(
-            Notification(
-                user=contribution.user,
-                notification_type="QUESTION_PUBLIC",
-                title_en="Your Question is Now Public!",
-                title_np="तपाईंको प्रश्न अब सार्वजनिक छ!",
-                message_en="Congratulations! Your contributed question is now available.",
-                message_np="बधाई छ! तपाईंको योगदान गरिएको प्रश्न अब उपलब्ध छ।",
-                related_question=contribution.question,
-            )
-        )
-        public_count += 1
-
-    # Bulk create notifications
-    if notifications_to_create:
-        Notification.objects.bulk_create(notifications_to_create)
+    public_count = Contribution.make_public_many(
+        Contribution.objects.filter(pk__in=_selected_ids(request, "contribution_ids"))
+    )
 
     messages.success(request, f"{public_count} contributions have been made public.")
     return redirect("dashboard:contributions")
@@ -616,32 +582,18 @@ def bulk_make_public(request):
 @require_POST
 def bulk_resolve_reports(request):
     """Resolve multiple reports at once."""
-    report_ids = request.POST.getlist("report_ids")
     admin_notes = request.POST.get("admin_notes", "Bulk resolved via dashboard.")
 
-    if not report_ids:
+    if not request.POST.getlist("report_ids"):
         messages.error(request, "No reports selected.")
         return redirect("dashboard:reports")
 
-    # Convert to integers
-    valid_ids = []
-    for rid in report_ids:
-        try:
-            valid_ids.append(int(rid))
-        except (ValueError, TypeError):
-            logger.warning("Invalid report ID: %s", rid)
-
-    # Fetch all reports in a single query (excluding already resolved)
-    reports = QuestionReport.objects.filter(pk__in=valid_ids).exclude(
-        status="RESOLVED"
+    resolved_count = QuestionReport.resolve_many(
+        QuestionReport.objects.filter(pk__in=_selected_ids(request, "report_ids")),
+        request.user,
+        admin_notes,
     )
 
-    resolved_count = 0
-    for report in reports:
-        report.resolve_report(request.user, admin_notes)
-        report.notify_creator()
-        resolved_count += 1
-
     messages.success(request, f"{resolved_count} reports have been resolved.")
     return redirect("dashboard:reports")
 
@@ -650,24 +602,18 @@ def bulk_resolve_reports(request):
 @require_POST
 def bulk_publish_questions(request):
     """Publish multiple questions at once."""
-    question_ids = request.POST.getlist("question_ids")
-
-    if not question_ids:
+    if not request.POST.getlist("question_ids"):
         messages.error(request, "No questions selected.")
         return redirect("dashboard:questions")
 
-    # Convert to integers
-    valid_ids = []
-    for qid in question_ids:
-        try:
-            valid_ids.append(int(qid))
-        except (ValueError, TypeError):
-            logger.warning("Invalid question ID: %s", qid)
-
     # Use bulk update for better performance
-    published_count = Question.objects.filter(pk__in=valid_ids).exclude(
-        status="PUBLIC"
-    ).update(status="PUBLIC", is_public=True)
+    published_count = Question.set_status_many(
+        Question.objects.filter(pk__in=_selected_ids(request, "question_ids")).exclude(
+            status="PUBLIC"
+        ),
+        "PUBLIC",
+        is_public=True,
+    )
 
     messages.success(request, f"{published_count} questions have been published.")
     return redirect("dashboard:questions")
@@ -678,202 +624,63 @@ def bulk_publish_questions(request):
 # =============================================================================
 
 
+def _stream_export(request, name):
+    """Stream an export from a lazily read queryset instead of building it first."""
+    try:
+        params = clean_params(request.GET.dict())
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    response = StreamingHttpResponse(csv_lines(name, params), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{EXPORTS[name][0]}"'
+    return response
+
+
 @staff_member_required
 def export_contributions_csv(request):
     """Export contributions to CSV file."""
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = (
-        'attachment; filename="contributions_export.csv"'
-    )
-
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "ID",
-            "Contributor",
-            "Email",
-            "Question ID",
-            "Question (EN)",
-            "Category",
-            "Status",
-            "Month",
-            "Year",
-            "Is Featured",
-            "Created At",
-            "Approval Date",
-            "Public Date",
-            "Rejection Reason",
-        ]
-    )
-
-    contributions = Contribution.objects.select_related(
-        "user", "question", "question__category"
-    ).order_by("-created_at")
-
-    # Apply filters from request
-    status = request.GET.get("status")
-    month = request.GET.get("month")
-    year = request.GET.get("year")
-
-    if status:
-        contributions = contributions.filter(status=status)
-    if month:
-        contributions = contributions.filter(contribution_month=int(month))
-    if year:
-        contributions = contributions.filter(contribution_year=int(year))
-
-    for contrib in contributions:
-        writer.writerow(
-            [
-                contrib.id,
-                contrib.user.username,
-                contrib.user.email,
-                contrib.question.id,
-                contrib.question.question_text_en[:CSV_SHORT_TEXT_LIMIT],
-                contrib.question.category.name_en if contrib.question.category else "",
-                contrib.status,
-                contrib.contribution_month,
-                contrib.contribution_year,
-                contrib.is_featured,
-                contrib.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                (
-                    contrib.approval_date.strftime("%Y-%m-%d %H:%M:%S")
-                    if contrib.approval_date
-                    else ""
-                ),
-                (
-                    contrib.public_date.strftime("%Y-%m-%d %H:%M:%S")
-                    if contrib.public_date
-                    else ""
-                ),
-                contrib.rejection_reason or "",
-            ]
-        )
-
-    return response
+    return _stream_export(request, "contributions")
 
 
 @staff_member_required
 def export_questions_csv(request):
     """Export questions to CSV file."""
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="questions_export.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "ID",
-            "Question (EN)",
-            "Question (NP)",
-            "Category",
-            "Difficulty",
-            "Status",
-            "Is Public",
-            "Is Verified",
-            "Times Attempted",
-            "Times Correct",
-            "Accuracy %",
-            "Reported Count",
-            "Created By",
-            "Created At",
-        ]
-    )
-
-    questions = Question.objects.select_related("category", "created_by").order_by(
-        "-created_at"
-    )
-
-    # Apply filters
-    status = request.GET.get("status")
-    category = request.GET.get("category")
-    difficulty = request.GET.get("difficulty")
-
-    if status:
-        questions = questions.filter(status=status)
-    if category:
-        questions = questions.filter(category_id=int(category))
-    if difficulty:
-        questions = questions.filter(difficulty_level=difficulty)
-
-    for q in questions:
-        accuracy = q.get_accuracy_rate()
-        writer.writerow(
-            [
-                q.id,
-                q.question_text_en[:CSV_QUESTION_TEXT_LIMIT],
-                q.question_text_np[:CSV_QUESTION_TEXT_LIMIT],
-                q.category.name_en if q.category else "",
-                q.difficulty_level or "",
-                q.status,
-                q.is_public,
-                q.is_verified,
-                q.times_attempted,
-                q.times_correct,
-                f"{accuracy:.2f}",
-                q.reported_count,
-                q.created_by.username if q.created_by else "System",
-                q.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-            ]
-        )
-
-    return response
+    return _stream_export(request, "questions")
 
 
 @staff_member_required
 def export_reports_csv(request):
     """Export question reports to CSV file."""
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="reports_export.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "ID",
-            "Question ID",
-            "Question Text",
-            "Reason",
-            "Description",
-            "Status",
-            "Reported By",
-            "Reviewed By",
-            "Admin Notes",
-            "Created At",
-            "Resolved At",
-        ]
-    )
+    return _stream_export(request, "reports")
 
-    reports = QuestionReport.objects.select_related(
-        "question", "reported_by", "reviewed_by"
-    ).order_by("-created_at")
 
-    # Apply filters
-    status = request.GET.get("status")
-    reason = request.GET.get("reason")
-
-    if status:
-        reports = reports.filter(status=status)
-    if reason:
-        reports = reports.filter(reason=reason)
+@staff_member_required
+@require_POST
+def export_in_background(request, name):
+    """Queue a gzip CSV export; the user is notified when the file is ready."""
+    if name not in EXPORTS:
+        raise Http404("Unknown export.")
+    try:
+        params = clean_params(request.GET.dict())
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    export_dashboard_csv.delay(name, params, request.user.id)
+    messages.success(
+        request, "Export started. You will get a notification when it is ready."
+    )
+    return redirect(request.META.get("HTTP_REFERER") or f"dashboard:{name}")
 
-    for report in reports:
-        writer.writerow(
-            [
-                report.id,
-                report.question.id,
-                report.question.question_text_en[:CSV_SHORT_TEXT_LIMIT],
-                report.get_reason_display(),
-                report.description[:CSV_QUESTION_TEXT_LIMIT],
-                report.get_status_display(),
-                report.reported_by.username if report.reported_by else "Anonymous",
-                report.reviewed_by.username if report.reviewed_by else "",
-                report.admin_notes or "",
-                report.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                (
-                    report.resolved_at.strftime("%Y-%m-%d %H:%M:%S")
-                    if report.resolved_at
-                    else ""
-                ),
-            ]
-        )
 
-    return response
+@staff_member_required
+def download_export(request, filename):
+    """Serve a finished background export to the staff member who requested it."""
+    storage = export_storage()
+    # Only the requester's own folder is looked in
+    path = export_path(request.user.id, filename)
+    if not filename.endswith(".csv.gz") or not storage.exists(path):
+        raise Http404("Export not found.")
+    return FileResponse(
+        storage.open(path),
+        as_attachment=True,
+        filename=filename,
+        content_type="application/gzip",
+    )
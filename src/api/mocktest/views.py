@@ -1,3 +1,6 @@
+from django.db.models import Prefetch
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
@@ -5,7 +8,8 @@ from rest_framework.response import Response
 
 from src.api.mocktest.serializers import MockTestSerializer
 from src.api.permissions import IsOwnerOrReadOnly
-from src.models.mocktest import MockTest
+from src.models.attempt_answer import UserAnswer
+from src.models.mocktest import MockTest, MockTestQuestion
 
 
 class MockTestViewSet(viewsets.ModelViewSet):
@@ -30,10 +34,47 @@ class MockTestViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Public tests or own private tests
         if self.request.user.is_authenticated:
-            return MockTest.objects.filter(is_public=True) | MockTest.objects.filter(
-                created_by=self.request.user
+            queryset = MockTest.objects.filter(
+                is_public=True
+            ) | MockTest.objects.filter(created_by=self.request.user)
+        else:
+            queryset = MockTest.objects.filter(is_public=True)
+
+        if self.action == "paper":
+            # The compiled paper is cached, only the test row itself is needed
+            return queryset
+        return queryset.select_related("branch", "created_by").prefetch_related(
+            Prefetch(
+                "test_questions",
+                queryset=MockTestQuestion.objects.select_related(
+                    "question__category", "question__created_by"
+                ).prefetch_related("question__answers"),
             )
-        return MockTest.objects.filter(is_public=True)
+        )
+
+    @action(detail=True, methods=["get"])
+    def paper(self, request, pk=None):
+        """
+        Get the compiled question paper for taking this test.
+        Correct answers are stripped unless ?include_answers=true is passed by
+        staff or the test's creator.
+        """
+        test = self.get_object()
+        include_answers = request.query_params.get("include_answers") == "true" and (
+            request.user.is_staff
+            or (test.created_by_id and test.created_by_id == request.user.id)
+        )
+
+        etag = test.get_paper_etag(include_answers)
+        headers = {"ETag": etag}
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        else:
+            response = Response(
+                test.get_compiled_paper(include_answers), headers=headers
+            )
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
     @action(detail=False, methods=["post"])
     def generate(self, request):
@@ -43,13 +84,16 @@ class MockTestViewSet(viewsets.ModelViewSet):
         {
             "title_en": "Generated Test",
             "branch_id": 1,
-            "category_distribution": {"1": 5, "2": 3}  # category_id: count
+            "category_distribution": {"1": 5, "2": 3},  # category_id: count
+            "difficulty_weights": {"EASY": 1, "MEDIUM": 2, "HARD": 1},  # optional
+            "exclude_recent": true  # optional, skip recently answered questions
         }
         """
         data = request.data
         title_en = data.get("title_en", "Generated Test")
         branch_id = data.get("branch_id")
         category_dist = data.get("category_distribution", {})
+        difficulty_weights = data.get("difficulty_weights") or None
 
         if not branch_id or not category_dist:
             return Response(
@@ -57,6 +101,18 @@ class MockTestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if difficulty_weights is not None and not (
+            isinstance(difficulty_weights, dict)
+            and all(
+                isinstance(w, (int, float)) and w >= 0
+                for w in difficulty_weights.values()
+            )
+        ):
+            return Response(
+                {"detail": "difficulty_weights must map difficulty to a weight."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         # Create basic test object
         test = MockTest.objects.create(
             title_en=title_en,
@@ -69,7 +125,10 @@ class MockTestViewSet(viewsets.ModelViewSet):
         )
 
         # Generate questions
-        test.generate_from_categories(category_dist)
+        exclude_ids = ()
+        if data.get("exclude_recent", False):
+            exclude_ids = UserAnswer.recent_question_ids(request.user)
+        test.generate_from_categories(category_dist, difficulty_weights, exclude_ids)
 
         serializer = self.get_serializer(test)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
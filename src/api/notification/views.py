@@ -4,6 +4,7 @@ from rest_framework.response import Response
 
 from src.api.notification.serializers import NotificationSerializer
 from src.models.notification import Notification
+from src.models.user_stats import UserSummary
 
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -27,9 +28,10 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=["post"], url_path="read-all")
     def mark_all_as_read(self, request):
-        Notification.objects.filter(user=request.user, is_read=False).update(
+        if Notification.objects.filter(user=request.user, is_read=False).update(
             is_read=True
-        )
+        ):
+            UserSummary.invalidate([request.user.id])
         return Response({"status": "all read"})
 
     @action(detail=False, methods=["get"], url_path="unread")
@@ -1,8 +1,18 @@
-from rest_framework import permissions, viewsets
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import permissions, status, viewsets
 from rest_framework.response import Response
 
 from src.api.platform_stats.serializers import PlatformStatsSerializer
-from src.models.platform_stats import PlatformStats
+from src.models.platform_stats import (
+    PUBLIC_STATS_CACHE_KEY,
+    PUBLIC_STATS_CACHE_TIMEOUT,
+    PlatformStats,
+)
+
+# Clients and shared caches may reuse a response this long without asking
+PUBLIC_STATS_MAX_AGE = 5 * 60
 
 
 class PlatformStatsViewSet(viewsets.ViewSet):
@@ -12,8 +22,40 @@ class PlatformStatsViewSet(viewsets.ViewSet):
     """
 
     permission_classes = [permissions.AllowAny]
+    # Nothing here depends on the caller, so skip the user lookup
+    authentication_classes = []
 
     def list(self, request):
-        stats, _ = PlatformStats.objects.get_or_create(id=1)
-        serializer = PlatformStatsSerializer(stats)
-        return Response(serializer.data)
+        """
+        Served from the cache and revalidated with ETag / Last-Modified, so
+        repeat requests run no queries.
+        """
+        payload = cache.get(PUBLIC_STATS_CACHE_KEY)
+        if payload is None:
+            stats, _ = PlatformStats.objects.select_related(
+                "top_contributor_this_month__profile", "most_attempted_category"
+            ).get_or_create(id=1)
+            payload = {
+                "etag": stats.get_etag(),
+                "last_modified": int(stats.last_updated.timestamp()),
+                "data": dict(PlatformStatsSerializer(stats).data),
+            }
+            cache.set(PUBLIC_STATS_CACHE_KEY, payload, PUBLIC_STATS_CACHE_TIMEOUT)
+
+        headers = {
+            "ETag": payload["etag"],
+            "Last-Modified": http_date(payload["last_modified"]),
+        }
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            not_modified = payload["etag"] in parse_etags(if_none_match)
+        else:
+            since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+            not_modified = since is not None and payload["last_modified"] <= since
+
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        else:
+            response = Response(payload["data"], headers=headers)
+        patch_cache_control(response, public=True, max_age=PUBLIC_STATS_MAX_AGE)
+        return response
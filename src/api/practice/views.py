@@ -0,0 +1,59 @@
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from src.api.question_answer.serializers import QuestionSerializer
+from src.models.question_answer import Question
+from src.models.user_stats import UserProgress
+
+MAX_PRACTICE_BATCH = 50
+
+
+class PracticeViewSet(viewsets.ViewSet):
+    """
+    Adaptive question feed for PRACTICE mode attempts.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @action(detail=False, methods=["get"])
+    def next(self, request):
+        """
+        Get the next batch of practice questions for the current user.
+        Query params: size (default 10), category (optional),
+        refresh=true to rebuild the candidate pool.
+        """
+        try:
+            size = min(int(request.query_params.get("size", 10)), MAX_PRACTICE_BATCH)
+            category_id = int(request.query_params.get("category") or 0) or None
+        except ValueError:
+            return Response(
+                {"detail": "size and category must be integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if size < 1:
+            return Response(
+                {"detail": "size must be positive."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        question_ids, remaining = UserProgress.next_practice_batch(
+            request.user,
+            size,
+            category_id=category_id,
+            refresh=request.query_params.get("refresh") == "true",
+        )
+        questions = (
+            Question.objects.filter(id__in=question_ids)
+            .select_related("category", "created_by")
+            .prefetch_related("answers")
+        )
+        by_id = {q.id: q for q in questions}
+        ordered = [by_id[qid] for qid in question_ids if qid in by_id]
+
+        return Response(
+            {
+                "results": QuestionSerializer(ordered, many=True).data,
+                "remaining": remaining,
+            }
+        )
@@ -81,6 +81,14 @@ class QuestionSerializer(serializers.ModelSerializer):
         return instance
 
 
+class QuestionSearchSerializer(QuestionSerializer):
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta(QuestionSerializer.Meta):
+        fields = QuestionSerializer.Meta.fields + ["search_rank", "search_snippet"]
+
+
 class QuestionReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuestionReport
@@ -6,9 +6,25 @@ from rest_framework.response import Response
 from src.api.permissions import IsOwnerOrReadOnly
 from src.api.question_answer.serializers import (
     QuestionReportSerializer,
+    QuestionSearchSerializer,
     QuestionSerializer,
 )
+from src.models.dedup import QuestionSignature
 from src.models.question_answer import Question, QuestionReport
+from src.search import search_questions
+
+# Estimated similarity above which a new question is flagged as a duplicate
+DUPLICATE_THRESHOLD = 0.7
+
+
+class QuestionSearchFilter(filters.SearchFilter):
+    """
+    ?search= backed by the full-text index, ranked by relevance.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        return search_questions(queryset, query)
 
 
 class QuestionViewSet(viewsets.ModelViewSet):
@@ -24,16 +40,35 @@ class QuestionViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        QuestionSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = ["category", "difficulty_level", "question_type"]
-    search_fields = ["question_text_en", "question_text_np"]
     ordering_fields = ["created_at", "times_attempted", "times_correct"]
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def create(self, request, *args, **kwargs):
+        """
+        Create a question and report likely duplicates already in the bank.
+        """
+        response = super().create(request, *args, **kwargs)
+        signature = QuestionSignature.objects.filter(
+            question_id=response.data["id"]
+        ).first()
+        matches = signature.find_similar(DUPLICATE_THRESHOLD) if signature else []
+        response.data["possible_duplicates"] = [
+            {"id": question_id, "similarity": round(score, 2)}
+            for question_id, score in matches
+        ]
+        return response
+
+    def get_serializer_class(self):
+        if self.action == "list" and self.request.query_params.get("search"):
+            return QuestionSearchSerializer
+        return QuestionSerializer
+
     def get_queryset(self):
         # Allow users to see their own non-public questions
         if self.request.user.is_authenticated:
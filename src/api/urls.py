@@ -9,11 +9,13 @@ from src.api.branch.views import (BranchViewSet, CategoryViewSet,
 from src.api.mocktest.views import MockTestViewSet
 from src.api.notification.views import NotificationViewSet
 from src.api.platform_stats.views import PlatformStatsViewSet
+from src.api.practice.views import PracticeViewSet
 from src.api.question_answer.views import (QuestionReportViewSet,
                                            QuestionViewSet)
 from src.api.time_config.views import TimeConfigurationViewSet
 from src.api.user_stats.views import (LeaderBoardViewSet, StudyCollectionViewSet,
-                                      UserProgressViewSet, UserStatisticsViewSet)
+                                      UserProgressViewSet, UserStatisticsViewSet,
+                                      UserSummaryView)
 
 router = DefaultRouter()
 
@@ -32,6 +34,7 @@ router.register(r"mock-tests", MockTestViewSet)
 # Attempts & Answers
 router.register(r"attempts", UserAttemptViewSet, basename="attempt")
 router.register(r"answers", UserAnswerViewSet)
+router.register(r"practice", PracticeViewSet, basename="practice")
 
 # Stats & Analytics
 router.register(r"platform-stats", PlatformStatsViewSet, basename="platform-stats")
@@ -50,5 +53,6 @@ router.register(r"settings", AppSettingsViewSet)
 router.register(r"time-configs", TimeConfigurationViewSet)
 
 urlpatterns = [
+    path("me/summary/", UserSummaryView.as_view(), name="me-summary"),
     path("", include(router.urls)),
 ]
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from src.models.analytics import LeaderBoard
+from src.models.analytics import LeaderBoard, LeaderBoardArchive
 from src.models.user_stats import StudyCollection, UserProgress, UserStatistics
 
 
@@ -19,12 +19,16 @@ class UserProgressSerializer(serializers.ModelSerializer):
             "average_time_seconds",
             "last_attempted_date",
             "weak_topics",
+            "mastery_score",
+            "difficulty_mastery",
         ]
         read_only_fields = [
             "questions_attempted",
             "correct_answers",
             "accuracy_percentage",
             "weak_topics",
+            "mastery_score",
+            "difficulty_mastery",
         ]
 
 
@@ -100,6 +104,25 @@ class LeaderBoardSerializer(serializers.ModelSerializer):
             "tests_completed",
             "accuracy_percentage",
             "time_period",
+            "period_start",
+            "branch",
+            "sub_branch",
+        ]
+
+
+class LeaderBoardArchiveSerializer(serializers.ModelSerializer):
+    user_name = serializers.CharField(source="user.profile.full_name", read_only=True)
+
+    class Meta:
+        model = LeaderBoardArchive
+        fields = [
+            "rank",
+            "user_name",
+            "total_score",
+            "tests_completed",
+            "accuracy_percentage",
+            "time_period",
+            "period_start",
             "branch",
             "sub_branch",
         ]
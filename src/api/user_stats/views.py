@@ -1,17 +1,28 @@
+from datetime import date
+
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from src.api.permissions import IsOwnerOrReadOnly
 from src.api.user_stats.serializers import (
+    LeaderBoardArchiveSerializer,
     LeaderBoardSerializer,
     StudyCollectionSerializer,
     UserProgressSerializer,
     UserStatisticsSerializer,
 )
-from src.models.analytics import LeaderBoard
-from src.models.user_stats import StudyCollection, UserProgress, UserStatistics
+from src.models.analytics import LeaderBoard, LeaderBoardArchive
+from src.models.user import XP_RANKING_KEY, UserProfile
+from src.models.user_stats import (
+    StudyCollection,
+    UserProgress,
+    UserStatistics,
+    UserSummary,
+)
 
 
 class UserStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
@@ -33,6 +44,25 @@ class UserStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
+class UserSummaryView(APIView):
+    """
+    Everything the home screen needs in one response: statistics, progress
+    per category, unread notifications, current rank and recent attempts.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        data = UserSummary.get_for_user(request.user)
+        # Rank moves whenever anyone gains XP, so it is looked up live
+        rank = None
+        if data["profile_id"]:
+            rank = UserProfile.xp_ranking().rank(XP_RANKING_KEY, data["profile_id"])
+            if rank is None:
+                rank = UserProfile.objects.get(pk=data["profile_id"]).get_current_rank()
+        return Response({**data, "rank": rank})
+
+
 class UserProgressViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = UserProgress.objects.all()
     serializer_class = UserProgressSerializer
@@ -80,8 +110,149 @@ class StudyCollectionViewSet(viewsets.ModelViewSet):
 
 
 class LeaderBoardViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = LeaderBoard.objects.all().order_by("rank")
+    # Rows with rank 0 are waiting for the next rank refresh
+    queryset = LeaderBoard.objects.filter(rank__gt=0).order_by("rank")
     serializer_class = LeaderBoardSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["time_period", "branch", "sub_branch"]
+
+    def get_queryset(self):
+        # Closed periods are served from the archive
+        return super().get_queryset().filter(LeaderBoard.current_filter())
+
+    def _live_board_params(self):
+        params = self.request.query_params
+        time_period = params.get("time_period", "ALL_TIME")
+        if time_period not in dict(LeaderBoard.TIME_PERIOD_CHOICES):
+            raise ValidationError({"time_period": "Unknown time period."})
+        try:
+            branch_id = int(params["branch"])
+            sub_branch_id = int(params.get("sub_branch") or 0) or None
+        except (KeyError, ValueError):
+            raise ValidationError(
+                {"branch": "branch is required; branch and sub_branch are ids."}
+            ) from None
+        return time_period, branch_id, sub_branch_id
+
+    def _live_response(self, ranked, board):
+        """Serialize live [(rank, user_id, score)] rows with their stored entries."""
+        time_period, branch_id, sub_branch_id = board
+        entries = {
+            entry.user_id: entry
+            for entry in LeaderBoard.objects.filter(
+                time_period=time_period,
+                period_start=LeaderBoard.current_period_start(time_period),
+                branch_id=branch_id,
+                sub_branch_id=sub_branch_id,
+                user_id__in=[user_id for _, user_id, _ in ranked],
+            ).select_related("user__profile")
+        }
+        results = []
+        for rank, user_id, _ in ranked:
+            entry = entries.get(user_id)
+            if entry is None:
+                continue
+            data = LeaderBoardSerializer(entry, context={"request": self.request}).data
+            data["rank"] = rank
+            results.append(data)
+        return Response({"results": results})
+
+    @action(detail=False, methods=["get"])
+    def live(self, request):
+        """
+        Live top of a board. Query params: branch (required), sub_branch,
+        time_period (default ALL_TIME), limit (default 10).
+        """
+        board = self._live_board_params()
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 100)
+        except ValueError:
+            raise ValidationError({"limit": "limit must be an integer."}) from None
+        return self._live_response(LeaderBoard.live_top(*board, limit=limit), board)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="around-me",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def around_me(self, request):
+        """
+        The current user's live neighbourhood on a board; same query params
+        as live, with radius (default 5) instead of limit.
+        """
+        board = self._live_board_params()
+        try:
+            radius = min(max(int(request.query_params.get("radius", 5)), 0), 50)
+        except ValueError:
+            raise ValidationError({"radius": "radius must be an integer."}) from None
+        ranked = LeaderBoard.live_around(request.user.id, *board, radius=radius)
+        return self._live_response(ranked, board)
+
+    @action(detail=False, methods=["get"])
+    def history(self, request):
+        """
+        Final standings of a closed period. Same query params as live, with
+        period_start (default: the latest archived period) instead of
+        time_period defaulting to ALL_TIME, which never closes.
+        """
+        time_period, branch_id, sub_branch_id = self._live_board_params()
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 100)
+            period_start = request.query_params.get("period_start")
+            period_start = period_start and date.fromisoformat(period_start)
+        except ValueError:
+            raise ValidationError(
+                {"detail": "limit must be an integer, period_start a date."}
+            ) from None
+        period_start = period_start or LeaderBoardArchive.latest_period_start(
+            time_period, branch_id, sub_branch_id
+        )
+        entries = (
+            LeaderBoardArchive.objects.filter(
+                time_period=time_period,
+                period_start=period_start,
+                branch_id=branch_id,
+                sub_branch_id=sub_branch_id,
+            )
+            .select_related("user__profile")
+            .order_by("rank")[:limit]
+            if period_start
+            else []
+        )
+        return Response(
+            {
+                "period_start": period_start,
+                "results": LeaderBoardArchiveSerializer(entries, many=True).data,
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="my-history",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def my_history(self, request):
+        """
+        The current user's archived standings, latest first. Optional
+        filters: time_period, branch, sub_branch; limit (default 12).
+        """
+        entries = LeaderBoardArchive.objects.filter(user=request.user)
+        params = request.query_params
+        try:
+            limit = min(max(int(params.get("limit", 12)), 1), 100)
+            for field in ("branch", "sub_branch"):
+                if params.get(field):
+                    entries = entries.filter(**{f"{field}_id": int(params[field])})
+        except ValueError:
+            raise ValidationError(
+                {"detail": "limit, branch and sub_branch must be integers."}
+            ) from None
+        if params.get("time_period"):
+            entries = entries.filter(time_period=params["time_period"])
+        entries = entries.select_related("user__profile").order_by(
+            "-period_start", "sub_branch_id"
+        )[:limit]
+        return Response(LeaderBoardArchiveSerializer(entries, many=True).data)
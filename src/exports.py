@@ -0,0 +1,333 @@
+"""
+CSV exports of the moderation dashboard tables.
+
+Rows are read with ``values_list`` projections through ``.iterator()``, so
+neither the streamed download nor the background job holds more than one
+chunk of the table in memory. ``EXPORTS`` maps an export name to its file
+name, header and row generator; filters come from the dashboard list's
+query string and are checked by ``clean_params`` before any row is sent. Files are written outside MEDIA_ROOT, under
+EXPORTS_ROOT/<user id>/, and only served back to the staff member who
+asked for them through the dashboard download view.
+"""
+
+import csv
+import gzip
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
+from django.utils import timezone
+
+from src.models import Contribution, Notification, Question, QuestionReport
+
+EXPORT_CHUNK_SIZE = 2000
+
+# CSV export string length limits
+CSV_QUESTION_TEXT_LIMIT = 200
+CSV_SHORT_TEXT_LIMIT = 100
+
+# Filters that must be whole numbers
+INTEGER_PARAMS = ("month", "year", "category")
+
+
+def clean_params(params):
+    """
+    Export filters as a plain dict with the numeric ones converted, so bad
+    input fails before a response starts. Raises ValueError.
+    """
+    cleaned = {key: value for key, value in params.items() if value}
+    for key in INTEGER_PARAMS:
+        if key in cleaned:
+            try:
+                cleaned[key] = int(cleaned[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be a whole number.") from None
+    return cleaned
+
+
+def _timestamp(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else ""
+
+
+def _contribution_rows(params):
+    contributions = Contribution.objects.order_by("-created_at")
+    if params.get("status"):
+        contributions = contributions.filter(status=params["status"])
+    if params.get("month"):
+        contributions = contributions.filter(contribution_month=params["month"])
+    if params.get("year"):
+        contributions = contributions.filter(contribution_year=params["year"])
+
+    for (
+        pk,
+        username,
+        email,
+        question_id,
+        question_text,
+        category,
+        status,
+        month,
+        year,
+        is_featured,
+        created_at,
+        approval_date,
+        public_date,
+        rejection_reason,
+    ) in contributions.values_list(
+        "id",
+        "user__username",
+        "user__email",
+        "question_id",
+        "question__question_text_en",
+        "question__category__name_en",
+        "status",
+        "contribution_month",
+        "contribution_year",
+        "is_featured",
+        "created_at",
+        "approval_date",
+        "public_date",
+        "rejection_reason",
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [
+            pk,
+            username,
+            email,
+            question_id,
+            question_text[:CSV_SHORT_TEXT_LIMIT],
+            category or "",
+            status,
+            month,
+            year,
+            is_featured,
+            _timestamp(created_at),
+            _timestamp(approval_date),
+            _timestamp(public_date),
+            rejection_reason or "",
+        ]
+
+
+def _question_rows(params):
+    questions = Question.objects.order_by("-created_at")
+    if params.get("status"):
+        questions = questions.filter(status=params["status"])
+    if params.get("category"):
+        questions = questions.filter(category_id=params["category"])
+    if params.get("difficulty"):
+        questions = questions.filter(difficulty_level=params["difficulty"])
+
+    for (
+        pk,
+        text_en,
+        text_np,
+        category,
+        difficulty,
+        status,
+        is_public,
+        is_verified,
+        attempted,
+        correct,
+        reported_count,
+        created_by,
+        created_at,
+    ) in questions.values_list(
+        "id",
+        "question_text_en",
+        "question_text_np",
+        "category__name_en",
+        "difficulty_level",
+        "status",
+        "is_public",
+        "is_verified",
+        "times_attempted",
+        "times_correct",
+        "reported_count",
+        "created_by__username",
+        "created_at",
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        accuracy = correct / attempted * 100 if attempted else 0.0
+        yield [
+            pk,
+            text_en[:CSV_QUESTION_TEXT_LIMIT],
+            text_np[:CSV_QUESTION_TEXT_LIMIT],
+            category or "",
+            difficulty or "",
+            status,
+            is_public,
+            is_verified,
+            attempted,
+            correct,
+            f"{accuracy:.2f}",
+            reported_count,
+            created_by or "System",
+            _timestamp(created_at),
+        ]
+
+
+def _report_rows(params):
+    reports = QuestionReport.objects.order_by("-created_at")
+    if params.get("status"):
+        reports = reports.filter(status=params["status"])
+    if params.get("reason"):
+        reports = reports.filter(reason=params["reason"])
+
+    reasons = dict(QuestionReport.REASON_CHOICES)
+    statuses = dict(QuestionReport.STATUS_CHOICES)
+    for (
+        pk,
+        question_id,
+        question_text,
+        reason,
+        description,
+        status,
+        reported_by,
+        reviewed_by,
+        admin_notes,
+        created_at,
+        resolved_at,
+    ) in reports.values_list(
+        "id",
+        "question_id",
+        "question__question_text_en",
+        "reason",
+        "description",
+        "status",
+        "reported_by__username",
+        "reviewed_by__username",
+        "admin_notes",
+        "created_at",
+        "resolved_at",
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [
+            pk,
+            question_id,
+            question_text[:CSV_SHORT_TEXT_LIMIT],
+            reasons.get(reason, reason),
+            description[:CSV_QUESTION_TEXT_LIMIT],
+            statuses.get(status, status),
+            reported_by or "Anonymous",
+            reviewed_by or "",
+            admin_notes or "",
+            _timestamp(created_at),
+            _timestamp(resolved_at),
+        ]
+
+
+# name -> (file name, header, row generator)
+EXPORTS = {
+    "contributions": (
+        "contributions_export.csv",
+        [
+            "ID",
+            "Contributor",
+            "Email",
+            "Question ID",
+            "Question (EN)",
+            "Category",
+            "Status",
+            "Month",
+            "Year",
+            "Is Featured",
+            "Created At",
+            "Approval Date",
+            "Public Date",
+            "Rejection Reason",
+        ],
+        _contribution_rows,
+    ),
+    "questions": (
+        "questions_export.csv",
+        [
+            "ID",
+            "Question (EN)",
+            "Question (NP)",
+            "Category",
+            "Difficulty",
+            "Status",
+            "Is Public",
+            "Is Verified",
+            "Times Attempted",
+            "Times Correct",
+            "Accuracy %",
+            "Reported Count",
+            "Created By",
+            "Created At",
+        ],
+        _question_rows,
+    ),
+    "reports": (
+        "reports_export.csv",
+        [
+            "ID",
+            "Question ID",
+            "Question Text",
+            "Reason",
+            "Description",
+            "Status",
+            "Reported By",
+            "Reviewed By",
+            "Admin Notes",
+            "Created At",
+            "Resolved At",
+        ],
+        _report_rows,
+    ),
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(name, params):
+    """Header and rows of an export as CSV-formatted lines, lazily."""
+    _, header, rows = EXPORTS[name]
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows(params):
+        yield writer.writerow(row)
+
+
+def export_storage():
+    """Private storage of finished exports; it has no public URL."""
+    return FileSystemStorage(location=settings.EXPORTS_ROOT, base_url=None)
+
+
+def export_path(user_id, filename):
+    return f"{user_id}/{filename}"
+
+
+def write_export(name, params, user_id):
+    """
+    Write an export as gzip CSV to the user's export folder; returns its
+    file name.
+    """
+    params = clean_params(params)
+    filename = EXPORTS[name][0]
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M%S")
+    path = export_path(user_id, f"{filename.removesuffix('.csv')}-{stamp}.csv.gz")
+    with tempfile.TemporaryFile() as tmp:
+        with gzip.open(tmp, "wt", encoding="utf-8", newline="") as archive:
+            archive.writelines(csv_lines(name, params))
+        tmp.seek(0)
+        return export_storage().save(path, File(tmp)).rpartition("/")[2]
+
+
+def export_and_notify(name, params, user_id):
+    """Run an export in the background and tell the requesting user where it is."""
+    filename = write_export(name, params, user_id)
+    Notification.objects.create(
+        user_id=user_id,
+        notification_type="GENERAL",
+        title_en="Export ready",
+        title_np="निर्यात तयार छ",
+        message_en=f"Your {name} export is ready to download.",
+        message_np=f"तपाईंको {name} निर्यात डाउनलोडका लागि तयार छ।",
+        action_url=reverse("dashboard:download_export", args=[filename]),
+    )
+    return filename
@@ -9,16 +9,10 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write("Checking badges for all users...")
 
-        stats = UserStatistics.objects.all()
-        count = 0
-
-        for stat in stats:
-            # check_badge_eligibility() saves if changes are made
-            stat.check_badge_eligibility()
-            count += 1
-            if count % 100 == 0:
-                self.stdout.write(f"Processed {count} users...")
+        awarded = UserStatistics.award_badges()
+        for name, count in awarded.items():
+            self.stdout.write(f"  - {name}: {count} awarded")
 
         self.stdout.write(
-            self.style.SUCCESS(f"Finished checking badges for {count} users.")
+            self.style.SUCCESS(f"Finished awarding {sum(awarded.values())} badges.")
         )
@@ -1,50 +1,55 @@
 from django.core.management.base import BaseCommand
-from django.db.models import Q
 
-from src.models import Question
+from src.models import Question, QuestionSignature
 
 
 class Command(BaseCommand):
     help = "Scans for questions with similar text to detect duplicates"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.7,
+            help="Minimum estimated similarity (0-1) to report a pair",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Include non-public questions",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Scanning for potential duplicates...")
 
-        questions = Question.objects.filter(status="PUBLIC")
-        # Naive implementation: O(N^2) roughly, suitable for small batch or offline analysis.
-        # For production with many questions, use Postgres Trigram search or separate search index.
-
-        checked_ids = set()
-        duplicates_found = 0
-
-        for q1 in questions:
-            if q1.id in checked_ids:
-                continue
+        # Questions saved before signatures existed are indexed first
+        indexed = QuestionSignature.index_missing()
+        if indexed:
+            self.stdout.write(f"Indexed {indexed} questions.")
 
-            # Check against others
-            # Optimally we only check those created recently vs all?
-            # Or just check exact string matches or containment
+        question_ids = None
+        if not options["all"]:
+            question_ids = Question.objects.filter(status="PUBLIC").values("id")
 
-            # Using basic text matching for now as placeholder for advanced logic
-            similar = Question.objects.filter(
-                Q(question_text_en__icontains=q1.question_text_en)
-                | Q(question_text_en__iexact=q1.question_text_en)
-            ).exclude(id=q1.id)
-
-            for q2 in similar:
-                if q2.id in checked_ids:
-                    continue
+        pairs = QuestionSignature.find_duplicate_pairs(
+            options["threshold"], question_ids=question_ids
+        )
+        texts = dict(
+            Question.objects.filter(
+                id__in={qid for pair in pairs for qid in pair[:2]}
+            ).values_list("id", "question_text_en")
+        )
 
-                self.stdout.write(
-                    self.style.WARNING(f"Potential Duplicate: Q{q1.id} vs Q{q2.id}")
+        for q1, q2, score in pairs:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Potential Duplicate: Q{q1} vs Q{q2} ({score:.0%} similar)"
                 )
-                self.stdout.write(f"Text: {q1.question_text_en[:50]}...")
-                duplicates_found += 1
-
-            checked_ids.add(q1.id)
+            )
+            self.stdout.write(f"Text: {texts.get(q1, '')[:50]}...")
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Scan complete. Found {duplicates_found} potential duplicates."
+                f"Scan complete. Found {len(pairs)} potential duplicates."
             )
         )
@@ -3,6 +3,8 @@ Management command to create daily activity snapshot.
 Run daily at midnight via Celery or cron.
 """
 
+from datetime import datetime
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
@@ -19,27 +21,42 @@ class Command(BaseCommand):
             default=None,
             help="Date to record activity for (YYYY-MM-DD, default: today)",
         )
+        parser.add_argument(
+            "--end-date",
+            type=str,
+            default=None,
+            help="Backfill every day from --date to this date (YYYY-MM-DD)",
+        )
 
     def handle(self, *args, **options):
-        date_str = options["date"]
-
-        if date_str:
-            try:
-                from datetime import datetime
+        try:
+            target_date = (
+                datetime.strptime(options["date"], "%Y-%m-%d").date()
+                if options["date"]
+                else timezone.localdate()
+            )
+            end_date = (
+                datetime.strptime(options["end_date"], "%Y-%m-%d").date()
+                if options["end_date"]
+                else target_date
+            )
+        except ValueError:
+            self.stdout.write(self.style.ERROR("Invalid date format. Use YYYY-MM-DD."))
+            return
+        if end_date < target_date:
+            self.stdout.write(self.style.ERROR("--end-date is before --date."))
+            return
 
-                target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            except ValueError:
-                self.stdout.write(
-                    self.style.ERROR("Invalid date format. Use YYYY-MM-DD.")
-                )
-                return
-        else:
-            target_date = timezone.now().date()
+        if end_date > target_date:
+            self.stdout.write(
+                f"Backfilling daily activity {target_date}..{end_date}..."
+            )
+            count = DailyActivity.backfill(target_date, end_date)
+            self.stdout.write(self.style.SUCCESS(f"{count} days recorded."))
+            return
 
         self.stdout.write(f"Recording daily activity for {target_date}...")
-
-        # Use the model's static method
-        DailyActivity.record_today_activity()
+        DailyActivity.backfill(target_date, target_date)
 
         activity = DailyActivity.objects.filter(date=target_date).first()
         if activity:
@@ -46,24 +46,18 @@ class Command(BaseCommand):
         else:
             periods = [period]
 
-        total_recalculated = 0
-
-        for branch in branches:
-            for time_period in periods:
-                self.stdout.write(
-                    f"Recalculating {time_period} leaderboard for {branch.name_en}..."
-                )
-                LeaderBoard.recalculate_rankings(time_period, branch=branch)
-                total_recalculated += 1
-
-                # Count entries
-                count = LeaderBoard.objects.filter(
-                    time_period=time_period, branch=branch
-                ).count()
-                self.stdout.write(f"  - {count} entries created/updated")
+        result = LeaderBoard.recalculate_all(
+            periods, branch_ids=list(branches.values_list("id", flat=True))
+        )
 
+        for stage, seconds in result["timings"].items():
+            self.stdout.write(f"  {stage}: {seconds:.3f}s")
+        self.stdout.write(
+            f"  - {result['created']} entries created, {result['updated']} updated,"
+            f" {result['deleted']} removed"
+        )
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully recalculated {total_recalculated} leaderboards."
+                f"Successfully recalculated {result['boards']} leaderboards."
             )
         )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from src.models import UserProgress
+
+
+class Command(BaseCommand):
+    help = "Recomputes per-category mastery scores and weak topics"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only this user id (repeatable)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Recomputing mastery...")
+
+        written = UserProgress.recompute_mastery(
+            user_ids=options["user_ids"], chunk_size=options["chunk_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated mastery on {written} progress records.")
+        )
@@ -2,7 +2,6 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from src.models.analytics import DailyActivity, LeaderBoard
-from src.models.branch import Branch
 from src.models.platform_stats import PlatformStats
 
 
@@ -67,21 +66,22 @@ class Command(BaseCommand):
     def run_rankings_tasks(self):
         self.stdout.write("Recalculating Rankings...")
 
-        # We need to iterate over branches for accurate leaderboards
-        branches = Branch.objects.filter(is_active=True)
+        # Every branch and sub-branch board comes from one pass over attempts
         periods = [
             "WEEKLY",
             "MONTHLY",
         ]  # ALL_TIME might be too heavy or run less frequently
 
-        for branch in branches:
-            for period in periods:
-                self.stdout.write(f"Processing {period} for {branch.name_en}...")
-                try:
-                    LeaderBoard.recalculate_rankings(time_period=period, branch=branch)
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f"Error for {branch.name_en} {period}: {e}")
-                    )
+        try:
+            result = LeaderBoard.recalculate_all(periods)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Failed to recalculate rankings: {e}"))
+            return
 
-        self.stdout.write(self.style.SUCCESS("Rankings recalculation complete"))
+        for stage, seconds in result["timings"].items():
+            self.stdout.write(f"  {stage}: {seconds:.3f}s")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rankings recalculation complete ({result['boards']} boards)"
+            )
+        )
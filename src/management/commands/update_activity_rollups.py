@@ -0,0 +1,34 @@
+"""
+Management command to fold new activity into the dashboard rollups.
+Runs every few minutes via Celery; --rebuild recomputes all history.
+"""
+
+from django.core.management.base import BaseCommand
+
+from src.models import ActivityRollup
+
+
+class Command(BaseCommand):
+    help = "Updates the hourly/daily/weekly/monthly activity rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop the rollups and recompute them from the source tables",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            self.stdout.write("Rebuilding activity rollups...")
+            chunks = ActivityRollup.rebuild()
+        else:
+            self.stdout.write("Updating activity rollups...")
+            chunks = ActivityRollup.process_pending()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{chunks} chunks folded, rollups current up to "
+                f"{ActivityRollup.high_water_mark()}"
+            )
+        )
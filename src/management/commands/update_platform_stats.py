@@ -5,13 +5,25 @@ Run hourly via Celery or cron.
 
 from django.core.management.base import BaseCommand
 
-from src.models import PlatformStats
+from src.models import PlatformCounter, PlatformStats
 
 
 class Command(BaseCommand):
     help = "Updates platform-wide statistics counters"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reconcile",
+            action="store_true",
+            help="Recount the counters from the source tables first",
+        )
+
     def handle(self, *args, **options):
+        if options["reconcile"]:
+            self.stdout.write("Reconciling platform counters...")
+            count = PlatformCounter.reconcile()
+            self.stdout.write(f"  - {count} counters recounted")
+
         self.stdout.write("Updating platform statistics...")
 
         PlatformStats.scheduled_update()
@@ -1,35 +1,59 @@
-from .analytics import Contribution, DailyActivity, LeaderBoard
+from .analytics import (
+    ActivityRollup,
+    ActivityRollupUser,
+    Contribution,
+    DailyActivity,
+    LeaderBoard,
+    LeaderBoardArchive,
+)
 from .app_settings import AppSettings
-from .attempt_answer import UserAnswer, UserAttempt
+from .attempt_answer import AnswerStatsEvent, AttemptResult, UserAnswer, UserAttempt
 from .branch import Branch, Category, SubBranch
+from .dedup import QuestionLSHBucket, QuestionSignature
 from .mocktest import MockTest, MockTestQuestion
 from .notification import Notification
-from .platform_stats import PlatformStats
+from .platform_stats import PlatformCounter, PlatformStats
 from .question_answer import Answer, Question, QuestionReport
 from .time_config import TimeConfiguration
 from .user import UserProfile
-from .user_stats import StudyCollection, UserProgress, UserStatistics
+from .user_stats import (
+    ActivityBitmap,
+    StudyCollection,
+    UserProgress,
+    UserStatistics,
+    UserSummary,
+)
 
 __all__ = [
+    "ActivityRollup",
+    "ActivityRollupUser",
     "Contribution",
     "DailyActivity",
     "LeaderBoard",
+    "LeaderBoardArchive",
     "AppSettings",
+    "AnswerStatsEvent",
+    "AttemptResult",
     "UserAnswer",
     "UserAttempt",
     "Branch",
     "Category",
     "SubBranch",
+    "QuestionLSHBucket",
+    "QuestionSignature",
     "MockTest",
     "MockTestQuestion",
     "Notification",
+    "PlatformCounter",
     "PlatformStats",
     "Answer",
     "Question",
     "QuestionReport",
     "TimeConfiguration",
     "UserProfile",
+    "ActivityBitmap",
     "StudyCollection",
     "UserProgress",
     "UserStatistics",
+    "UserSummary",
 ]
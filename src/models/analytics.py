@@ -1,13 +1,23 @@
-from datetime import timedelta
+import logging
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 
+from django.core.cache import cache
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import Count
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
 from django.utils import timezone
 
+from src.models.app_settings import AppSettings
 from src.models.attempt_answer import UserAnswer, UserAttempt
 from src.models.question_answer import Question
 from src.models.user import User as CustomUser
+from src.ranking import get_ranking_backend, window
+
+logger = logging.getLogger(__name__)
 
 
 class Contribution(models.Model):
@@ -84,6 +94,115 @@ class Contribution(models.Model):
         self.question.status = "PUBLIC"
         self.question.save(update_fields=["is_public", "status"])
 
+    @staticmethod
+    def _transition_many(queryset, from_status, **changes):
+        """
+        Move the contributions of a queryset that are in from_status with one
+        UPDATE. Returns (id, user_id, question_id, question text) per row.
+        """
+        with transaction.atomic():
+            rows = list(
+                queryset.filter(status=from_status)
+                .select_for_update(of=("self",))
+                .values_list(
+                    "id", "user_id", "question_id", "question__question_text_en"
+                )
+                .order_by()
+            )
+            if rows:
+                Contribution.objects.filter(pk__in=[row[0] for row in rows]).update(
+                    **changes
+                )
+        return rows
+
+    @staticmethod
+    def approve_many(queryset):
+        """
+        Set-based approve_contribution with one notification insert; the
+        per-row post_save side effects are applied here instead.
+        Returns the number approved.
+        """
+        from src.models.notification import Notification
+
+        rows = Contribution._transition_many(
+            queryset, "PENDING", status="APPROVED", approval_date=timezone.now()
+        )
+        Notification.send_many(
+            [
+                Notification(
+                    user_id=user_id,
+                    notification_type="CONTRIBUTION_APPROVED",
+                    title_en="Contribution Approved",
+                    title_np="योगदान स्वीकृत भयो",
+                    message_en=f"Your question '{text[:30]}...' has been approved!",
+                    message_np=f"तपाईंको प्रश्न '{text[:30]}...' स्वीकृत भएको छ!",
+                    related_question_id=question_id,
+                )
+                for _, user_id, question_id, text in rows
+            ]
+        )
+        return len(rows)
+
+    @staticmethod
+    def reject_many(queryset, reason):
+        """Set-based reject_contribution; returns the number rejected."""
+        from src.models.notification import Notification
+
+        rows = Contribution._transition_many(
+            queryset, "PENDING", status="REJECTED", rejection_reason=reason
+        )
+        Notification.send_many(
+            [
+                Notification(
+                    user_id=user_id,
+                    notification_type="GENERAL",
+                    title_en="Contribution Not Approved",
+                    title_np="योगदान स्वीकृत भएन",
+                    message_en=f"Your question was not approved. Reason: {reason}",
+                    message_np=f"तपाईंको प्रश्न स्वीकृत भएन। कारण: {reason}",
+                    related_question_id=question_id,
+                )
+                for _, user_id, question_id, _ in rows
+            ]
+        )
+        return len(rows)
+
+    @staticmethod
+    def make_public_many(queryset, publish_questions=True):
+        """
+        Set-based make_public: approved contributions and their questions
+        are published with bulk UPDATEs. Pass publish_questions=False when
+        the questions are already public. Returns the number published.
+        """
+        from src.models.notification import Notification
+
+        # Contributions and their questions go public together or not at all
+        with transaction.atomic():
+            rows = Contribution._transition_many(
+                queryset, "APPROVED", status="MADE_PUBLIC", public_date=timezone.now()
+            )
+            if rows and publish_questions:
+                Question.set_status_many(
+                    Question.objects.filter(pk__in=[row[2] for row in rows]),
+                    "PUBLIC",
+                    is_public=True,
+                )
+            Notification.send_many(
+                [
+                    Notification(
+                        user_id=user_id,
+                        notification_type="QUESTION_PUBLIC",
+                        title_en="Your Question is Now Public!",
+                        title_np="तपाईंको प्रश्न अब सार्वजनिक छ!",
+                        message_en="Congratulations! Your contributed question is now available.",
+                        message_np="बधाई छ! तपाईंको योगदान गरिएको प्रश्न अब उपलब्ध छ।",
+                        related_question_id=question_id,
+                    )
+                    for _, user_id, question_id, _ in rows
+                ]
+            )
+        return len(rows)
+
     def feature_for_social(self):
         self.is_featured = True
         self.save(update_fields=["is_featured"])
@@ -139,10 +258,23 @@ class DailyActivity(models.Model):
         return f"Activity: {self.date}"
 
     @staticmethod
-    def get_activity_range(start_date, end_date):
-        return DailyActivity.objects.filter(
+    def get_activity_range(start_date, end_date, fill_missing=False):
+        """
+        Rows between two dates. With fill_missing, days without a row are
+        computed first, so a missed snapshot does not show up as zeros.
+        """
+        activities = DailyActivity.objects.filter(
             date__range=[start_date, end_date]
         ).order_by("date")
+        if fill_missing and activities.count() < (end_date - start_date).days + 1:
+            recorded = set(activities.values_list("date", flat=True))
+            missing = [
+                start_date + timedelta(days=i)
+                for i in range((end_date - start_date).days + 1)
+                if start_date + timedelta(days=i) not in recorded
+            ]
+            DailyActivity.backfill(missing[0], missing[-1])
+        return activities
 
     @staticmethod
     def get_trend_data(last_n_days=7):
@@ -152,44 +284,118 @@ class DailyActivity(models.Model):
         start_date = end_date - timedelta(days=last_n_days)
         return DailyActivity.get_activity_range(start_date, end_date)
 
+    @staticmethod
+    def backfill(start_date, end_date):
+        """
+        Compute and upsert the rows of every day from start_date to end_date
+        (inclusive, local dates). Each source table is read once, grouped by
+        day. Returns the number of rows written.
+        """
+        tz = timezone.get_current_timezone()
+        since = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+        until = timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        )
+
+        def per_day(queryset, field):
+            return dict(
+                queryset.filter(**{f"{field}__gte": since, f"{field}__lt": until})
+                .annotate(day=TruncDate(field, tzinfo=tz))
+                .values_list("day")
+                .annotate(count=Count("id"))
+                .order_by()
+            )
+
+        def users_per_day(queryset, field, user_field):
+            rows = (
+                queryset.filter(**{f"{field}__gte": since, f"{field}__lt": until})
+                .annotate(day=TruncDate(field, tzinfo=tz))
+                .values_list("day", user_field)
+                .distinct()
+                .order_by()
+            )
+            return set(rows)
+
+        counts = {
+            "new_users": per_day(CustomUser.objects.all(), "date_joined"),
+            "questions_added": per_day(Question.objects.all(), "created_at"),
+            # Approximate approval time
+            "questions_approved": per_day(
+                Question.objects.filter(status="PUBLIC"), "updated_at"
+            ),
+            "mock_tests_taken": per_day(UserAttempt.objects.all(), "start_time"),
+            "total_answers_submitted": per_day(UserAnswer.objects.all(), "created_at"),
+        }
+        # Distinct users who started an attempt or answered a question
+        active = defaultdict(int)
+        for day, _ in users_per_day(
+            UserAttempt.objects.all(), "start_time", "user_id"
+        ) | users_per_day(
+            UserAnswer.objects.all(), "created_at", "user_attempt__user_id"
+        ):
+            active[day] += 1
+        counts["active_users"] = active
+
+        rows = []
+        day = start_date
+        while day <= end_date:
+            rows.append(
+                DailyActivity(
+                    date=day,
+                    **{field: by_day.get(day, 0) for field, by_day in counts.items()},
+                )
+            )
+            day += timedelta(days=1)
+        DailyActivity.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=list(counts),
+            batch_size=500,
+        )
+        return len(rows)
+
     @staticmethod
     def record_today_activity():
-        today = timezone.now().date()
-        date_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # Create or update record for today
-        activity, created = DailyActivity.objects.get_or_create(date=today)
-
-        # Update counts
-        activity.new_users = CustomUser.objects.filter(
-            date_joined__gte=date_start
-        ).count()
-        activity.questions_added = Question.objects.filter(
-            created_at__gte=date_start
-        ).count()
-        activity.questions_approved = Question.objects.filter(
-            updated_at__gte=date_start,
-            status="PUBLIC",  # Approximate approval time
-        ).count()
-        activity.mock_tests_taken = UserAttempt.objects.filter(
-            start_time__gte=date_start
-        ).count()
-        activity.total_answers_submitted = UserAnswer.objects.filter(
-            created_at__gte=date_start
-        ).count()
-
-        # Active users approximation (users who logged in today)
-        activity.active_users = CustomUser.objects.filter(
-            last_login__gte=date_start
-        ).count()
-
-        activity.save()
+        """Refresh today's row, and yesterday's now that it is complete."""
+        today = timezone.localdate()
+        return DailyActivity.backfill(today - timedelta(days=1), today)
+
+
+# When LeaderBoard.refresh_dirty_rankings last ran
+RANKED_AT_CACHE_KEY = "leaderboard:ranked_at"
+
+# Weekly boards start on Sunday, the first working day in Nepal (date.weekday())
+WEEK_START = 6
+# AppSettings keys: "AD" or "BS" monthly boards, and the BS month table as a
+# JSON list of the ISO dates on which BS months begin, in order
+CALENDAR_SETTING = "leaderboard_calendar"
+BS_MONTH_STARTS_SETTING = "bs_month_starts"
+CALENDAR_CACHE_KEY = "leaderboard:calendar"
+CALENDAR_CACHE_TIMEOUT = 60 * 60
+
+
+def _month_calendar():
+    """("AD", None) or ("BS", sorted month start dates), cached."""
+    config = cache.get(CALENDAR_CACHE_KEY)
+    if config is None:
+        calendar = AppSettings.get_setting(CALENDAR_SETTING, "AD")
+        starts = None
+        if calendar == "BS":
+            starts = sorted(
+                date.fromisoformat(day)
+                for day in AppSettings.get_json_setting(BS_MONTH_STARTS_SETTING, [])
+            )
+        config = (calendar, starts)
+        cache.set(CALENDAR_CACHE_KEY, config, CALENDAR_CACHE_TIMEOUT)
+    return config
 
 
 class LeaderBoard(models.Model):
     """
     Tracks user rankings by time period, branch, and sub-branch
-    Regenerated via scheduled cron jobs
+    Scores are folded in as attempts complete; ranks are refreshed in bulk
+    Rows of closed periods are moved to LeaderBoardArchive
     """
 
     TIME_PERIOD_CHOICES = [
@@ -202,6 +408,9 @@ class LeaderBoard(models.Model):
         CustomUser, on_delete=models.CASCADE, related_name="leaderboard_entries"
     )
     time_period = models.CharField(max_length=20, choices=TIME_PERIOD_CHOICES)
+    period_start = models.DateField(
+        null=True, blank=True, help_text="First day of the period, empty for ALL_TIME"
+    )
     branch = models.ForeignKey(
         "Branch", on_delete=models.CASCADE, related_name="leaderboard_entries"
     )
@@ -234,122 +443,398 @@ class LeaderBoard(models.Model):
         db_table = "leaderboards"
         verbose_name = "LeaderBoard Entry"
         verbose_name_plural = "LeaderBoard Entries"
-        unique_together = [["user", "time_period", "branch", "sub_branch"]]
+        unique_together = [
+            ["user", "time_period", "period_start", "branch", "sub_branch"]
+        ]
         ordering = ["time_period", "branch", "rank"]
         indexes = [
-            models.Index(fields=["time_period", "branch", "rank"]),
+            models.Index(fields=["time_period", "period_start", "branch", "rank"]),
             models.Index(fields=["user", "time_period"]),
+            models.Index(fields=["last_updated"]),
         ]
 
     def __str__(self):
         return f"#{self.rank} - {self.user.username} ({self.get_time_period_display()})"
 
-    @classmethod
-    def update_score(cls, user, branch, score_delta):
+    @staticmethod
+    def record_attempt(attempt):
         """
-        Increment incrementally update scores for relevant leaderboards
+        Fold a completed attempt into every board it counts towards: each
+        period, branch-wide and (if set) for its sub-branch. Only this user's
+        rows are written; live boards move at once, stored ranks are
+        refreshed by refresh_dirty_rankings.
         """
-        item, _ = cls.objects.get_or_create(
-            user=user,
-            branch=branch,
-            time_period="ALL_TIME",
-            defaults={
-                "rank": 0,
-                "total_score": 0,
-                "tests_completed": 0,
-                "accuracy_percentage": 0,
-            },
-        )
-        item.total_score += score_delta
-        item.tests_completed += 1
-        item.save(update_fields=["total_score", "tests_completed"])
+        mock_test = attempt.mock_test
+        if not mock_test or not mock_test.branch_id:
+            return
 
-    @staticmethod
-    def recalculate_rankings(time_period, branch=None, sub_branch=None):
-        from django.db.models import Avg, Count, Sum
+        branch_id, sub_branch_id = mock_test.branch_id, mock_test.sub_branch_id
+        boards = [(period, None) for period, _ in LeaderBoard.TIME_PERIOD_CHOICES]
+        scope = Q(sub_branch__isnull=True)
+        if sub_branch_id:
+            boards += [(p, sub_branch_id) for p, _ in LeaderBoard.TIME_PERIOD_CHOICES]
+            scope |= Q(sub_branch_id=sub_branch_id)
+        starts = LeaderBoard.current_period_starts()
 
-        from src.models.attempt_answer import UserAttempt
+        score = attempt.score_obtained or 0
+        percentage = attempt.percentage or 0
+        with transaction.atomic():
+            rows = LeaderBoard.objects.filter(
+                scope,
+                LeaderBoard.current_filter(starts),
+                user_id=attempt.user_id,
+                branch_id=branch_id,
+            )
+            existing = set(rows.values_list("time_period", "sub_branch_id"))
+            rows.update(
+                total_score=F("total_score") + score,
+                # Running mean over the attempts in this board
+                accuracy_percentage=(
+                    F("accuracy_percentage") * F("tests_completed") + percentage
+                )
+                / (F("tests_completed") + 1),
+                tests_completed=F("tests_completed") + 1,
+                last_updated=timezone.now(),
+            )
+            LeaderBoard.objects.bulk_create(
+                LeaderBoard(
+                    user_id=attempt.user_id,
+                    time_period=period,
+                    period_start=starts[period],
+                    branch_id=branch_id,
+                    sub_branch_id=sub,
+                    rank=0,  # Unranked until the next refresh
+                    total_score=score,
+                    tests_completed=1,
+                    accuracy_percentage=percentage,
+                )
+                for period, sub in boards
+                if (period, sub) not in existing
+            )
 
-        # 1. Determine Date Range
-        end_date = timezone.now()
-        start_date = None
+        # Boards not loaded yet pick the new score up from the table on first use
+        backend = get_ranking_backend()
+        for period, sub in boards:
+            key = LeaderBoard.live_key(period, branch_id, sub)
+            if backend.exists(key):
+                backend.add_score(key, attempt.user_id, score)
 
-        if time_period == "WEEKLY":
-            start_date = end_date - timedelta(days=7)
-        elif time_period == "MONTHLY":
-            start_date = end_date - timedelta(days=30)
-        # ALL_TIME implies no start_date (None)
+    @staticmethod
+    def live_key(time_period, branch_id, sub_branch_id=None):
+        """Key of the open period's board; boards of closed periods go unused."""
+        start = LeaderBoard.current_period_start(time_period)
+        return f"leaderboard:{time_period}:{start}:{branch_id}:{sub_branch_id or 0}"
 
-        # 2. Fetch current rankings to cache previous rank
-        params = {"time_period": time_period}
-        if branch:
-            params["branch"] = branch
-        if sub_branch:
-            params["sub_branch"] = sub_branch
+    @staticmethod
+    def live_board(time_period, branch_id, sub_branch_id=None, reload=False):
+        """
+        Ranking backend and key of a board, loaded from this table when the
+        backend does not hold it yet (cold start, eviction, Redis flush).
+        """
+        backend = get_ranking_backend()
+        key = LeaderBoard.live_key(time_period, branch_id, sub_branch_id)
+        if reload or not backend.exists(key):
+            backend.load(
+                key,
+                LeaderBoard.objects.filter(
+                    time_period=time_period,
+                    period_start=LeaderBoard.current_period_start(time_period),
+                    branch_id=branch_id,
+                    sub_branch_id=sub_branch_id,
+                ).values_list("user_id", "total_score"),
+            )
+        return backend, key
 
-        old_entries = LeaderBoard.objects.filter(**params)
-        previous_ranks = {entry.user_id: entry.rank for entry in old_entries}
+    @staticmethod
+    def live_top(time_period, branch_id, sub_branch_id=None, limit=10):
+        """Top of a live board as [(rank, user_id, score)]."""
+        backend, key = LeaderBoard.live_board(time_period, branch_id, sub_branch_id)
+        return window(backend, key, 0, limit)
 
-        # Clear old entries for this specific period/context
-        old_entries.delete()
+    @staticmethod
+    def live_around(user_id, time_period, branch_id, sub_branch_id=None, radius=5):
+        """
+        The user's neighbourhood on a live board as [(rank, user_id, score)],
+        empty if the user is not on it.
+        """
+        backend, key = LeaderBoard.live_board(time_period, branch_id, sub_branch_id)
+        position = backend.position(key, user_id)
+        if position is None:
+            return []
+        start = max(0, position - radius)
+        return window(backend, key, start, position - start + radius + 1)
 
-        # 3. Aggregation
-        # Filter attempts
-        attempts = UserAttempt.objects.filter(status="COMPLETED")
-        if start_date:
-            attempts = attempts.filter(start_time__gte=start_date)
+    @staticmethod
+    def rerank(time_period, branch_id, sub_branch_id, period_start):
+        """
+        Recompute a board's ranks in a single UPDATE with a window function.
+        Only rows whose rank changes are written, and their old rank becomes
+        previous_rank. Returns the number of rows re-ranked.
+        """
+        table = LeaderBoard._meta.db_table
+        params = [time_period, branch_id]
+        scope_sql = []
+        for column, value in (
+            ("sub_branch_id", sub_branch_id),
+            ("period_start", period_start),
+        ):
+            if value is None:
+                scope_sql.append(f"{column} IS NULL")
+            else:
+                scope_sql.append(f"{column} = %s")
+                params.append(value)
 
-        # Filter by branch via MockTest relation
-        # Note: Attempts filter by MockTest which is related to Branch
-        if branch:
-            attempts = attempts.filter(mock_test__branch=branch)
-        if sub_branch:
-            attempts = attempts.filter(mock_test__sub_branch=sub_branch)
-
-        # Group by user and annotate
-        user_scores = (
-            attempts.values("user")
-            .annotate(
-                total_score=Sum("score_obtained"),
-                tests_completed=Count("id"),
-                avg_accuracy=Avg("percentage"),
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS lb
+                SET previous_rank = CASE WHEN lb.rank > 0
+                        THEN lb.rank ELSE lb.previous_rank END,
+                    rank = ranked.new_rank
+                FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        ORDER BY total_score DESC, accuracy_percentage DESC, user_id
+                    ) AS new_rank
+                    FROM {table}
+                    WHERE time_period = %s AND branch_id = %s
+                        AND {" AND ".join(scope_sql)}
+                ) AS ranked
+                WHERE lb.id = ranked.id AND lb.rank <> ranked.new_rank
+                """,
+                params,
             )
-            .order_by("-total_score", "-avg_accuracy")
+            return cursor.rowcount
+
+    @staticmethod
+    def refresh_dirty_rankings():
+        """
+        Re-rank every board with rows changed since the last refresh and
+        resync its live copy from the table. Returns the number of boards.
+        """
+        now = timezone.now()
+        since = cache.get(RANKED_AT_CACHE_KEY)
+        boards = LeaderBoard.objects.all()
+        if since is not None:
+            boards = boards.filter(last_updated__gte=since)
+        boards = boards.values_list(
+            "time_period", "branch_id", "sub_branch_id", "period_start"
         )
 
-        # 4. Bulk Create
-        new_entries = []
-        current_rank = 1
+        starts = LeaderBoard.current_period_starts()
+        refreshed = 0
+        for (
+            time_period,
+            branch_id,
+            sub_branch_id,
+            start,
+        ) in boards.distinct().order_by():
+            LeaderBoard.rerank(time_period, branch_id, sub_branch_id, start)
+            if start == starts[time_period]:
+                LeaderBoard.live_board(
+                    time_period, branch_id, sub_branch_id, reload=True
+                )
+            refreshed += 1
+        cache.set(RANKED_AT_CACHE_KEY, now, None)
+        return refreshed
+
+    @staticmethod
+    def period_bounds(time_period, day=None):
+        """
+        (start, end) dates of the calendar period containing ``day`` (default
+        today), end exclusive; None for ALL_TIME. Months are Nepali (BS)
+        months when configured and the BS month table covers the day.
+        """
+        day = day or timezone.localdate()
+        if time_period == "WEEKLY":
+            start = day - timedelta(days=(day.weekday() - WEEK_START) % 7)
+            return start, start + timedelta(days=7)
+        if time_period == "MONTHLY":
+            calendar, starts = _month_calendar()
+            if calendar == "BS":
+                i = bisect_right(starts, day)
+                if 0 < i < len(starts):
+                    return starts[i - 1], starts[i]
+                logger.warning("BS month table does not cover %s, using AD.", day)
+            start = day.replace(day=1)
+            return start, (start + timedelta(days=32)).replace(day=1)
+        return None
+
+    @staticmethod
+    def current_period_start(time_period):
+        bounds = LeaderBoard.period_bounds(time_period)
+        return bounds[0] if bounds else None
 
-        # We need a branch instance for the foreign key.
-        # If branch is None (e.g. Universal leaderboard not yet supported by schema fully, checking logic),
-        # schema says branch is mandatory. So we fallback or raise error.
-        # Assuming recalculate is called WITH a branch context as per schema constraint.
+    @staticmethod
+    def current_period_starts():
+        return {
+            period: LeaderBoard.current_period_start(period)
+            for period, _ in LeaderBoard.TIME_PERIOD_CHOICES
+        }
+
+    @staticmethod
+    def current_filter(starts=None):
+        """Q matching the rows of every period that is still open."""
+        starts = starts or LeaderBoard.current_period_starts()
+        match = Q()
+        for period, start in starts.items():
+            match |= Q(time_period=period, period_start=start)
+        return match
+
+    @staticmethod
+    def recalculate_rankings(time_period, branch=None, sub_branch=None):
+        """
+        Rebuild one period's boards for a branch (branch-wide and every
+        sub-branch), or only the given sub-branch's board.
+        """
+        # Boards are keyed by branch; there is no cross-branch board
         if not branch:
-            # If branch is None, we can't create LeaderBoard entries easily due to NOT NULL constraints
-            # unless we pick a default or loop through all branches.
-            # Ideally this method is called per branch.
-            return
+            return None
+        return LeaderBoard.recalculate_all(
+            [time_period],
+            branch_ids=[branch.id],
+            sub_branch_id=sub_branch.id if sub_branch else None,
+        )
 
-        for data in user_scores:
-            user_id = data["user"]
-            prev = previous_ranks.get(user_id)
+    @staticmethod
+    def recalculate_all(periods=None, branch_ids=None, sub_branch_id=None):
+        """
+        Rebuild every board of the given periods (default: all) for the given
+        branches (default: active ones) from a single grouped pass over
+        completed attempts. Sub-branch totals are folded into the branch-wide
+        boards in memory, so attempts are read once for all boards.
 
-            entry = LeaderBoard(
-                user_id=user_id,
-                time_period=time_period,
-                branch=branch,
-                sub_branch=sub_branch,
-                rank=current_rank,
-                previous_rank=prev,
-                total_score=data["total_score"] or 0,
-                tests_completed=data["tests_completed"] or 0,
-                accuracy_percentage=data["avg_accuracy"] or 0,
+        Rows are upserted and re-ranked inside one transaction, so readers see
+        either the old boards or the new ones. Returns row counts and the
+        seconds spent in each stage.
+        """
+        from src.models.attempt_answer import UserAttempt
+        from src.models.branch import Branch
+
+        periods = periods or [p for p, _ in LeaderBoard.TIME_PERIOD_CHOICES]
+        if branch_ids is None:
+            branch_ids = list(
+                Branch.objects.filter(is_active=True).values_list("id", flat=True)
             )
-            new_entries.append(entry)
-            current_rank += 1
+        timings = {}
+        clock = time.perf_counter()
+
+        def lap(stage):
+            nonlocal clock
+            now = time.perf_counter()
+            timings[stage] = round(now - clock, 4)
+            clock = now
+
+        # 1. One scan, grouped per (user, branch, sub-branch) with a windowed
+        #    aggregate per period
+        starts = {p: LeaderBoard.current_period_start(p) for p in periods}
+        since = {
+            p: timezone.make_aware(datetime.combine(start, datetime.min.time()))
+            for p, start in starts.items()
+            if start
+        }
+        aggregates = {}
+        for period in periods:
+            window = Q(start_time__gte=since[period]) if period in since else None
+            aggregates[f"{period}_score"] = Sum("score_obtained", filter=window)
+            aggregates[f"{period}_tests"] = Count("id", filter=window)
+            aggregates[f"{period}_pct_sum"] = Sum("percentage", filter=window)
+            aggregates[f"{period}_pct_count"] = Count("percentage", filter=window)
+
+        attempts = UserAttempt.objects.filter(
+            status="COMPLETED", mock_test__branch_id__in=branch_ids
+        )
+        if len(since) == len(periods):
+            attempts = attempts.filter(start_time__gte=min(since.values()))
+        if sub_branch_id:
+            attempts = attempts.filter(mock_test__sub_branch_id=sub_branch_id)
+        rows = attempts.values(
+            "user_id", "mock_test__branch_id", "mock_test__sub_branch_id"
+        ).annotate(**aggregates)
+
+        # (period, branch, sub_branch) -> user -> [score, tests, pct_sum, pct_count]
+        boards = defaultdict(lambda: defaultdict(lambda: [0, 0, 0, 0]))
+        for row in rows.order_by():
+            branch_id = row["mock_test__branch_id"]
+            row_sub_branch = row["mock_test__sub_branch_id"]
+            if sub_branch_id:
+                scopes = [sub_branch_id]
+            else:
+                scopes = [None, row_sub_branch] if row_sub_branch else [None]
+            for period in periods:
+                if not row[f"{period}_tests"]:
+                    continue
+                values = (
+                    row[f"{period}_score"] or 0,
+                    row[f"{period}_tests"],
+                    row[f"{period}_pct_sum"] or 0,
+                    row[f"{period}_pct_count"],
+                )
+                for scope in scopes:
+                    totals = boards[(period, branch_id, scope)][row["user_id"]]
+                    for i, value in enumerate(values):
+                        totals[i] += value
+        lap("aggregate")
+
+        # 2. Upsert and re-rank atomically
+        with transaction.atomic():
+            entries = LeaderBoard.objects.select_for_update().filter(
+                LeaderBoard.current_filter(starts), branch_id__in=branch_ids
+            )
+            if sub_branch_id:
+                entries = entries.filter(sub_branch_id=sub_branch_id)
+            existing = defaultdict(dict)
+            for entry in entries:
+                board = (entry.time_period, entry.branch_id, entry.sub_branch_id)
+                existing[board][entry.user_id] = entry
+            lap("load")
+
+            to_update, to_create, stale = [], [], []
+            for board in set(boards) | set(existing):
+                scores, current = boards.get(board, {}), existing.get(board, {})
+                for user_id, (score, tests, pct_sum, pct_count) in scores.items():
+                    accuracy = pct_sum / pct_count if pct_count else 0
+                    entry = current.get(user_id)
+                    if entry is None:
+                        entry = LeaderBoard(
+                            user_id=user_id,
+                            time_period=board[0],
+                            period_start=starts[board[0]],
+                            branch_id=board[1],
+                            sub_branch_id=board[2],
+                            rank=0,
+                        )
+                        to_create.append(entry)
+                    else:
+                        to_update.append(entry)
+                    entry.total_score = score
+                    entry.tests_completed = tests
+                    entry.accuracy_percentage = round(accuracy, 2)
+                # Users whose attempts fell out of the window leave the board
+                stale += [e.id for uid, e in current.items() if uid not in scores]
+            LeaderBoard.objects.bulk_update(
+                to_update,
+                ["total_score", "tests_completed", "accuracy_percentage"],
+                batch_size=500,
+            )
+            LeaderBoard.objects.bulk_create(to_create, batch_size=500)
+            LeaderBoard.objects.filter(id__in=stale).delete()
+            lap("write")
+
+            for board in boards:
+                LeaderBoard.rerank(*board, starts[board[0]])
+            lap("rerank")
+
+        for board in set(boards) | set(existing):
+            LeaderBoard.live_board(*board, reload=True)
+        lap("live")
 
-        LeaderBoard.objects.bulk_create(new_entries)
+        return {
+            "boards": len(boards),
+            "created": len(to_create),
+            "updated": len(to_update),
+            "deleted": len(stale),
+            "timings": timings,
+        }
 
     def get_rank_change(self):
         if self.previous_rank is None:
@@ -358,9 +843,460 @@ class LeaderBoard(models.Model):
         # Negative change implies moving DOWN (e.g. 1 -> 4 is -3)
         return self.previous_rank - self.rank
 
+    @staticmethod
+    def archive_closed_periods():
+        """
+        Freeze every board whose period has ended: its final ranks are copied
+        to LeaderBoardArchive and its rows leave this table. Safe to re-run.
+        Returns the number of boards archived.
+        """
+        starts = LeaderBoard.current_period_starts()
+        closed = (
+            LeaderBoard.objects.exclude(LeaderBoard.current_filter(starts))
+            .values_list("time_period", "branch_id", "sub_branch_id", "period_start")
+            .distinct()
+            .order_by()
+        )
+        archived = 0
+        for time_period, branch_id, sub_branch_id, period_start in list(closed):
+            with transaction.atomic():
+                LeaderBoard.rerank(time_period, branch_id, sub_branch_id, period_start)
+                rows = LeaderBoard.objects.filter(
+                    time_period=time_period,
+                    period_start=period_start,
+                    branch_id=branch_id,
+                    sub_branch_id=sub_branch_id,
+                )
+                LeaderBoardArchive.objects.bulk_create(
+                    (
+                        LeaderBoardArchive(
+                            user_id=row.user_id,
+                            time_period=time_period,
+                            period_start=period_start,
+                            branch_id=branch_id,
+                            sub_branch_id=sub_branch_id,
+                            rank=row.rank,
+                            total_score=row.total_score,
+                            tests_completed=row.tests_completed,
+                            accuracy_percentage=row.accuracy_percentage,
+                        )
+                        for row in rows
+                    ),
+                    batch_size=500,
+                    ignore_conflicts=True,
+                )
+                rows.delete()
+            archived += 1
+        return archived
+
     @staticmethod
     def get_top_users(time_period, branch, limit=10):
-        qs = LeaderBoard.objects.filter(time_period=time_period)
+        qs = LeaderBoard.objects.filter(
+            time_period=time_period,
+            period_start=LeaderBoard.current_period_start(time_period),
+        )
         if branch:
             qs = qs.filter(branch=branch)
         return qs.order_by("rank")[:limit]
+
+
+class LeaderBoardArchive(models.Model):
+    """
+    Final standings of closed leaderboard periods
+    Rows are written once by LeaderBoard.archive_closed_periods and never change
+    """
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="leaderboard_history"
+    )
+    time_period = models.CharField(
+        max_length=20, choices=LeaderBoard.TIME_PERIOD_CHOICES
+    )
+    period_start = models.DateField()
+    branch = models.ForeignKey(
+        "Branch", on_delete=models.CASCADE, related_name="leaderboard_history"
+    )
+    sub_branch = models.ForeignKey(
+        "SubBranch",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="leaderboard_history",
+    )
+    rank = models.PositiveIntegerField()
+    total_score = models.DecimalField(max_digits=10, decimal_places=2)
+    tests_completed = models.PositiveIntegerField()
+    accuracy_percentage = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        db_table = "leaderboard_archive"
+        verbose_name = "LeaderBoard Archive Entry"
+        verbose_name_plural = "LeaderBoard Archive"
+        unique_together = [
+            ["user", "time_period", "period_start", "branch", "sub_branch"]
+        ]
+        ordering = ["-period_start", "rank"]
+        # Both indexes lead with the period, so each closed period is a
+        # contiguous range (and the natural partition key on PostgreSQL)
+        indexes = [
+            models.Index(fields=["time_period", "period_start", "branch", "rank"]),
+            models.Index(fields=["user", "time_period", "period_start"]),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} - {self.user_id} ({self.time_period} {self.period_start})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Archived leaderboard entries are immutable.")
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def latest_period_start(time_period, branch_id, sub_branch_id=None):
+        """Start of the most recently archived period of a board, or None."""
+        return (
+            LeaderBoardArchive.objects.filter(
+                time_period=time_period,
+                branch_id=branch_id,
+                sub_branch_id=sub_branch_id,
+            )
+            .order_by("-period_start")
+            .values_list("period_start", flat=True)
+            .first()
+        )
+
+
+# High-water mark of ActivityRollup.process_pending (ISO datetime)
+ROLLUP_HWM_SETTING = "activity_rollup_hwm"
+# Rows younger than this may still sit in uncommitted transactions
+ROLLUP_SAFETY_LAG = timedelta(minutes=1)
+# Longest stretch of raw rows folded in one transaction
+ROLLUP_CHUNK = timedelta(days=7)
+ROLLUP_METRICS = ("attempts", "answers", "questions_added", "questions_approved")
+
+
+def _bucket_start(granularity, moment):
+    """Local start of the bucket containing an aware datetime."""
+    moment = timezone.localtime(moment)
+    if granularity == ActivityRollup.HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.date()
+    if granularity == ActivityRollup.WEEK:
+        day -= timedelta(days=(day.weekday() - WEEK_START) % 7)
+    elif granularity == ActivityRollup.MONTH:
+        day = day.replace(day=1)
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+class ActivityRollup(models.Model):
+    """
+    Activity counts per hour, day, week and month for dashboard charts
+    Rows exist for the platform total (no branch or category), per branch
+    (attempts and answers) and per category (answers, questions added and
+    approvals). Maintained incrementally by process_pending.
+    """
+
+    HOUR = "HOUR"
+    DAY = "DAY"
+    WEEK = "WEEK"
+    MONTH = "MONTH"
+    GRANULARITY_CHOICES = [
+        (HOUR, "Hourly"),
+        (DAY, "Daily"),
+        (WEEK, "Weekly"),
+        (MONTH, "Monthly"),
+    ]
+
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField(help_text="Local start of the bucket")
+    branch = models.ForeignKey(
+        "Branch",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="activity_rollups",
+    )
+    category = models.ForeignKey(
+        "Category",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="activity_rollups",
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    answers = models.PositiveIntegerField(default=0)
+    questions_added = models.PositiveIntegerField(default=0)
+    questions_approved = models.PositiveIntegerField(default=0)
+    active_users = models.PositiveIntegerField(
+        default=0, help_text="Distinct users who started an attempt or answered"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "activity_rollups"
+        verbose_name = "Activity Rollup"
+        verbose_name_plural = "Activity Rollups"
+        unique_together = [["granularity", "bucket_start", "branch", "category"]]
+        ordering = ["bucket_start"]
+        indexes = [
+            models.Index(fields=["granularity", "branch", "category", "bucket_start"]),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:%M}"
+
+    @staticmethod
+    def series(granularity, start, end, branch=None, category=None):
+        """
+        Rollup rows of one dimension whose buckets start between two aware
+        datetimes, one row per bucket with activity.
+        """
+        return ActivityRollup.objects.filter(
+            granularity=granularity,
+            branch=branch,
+            category=category,
+            bucket_start__gte=_bucket_start(granularity, start),
+            bucket_start__lte=end,
+        ).order_by("bucket_start")
+
+    @staticmethod
+    def bucket_starts(granularity, start, end):
+        """Local starts of every bucket from the one holding start up to end."""
+        step = {
+            ActivityRollup.HOUR: timedelta(hours=1),
+            ActivityRollup.DAY: timedelta(days=1),
+            ActivityRollup.WEEK: timedelta(days=7),
+            ActivityRollup.MONTH: timedelta(days=32),
+        }[granularity]
+        current = _bucket_start(granularity, start)
+        while current <= end:
+            yield current
+            current = _bucket_start(granularity, current + step)
+
+    @staticmethod
+    def granularity_for(span):
+        """Finest granularity that covers a timedelta in at most ~400 buckets."""
+        if span <= timedelta(days=14):
+            return ActivityRollup.HOUR
+        if span <= timedelta(days=400):
+            return ActivityRollup.DAY
+        if span <= timedelta(weeks=400):
+            return ActivityRollup.WEEK
+        return ActivityRollup.MONTH
+
+    @staticmethod
+    def high_water_mark():
+        value = AppSettings.get_setting(ROLLUP_HWM_SETTING)
+        return datetime.fromisoformat(value) if value else None
+
+    @staticmethod
+    def _initial_mark():
+        """Just before the oldest source row, so a first run covers history."""
+        oldest = [
+            model.objects.order_by("created_at")
+            .values_list("created_at", flat=True)
+            .first()
+            for model in (UserAttempt, UserAnswer, Question)
+        ]
+        oldest = [moment for moment in oldest if moment is not None]
+        return min(oldest) - timedelta(microseconds=1) if oldest else None
+
+    @staticmethod
+    def rebuild():
+        """Drop every rollup and fold the whole history again."""
+        with transaction.atomic():
+            ActivityRollup.objects.all().delete()
+            ActivityRollupUser.objects.all().delete()
+            AppSettings.objects.filter(setting_key=ROLLUP_HWM_SETTING).delete()
+        return ActivityRollup.process_pending()
+
+    @staticmethod
+    def process_pending(max_chunks=None):
+        """
+        Fold rows created since the high-water mark into the rollups, a
+        chunk at a time. Each chunk and its mark commit together, so a
+        crashed run resumes where it stopped. Returns the number of chunks.
+        """
+        now = timezone.now()
+        until = now - ROLLUP_SAFETY_LAG
+        if ActivityRollup.high_water_mark() is None:
+            AppSettings.set_setting(
+                ROLLUP_HWM_SETTING,
+                (ActivityRollup._initial_mark() or until).isoformat(),
+                description="Activity rollups include rows created up to here",
+            )
+
+        chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            with transaction.atomic():
+                # Locking the mark serializes concurrent runs
+                mark = AppSettings.objects.select_for_update().get(
+                    setting_key=ROLLUP_HWM_SETTING
+                )
+                since = datetime.fromisoformat(mark.setting_value)
+                if since >= until:
+                    break
+                chunk_end = min(since + ROLLUP_CHUNK, until)
+                ActivityRollup._fold(since, chunk_end)
+                mark.setting_value = chunk_end.isoformat()
+                mark.save(update_fields=["setting_value", "updated_at"])
+            chunks += 1
+        return chunks
+
+    @staticmethod
+    def _fold(since, until):
+        """Add the activity of rows created in (since, until] to every bucket."""
+        tz = timezone.get_current_timezone()
+
+        def hourly(queryset, field, *dimensions):
+            return (
+                queryset.filter(**{f"{field}__gt": since, f"{field}__lte": until})
+                .annotate(hour=TruncHour(field, tzinfo=tz))
+                .values_list("hour", *dimensions)
+                .annotate(count=Count("id"))
+                .order_by()
+                .iterator()
+            )
+
+        # (hour, metric, branch_id, category_id, user_id, count)
+        records = []
+        for hour, branch_id, user_id, count in hourly(
+            UserAttempt.objects.all(), "created_at", "mock_test__branch_id", "user_id"
+        ):
+            records.append((hour, "attempts", branch_id, None, user_id, count))
+        for hour, branch_id, category_id, user_id, count in hourly(
+            UserAnswer.objects.all(),
+            "created_at",
+            "user_attempt__mock_test__branch_id",
+            "question__category_id",
+            "user_attempt__user_id",
+        ):
+            records.append((hour, "answers", branch_id, category_id, user_id, count))
+        for hour, category_id, count in hourly(
+            Question.objects.all(), "created_at", "category_id"
+        ):
+            records.append((hour, "questions_added", None, category_id, None, count))
+        for hour, category_id, count in hourly(
+            Contribution.objects.filter(status__in=["APPROVED", "MADE_PUBLIC"]),
+            "approval_date",
+            "question__category_id",
+        ):
+            records.append((hour, "questions_approved", None, category_id, None, count))
+
+        # Fold the hourly groups into every granularity and dimension
+        deltas = defaultdict(lambda: dict.fromkeys(ROLLUP_METRICS, 0))
+        members = set()
+        granularities = [choice for choice, _ in ActivityRollup.GRANULARITY_CHOICES]
+        for hour, metric, branch_id, category_id, user_id, count in records:
+            dimensions = [(None, None)]
+            if branch_id:
+                dimensions.append((branch_id, None))
+            if category_id:
+                dimensions.append((None, category_id))
+            for granularity in granularities:
+                start = _bucket_start(granularity, hour)
+                for dimension in dimensions:
+                    key = (granularity, start, *dimension)
+                    deltas[key][metric] += count
+                    if user_id:
+                        members.add((*key, user_id))
+        if not deltas:
+            return
+
+        # Only users not yet seen in a bucket raise its active count
+        member_fields = (
+            "granularity",
+            "bucket_start",
+            "branch_id",
+            "category_id",
+            "user_id",
+        )
+        active = defaultdict(int)
+        if members:
+            seen = set()
+            for granularity in granularities:
+                keys = [member for member in members if member[0] == granularity]
+                if keys:
+                    seen.update(
+                        ActivityRollupUser.objects.filter(
+                            granularity=granularity,
+                            bucket_start__in={key[1] for key in keys},
+                            user_id__in={key[4] for key in keys},
+                        ).values_list(*member_fields)
+                    )
+            new_members = members - seen
+            ActivityRollupUser.objects.bulk_create(
+                [
+                    ActivityRollupUser(**dict(zip(member_fields, member)))
+                    for member in new_members
+                ],
+                batch_size=1000,
+            )
+            for member in new_members:
+                active[member[:4]] += 1
+
+        existing = {}
+        for granularity in granularities:
+            starts = {key[1] for key in deltas if key[0] == granularity}
+            for row in ActivityRollup.objects.filter(
+                granularity=granularity, bucket_start__in=starts
+            ):
+                existing[
+                    (row.granularity, row.bucket_start, row.branch_id, row.category_id)
+                ] = row
+
+        now = timezone.now()
+        to_create, to_update = [], []
+        for key, counts in deltas.items():
+            row = existing.get(key)
+            if row is None:
+                granularity, start, branch_id, category_id = key
+                row = ActivityRollup(
+                    granularity=granularity,
+                    bucket_start=start,
+                    branch_id=branch_id,
+                    category_id=category_id,
+                )
+                to_create.append(row)
+            else:
+                row.updated_at = now
+                to_update.append(row)
+            for metric, count in counts.items():
+                setattr(row, metric, getattr(row, metric) + count)
+            row.active_users += active.get(key, 0)
+        ActivityRollup.objects.bulk_create(to_create, batch_size=500)
+        ActivityRollup.objects.bulk_update(
+            to_update, [*ROLLUP_METRICS, "active_users", "updated_at"], batch_size=500
+        )
+
+        # Members of closed buckets can no longer change any count
+        for granularity in granularities:
+            ActivityRollupUser.objects.filter(
+                granularity=granularity,
+                bucket_start__lt=_bucket_start(granularity, until),
+            ).delete()
+
+
+class ActivityRollupUser(models.Model):
+    """
+    Users already counted in the active_users of an open ActivityRollup
+    bucket; pruned once the bucket closes.
+    """
+
+    granularity = models.CharField(
+        max_length=10, choices=ActivityRollup.GRANULARITY_CHOICES
+    )
+    bucket_start = models.DateTimeField()
+    branch = models.ForeignKey(
+        "Branch", on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    category = models.ForeignKey(
+        "Category", on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        db_table = "activity_rollup_users"
+        unique_together = [
+            ["granularity", "bucket_start", "branch", "category", "user"]
+        ]
@@ -1,10 +1,51 @@
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    FilteredRelation,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
 from django.utils import timezone
 
-from src.models.mocktest import MockTest
+from src.models.mocktest import MockTest, MockTestQuestion
 from src.models.question_answer import Answer, Question
 
+logger = logging.getLogger(__name__)
+
+# Fields written by UserAttempt.calculate_results
+RESULT_FIELDS = [
+    "score_obtained",
+    "total_score",
+    "percentage",
+    "category_breakdown",
+    "total_time_taken",
+]
+
+# Exam session state lives in the cache while an attempt is in progress
+SESSION_STATE_TIMEOUT = 60 * 60 * 6
+# Dirty drafts are written to UserAnswer once this many have accumulated
+SESSION_FLUSH_BATCH = 10
+# Questions answered this recently are avoided when generating new tests
+RECENTLY_SEEN_DAYS = 30
+
 
 class UserAttempt(models.Model):
     """
@@ -58,6 +99,11 @@ class UserAttempt(models.Model):
         max_length=20, choices=STATUS_CHOICES, default="IN_PROGRESS"
     )
     mode = models.CharField(max_length=20, choices=MODE_CHOICES, default="MOCK_TEST")
+    category_breakdown = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Per-category score summary (calculated on completion)",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -75,69 +121,458 @@ class UserAttempt(models.Model):
         test_name = self.mock_test.title_en if self.mock_test else "Practice"
         return f"{self.user.username} - {test_name} ({self.status})"
 
-    def calculate_results(self):
-        total_score = 0
-        score_obtained = 0
-
-        # Pre-fetch marks if it's a mock test
-        marks_map = {}
-        if self.mock_test:
-            for mq in self.mock_test.test_questions.all():
-                marks_map[mq.question_id] = mq.marks_allocated
-                total_score += mq.marks_allocated
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the completion signal fire once per attempt
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
 
-        answers = self.user_answers.all()
-        for ans in answers:
-            # Default to 1 mark if not in map (e.g. practice mode or mapping error)
-            question_score = marks_map.get(ans.question_id, 1)
+    def score_attempt(self):
+        """
+        Compute score, total, percentage and a per-category breakdown.
+        Mock tests join mock_test_questions to this attempt's answers in one
+        aggregate query; practice attempts score 1 mark per answered question.
+        """
+        if self.mock_test_id:
+            rows = (
+                MockTestQuestion.objects.filter(mock_test_id=self.mock_test_id)
+                .annotate(
+                    response=FilteredRelation(
+                        "question__user_responses",
+                        condition=Q(question__user_responses__user_attempt_id=self.pk),
+                    )
+                )
+                .values(category_id=F("question__category_id"))
+                .annotate(
+                    questions=Count("id"),
+                    total=Sum("marks_allocated"),
+                    obtained=Sum(
+                        Case(
+                            When(response__is_correct=True, then="marks_allocated"),
+                            default=Value(0),
+                            output_field=DecimalField(),
+                        )
+                    ),
+                    attempted=Count(
+                        "response__id", filter=Q(response__is_skipped=False)
+                    ),
+                    correct=Count("response__id", filter=Q(response__is_correct=True)),
+                )
+                .order_by()
+            )
+        else:
+            rows = (
+                self.user_answers.values(category_id=F("question__category_id"))
+                .annotate(
+                    questions=Count("id"),
+                    total=Count("id"),
+                    obtained=Count("id", filter=Q(is_correct=True)),
+                    attempted=Count("id", filter=Q(is_skipped=False)),
+                    correct=Count("id", filter=Q(is_correct=True)),
+                )
+                .order_by()
+            )
 
-            if not self.mock_test:
-                # In practice mode, total score grows with questions attempted
-                total_score += question_score
+        total_score = Decimal(0)
+        score_obtained = Decimal(0)
+        categories = []
+        for row in rows:
+            total = Decimal(row["total"] or 0)
+            obtained = Decimal(row["obtained"] or 0)
+            total_score += total
+            score_obtained += obtained
+            categories.append(
+                {
+                    "category_id": row["category_id"],
+                    "questions": row["questions"],
+                    "attempted": row["attempted"],
+                    "correct": row["correct"],
+                    "score": float(obtained),
+                    "total": float(total),
+                    "percentage": _percentage(obtained, total),
+                }
+            )
 
-            if ans.is_correct:
-                score_obtained += question_score
+        return {
+            "score_obtained": score_obtained,
+            "total_score": total_score,
+            "percentage": Decimal(str(_percentage(score_obtained, total_score))),
+            "total_questions": sum(c["questions"] for c in categories),
+            "attempted": sum(c["attempted"] for c in categories),
+            "correct": sum(c["correct"] for c in categories),
+            "categories": categories,
+        }
 
-        self.score_obtained = score_obtained
-        self.total_score = total_score
+    def calculate_results(self, save=True):
+        result = self.score_attempt()
 
-        if total_score > 0:
-            self.percentage = (score_obtained / total_score) * 100
-        else:
-            self.percentage = 0.0
+        self.score_obtained = result["score_obtained"]
+        self.total_score = result["total_score"]
+        self.percentage = result["percentage"]
+        self.category_breakdown = result["categories"]
 
         if self.end_time and self.start_time:
             self.total_time_taken = int(
                 (self.end_time - self.start_time).total_seconds()
             )
 
-        self.save(
-            update_fields=[
-                "score_obtained",
-                "total_score",
-                "percentage",
-                "total_time_taken",
-            ]
-        )
+        if save:
+            self.save(update_fields=RESULT_FIELDS)
+        return result
 
     def complete_attempt(self):
-        if self.status != "COMPLETED":
+        """
+        Close the attempt, persist its results in a single write and capture
+        the immutable result snapshot.
+        Returns the scoring result, or None if it was already completed.
+        """
+        if self.status == "COMPLETED":
+            return None
+
+        with transaction.atomic():
+            # Serializes with concurrent submits and session flushes
+            status = (
+                UserAttempt.objects.select_for_update()
+                .values_list("status", flat=True)
+                .get(pk=self.pk)
+            )
+            if status == "COMPLETED":
+                self.status = status
+                return None
+
+            # Drafts still sitting in the session cache count towards the score
+            self.flush_session_state()
+
             self.end_time = timezone.now()
             self.status = "COMPLETED"
-            self.calculate_results()
-            self.save()
+            result = self.calculate_results(save=False)
+            self.save(
+                update_fields=[*RESULT_FIELDS, "end_time", "status", "updated_at"]
+            )
+            AttemptResult.capture(self)
+        UserAttempt.close_session(self.id)
+        return result
+
+    def get_deadline(self):
+        if self.mock_test and self.mock_test.duration_minutes:
+            return self.start_time + timedelta(minutes=self.mock_test.duration_minutes)
+        return None
 
     def get_time_remaining(self):
         if self.status != "IN_PROGRESS":
             return 0
+        return UserAttempt.seconds_until(self.get_deadline())
 
-        if self.mock_test and self.mock_test.duration_minutes:
-            limit_seconds = self.mock_test.duration_minutes * 60
-            elapsed = (timezone.now() - self.start_time).total_seconds()
-            remaining = limit_seconds - elapsed
-            return max(0, int(remaining))
+    @staticmethod
+    def seconds_until(deadline):
+        if deadline is None:
+            return None  # Unlimited time
+        return max(0, int((deadline - timezone.now()).total_seconds()))
+
+    @staticmethod
+    def session_cache_key(attempt_id):
+        return f"attempt_session:{attempt_id}"
+
+    @staticmethod
+    def session_closed_key(attempt_id):
+        return f"attempt_session_closed:{attempt_id}"
+
+    @staticmethod
+    def get_cached_session(attempt_id):
+        """
+        Return the cached session state of an attempt, or None on a miss or
+        once the attempt has been submitted.
+        """
+        key = UserAttempt.session_cache_key(attempt_id)
+        closed_key = UserAttempt.session_closed_key(attempt_id)
+        cached = cache.get_many([key, closed_key])
+        if closed_key in cached:
+            return None
+        return cached.get(key)
+
+    @staticmethod
+    def close_session(attempt_id):
+        # The marker outlives any session a racing heartbeat writes back
+        cache.set(
+            UserAttempt.session_closed_key(attempt_id), True, SESSION_STATE_TIMEOUT * 2
+        )
+        cache.delete(UserAttempt.session_cache_key(attempt_id))
+
+    def get_session_state(self):
+        """
+        Return the session state, seeding it from saved answers on a miss.
+        """
+        state = UserAttempt.get_cached_session(self.id)
+        if state is None:
+            answers = self.user_answers.values_list(
+                "question_id", "selected_answer_id", "is_marked_for_review"
+            )
+            state = {
+                "attempt_id": self.id,
+                "user_id": self.user_id,
+                "deadline": self.get_deadline(),
+                "current_index": 0,
+                "marked": {q for q, _, marked in answers if marked},
+                "drafts": {q: selected for q, selected, _ in answers},
+                "dirty": set(),
+                "options": self.get_question_options(),
+            }
+            cache.set(
+                UserAttempt.session_cache_key(self.id), state, SESSION_STATE_TIMEOUT
+            )
+        return state
 
-        return None  # Unlimited time
+    def get_question_options(self):
+        """
+        {question_id: {answer ids}} of the attempt's test, or None for
+        practice attempts, which may answer any question.
+        """
+        if not self.mock_test_id:
+            return None
+        options = {}
+        for question_id, answer_id in MockTestQuestion.objects.filter(
+            mock_test_id=self.mock_test_id
+        ).values_list("question_id", "question__answers__id"):
+            choices = options.setdefault(question_id, set())
+            if answer_id:
+                choices.add(answer_id)
+        return options
+
+    @staticmethod
+    def invalid_drafts(state, drafts):
+        """
+        Question ids of drafts that name a question outside the attempt, or
+        an option that does not belong to its question.
+        """
+        options = state.get("options")
+        if options is None:
+            known = set(
+                Question.objects.filter(id__in=drafts).values_list("id", flat=True)
+            )
+            owners = dict(
+                Answer.objects.filter(
+                    id__in=[selected for selected in drafts.values() if selected]
+                ).values_list("id", "question_id")
+            )
+            return {
+                question_id
+                for question_id, selected in drafts.items()
+                if question_id not in known
+                or (selected and owners.get(selected) != question_id)
+            }
+        return {
+            question_id
+            for question_id, selected in drafts.items()
+            if question_id not in options
+            or (selected and selected not in options[question_id])
+        }
+
+    @staticmethod
+    def update_session_state(state, current_index=None, marked=None, drafts=None):
+        """
+        Merge a heartbeat into the cached state. Only touches the cache; dirty
+        drafts are flushed to UserAnswer once SESSION_FLUSH_BATCH accumulate.
+        Drafts are validated on arrival, so a bad one never reaches a flush.
+        """
+        invalid = UserAttempt.invalid_drafts(state, drafts or {})
+        if invalid:
+            raise ValidationError(f"Invalid drafts for questions: {sorted(invalid)}")
+
+        if current_index is not None:
+            state["current_index"] = current_index
+        if marked is not None:
+            marked = set(marked)
+            # Toggling review flags must be persisted along with the drafts
+            state["dirty"] |= (marked ^ state["marked"]) & set(state["drafts"])
+            state["marked"] = marked
+        for question_id, selected in (drafts or {}).items():
+            if state["drafts"].get(question_id, -1) != selected:
+                state["drafts"][question_id] = selected
+                state["dirty"].add(question_id)
+
+        if len(state["dirty"]) >= SESSION_FLUSH_BATCH:
+            return UserAttempt.flush_session(state)
+        cache.set(
+            UserAttempt.session_cache_key(state["attempt_id"]),
+            state,
+            SESSION_STATE_TIMEOUT,
+        )
+        return state
+
+    @staticmethod
+    def flush_session(state):
+        """
+        Write dirty drafts to UserAnswer with one save_answers batch, while
+        the attempt is locked and still in progress. Drafts cached before
+        validation existed that turn out invalid are dropped; if the write
+        fails the rest stay dirty for the next flush.
+        """
+        dirty = state["dirty"]
+        if dirty:
+            bad = UserAttempt.invalid_drafts(
+                state,
+                {question_id: state["drafts"][question_id] for question_id in dirty},
+            )
+            for question_id in bad:
+                state["drafts"].pop(question_id, None)
+            state["dirty"] = dirty = dirty - bad
+        try:
+            with transaction.atomic():
+                if (
+                    not UserAttempt.objects.select_for_update()
+                    .filter(pk=state["attempt_id"], status="IN_PROGRESS")
+                    .exists()
+                ):
+                    raise ValidationError("Attempt is not in progress.")
+                if dirty:
+                    attempt = UserAttempt(
+                        id=state["attempt_id"], user_id=state["user_id"]
+                    )
+                    attempt.save_answers(
+                        [
+                            {
+                                "question": question_id,
+                                "selected_answer": state["drafts"][question_id],
+                                "is_marked_for_review": question_id in state["marked"],
+                            }
+                            for question_id in dirty
+                        ]
+                    )
+            state["dirty"] = set()
+        finally:
+            cache.set(
+                UserAttempt.session_cache_key(state["attempt_id"]),
+                state,
+                SESSION_STATE_TIMEOUT,
+            )
+        return state
+
+    def flush_session_state(self):
+        state = UserAttempt.get_cached_session(self.id)
+        if state is None:
+            return
+        try:
+            UserAttempt.flush_session(state)
+        except ValidationError as e:
+            # Submitting must not fail on drafts; saved answers still count
+            logger.warning("Dropped session drafts of attempt %s: %s", self.id, e)
+
+    def save_answers(self, entries):
+        """
+        Upsert a batch of answers for this attempt in a single transaction.
+        Each entry is a dict with question, selected_answer, time_taken_seconds
+        and is_marked_for_review. Correctness is resolved from one query over
+        the selected options and stats deltas are queued as AnswerStatsEvents.
+        """
+        from src.models.user_stats import ActivityBitmap
+
+        # Last entry wins if a question is sent more than once
+        by_question = {entry["question"]: entry for entry in entries}
+
+        if self.mock_test_id:
+            # Test attempts may only answer their own paper's questions
+            known = set(
+                MockTestQuestion.objects.filter(
+                    mock_test_id=self.mock_test_id, question_id__in=by_question
+                ).values_list("question_id", flat=True)
+            )
+        else:
+            known = set(
+                Question.objects.filter(id__in=by_question).values_list("id", flat=True)
+            )
+        missing = set(by_question) - known
+        if missing:
+            raise ValidationError(f"Unknown questions: {sorted(missing)}")
+
+        selected_ids = {
+            entry["selected_answer"]
+            for entry in by_question.values()
+            if entry.get("selected_answer")
+        }
+        options = {
+            answer_id: (question_id, is_correct)
+            for answer_id, question_id, is_correct in Answer.objects.filter(
+                id__in=selected_ids
+            ).values_list("id", "question_id", "is_correct")
+        }
+        for question_id, entry in by_question.items():
+            selected = entry.get("selected_answer")
+            if selected and options.get(selected, (None,))[0] != question_id:
+                raise ValidationError(
+                    f"Answer {selected} does not belong to question {question_id}."
+                )
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        events = []
+
+        with transaction.atomic():
+            existing = {
+                answer.question_id: answer
+                for answer in self.user_answers.select_for_update().filter(
+                    question_id__in=by_question
+                )
+            }
+
+            for question_id, entry in by_question.items():
+                selected = entry.get("selected_answer")
+                is_correct = bool(selected) and options[selected][1]
+                answer = existing.get(question_id)
+                # Entries without timing (e.g. session flushes) keep the old value
+                time_taken = entry.get(
+                    "time_taken_seconds", answer.time_taken_seconds if answer else None
+                )
+
+                if answer is None:
+                    answer = UserAnswer(
+                        user_attempt=self,
+                        question_id=question_id,
+                        created_at=now,
+                    )
+                    to_create.append(answer)
+                    attempted, correct = 1, int(is_correct)
+                else:
+                    to_update.append(answer)
+                    attempted, correct = 0, int(is_correct) - int(answer.is_correct)
+
+                answer.selected_answer_id = selected or None
+                answer.is_correct = is_correct
+                answer.is_skipped = not selected
+                answer.time_taken_seconds = time_taken
+                answer.is_marked_for_review = entry.get("is_marked_for_review", False)
+                answer.updated_at = now
+
+                if attempted or correct:
+                    events.append(
+                        AnswerStatsEvent(
+                            user_attempt=self,
+                            question_id=question_id,
+                            attempted=attempted,
+                            correct=correct,
+                            time_taken_seconds=time_taken,
+                        )
+                    )
+
+            UserAnswer.objects.bulk_create(to_create)
+            if to_create:
+                # bulk_create skips the post_save signal that records activity
+                ActivityBitmap.record(self.user_id)
+            UserAnswer.objects.bulk_update(
+                to_update,
+                [
+                    "selected_answer",
+                    "is_correct",
+                    "is_skipped",
+                    "time_taken_seconds",
+                    "is_marked_for_review",
+                    "updated_at",
+                ],
+            )
+            AnswerStatsEvent.objects.bulk_create(events)
+
+        return to_create + to_update
 
 
 class UserAnswer(models.Model):
@@ -181,6 +616,7 @@ class UserAnswer(models.Model):
         indexes = [
             models.Index(fields=["user_attempt", "is_correct"]),
             models.Index(fields=["question", "is_correct"]),
+            models.Index(fields=["created_at"]),
         ]
 
     def __str__(self):
@@ -195,3 +631,321 @@ class UserAnswer(models.Model):
             self.is_skipped = True
             self.is_correct = False
         super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored correctness so updates can emit exact deltas
+        instance._loaded_is_correct = instance.__dict__.get("is_correct")
+        return instance
+
+    @staticmethod
+    def recent_question_ids(user, days=RECENTLY_SEEN_DAYS):
+        """Ids of the questions a user answered within the last `days` days."""
+        since = timezone.now() - timedelta(days=days)
+        return set(
+            UserAnswer.objects.filter(
+                user_attempt__user=user, created_at__gte=since
+            ).values_list("question_id", flat=True)
+        )
+
+    @staticmethod
+    def apply_stats(deltas):
+        """
+        Apply answer side effects in aggregate.
+        Each delta is a dict with user_id, question_id, category_id, attempted
+        (0/1), correct (-1/0/1) and time_taken. Deltas are grouped by question,
+        by (user, category) and by user so each table is written once.
+        """
+        from src.models.platform_stats import PlatformCounter
+        from src.models.user_stats import UserProgress, UserStatistics, UserSummary
+
+        if not deltas:
+            return
+
+        per_question = {}
+        per_progress = {}
+        per_user = {}
+        for delta in deltas:
+            attempted, correct = delta["attempted"], delta["correct"]
+
+            q_att, q_cor = per_question.get(delta["question_id"], (0, 0))
+            per_question[delta["question_id"]] = (q_att + attempted, q_cor + correct)
+
+            key = (delta["user_id"], delta["category_id"])
+            p_att, p_cor, p_time = per_progress.get(key, (0, 0, 0))
+            # Mirror the per-answer default of 30s when no time was recorded
+            time_taken = (delta["time_taken"] or 30) if attempted else 0
+            per_progress[key] = (
+                p_att + attempted,
+                p_cor + correct,
+                p_time + time_taken,
+            )
+
+            u_att, u_cor = per_user.get(delta["user_id"], (0, 0))
+            per_user[delta["user_id"]] = (u_att + attempted, u_cor + correct)
+
+        Question.objects.filter(id__in=per_question).update(
+            times_attempted=F("times_attempted")
+            + _delta_case("id", {k: v[0] for k, v in per_question.items()}),
+            times_correct=F("times_correct")
+            + _delta_case("id", {k: v[1] for k, v in per_question.items()}),
+        )
+
+        # Progress rows need recomputed ratios, so lock and rewrite them
+        user_ids = {user_id for user_id, _ in per_progress}
+        category_ids = {category_id for _, category_id in per_progress}
+        UserProgress.objects.bulk_create(
+            [
+                UserProgress(user_id=user_id, category_id=category_id)
+                for user_id, category_id in per_progress
+            ],
+            ignore_conflicts=True,
+        )
+        now = timezone.now()
+        progress_rows = [
+            progress
+            for progress in UserProgress.objects.select_for_update().filter(
+                user_id__in=user_ids, category_id__in=category_ids
+            )
+            if (progress.user_id, progress.category_id) in per_progress
+        ]
+        for progress in progress_rows:
+            attempted, correct, time_sum = per_progress[
+                (progress.user_id, progress.category_id)
+            ]
+            previous = progress.questions_attempted
+            progress.questions_attempted += attempted
+            progress.correct_answers += correct
+            if progress.questions_attempted > 0:
+                progress.accuracy_percentage = (
+                    progress.correct_answers / progress.questions_attempted
+                ) * 100
+            if attempted:
+                progress.average_time_seconds = round(
+                    ((progress.average_time_seconds or 0) * previous + time_sum)
+                    / progress.questions_attempted
+                )
+            progress.last_attempted_date = now
+            progress.updated_at = now
+        UserProgress.objects.bulk_update(
+            progress_rows,
+            [
+                "questions_attempted",
+                "correct_answers",
+                "accuracy_percentage",
+                "average_time_seconds",
+                "last_attempted_date",
+                "updated_at",
+            ],
+        )
+
+        UserStatistics.objects.bulk_create(
+            [UserStatistics(user_id=user_id) for user_id in per_user],
+            ignore_conflicts=True,
+        )
+        UserStatistics.objects.filter(user_id__in=per_user).update(
+            questions_answered=F("questions_answered")
+            + _delta_case("user_id", {k: v[0] for k, v in per_user.items()}),
+            correct_answers=F("correct_answers")
+            + _delta_case("user_id", {k: v[1] for k, v in per_user.items()}),
+            last_updated=now,
+        )
+        for user_stats in UserStatistics.objects.filter(user_id__in=per_user):
+            user_stats.check_badge_eligibility()
+        UserSummary.invalidate(per_user)
+
+        per_category = defaultdict(int)
+        for (_, category_id), (attempted, _, _) in per_progress.items():
+            per_category[category_id] += attempted
+        PlatformCounter.record_answers(per_category)
+
+
+class AttemptResult(models.Model):
+    """
+    Immutable result snapshot of a completed attempt
+    Written once on completion and served as-is by the results endpoint
+    """
+
+    attempt = models.OneToOneField(
+        UserAttempt, on_delete=models.CASCADE, related_name="result_snapshot"
+    )
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    etag = models.CharField(max_length=66, help_text="Quoted hash of the payload")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "attempt_results"
+        verbose_name = "Attempt Result"
+        verbose_name_plural = "Attempt Results"
+
+    def __str__(self):
+        return f"Result of attempt #{self.attempt_id}"
+
+    @staticmethod
+    def build_payload(attempt):
+        """
+        Per-question correctness with the chosen and correct option, resolved
+        in one query alongside the stored score and category breakdown.
+        """
+        correct_option = Answer.objects.filter(
+            question=OuterRef("question_id"), is_correct=True
+        ).values("id")[:1]
+        question_order = MockTestQuestion.objects.filter(
+            mock_test_id=attempt.mock_test_id, question=OuterRef("question_id")
+        ).values("question_order")[:1]
+        answers = list(
+            attempt.user_answers.annotate(
+                correct_answer=Subquery(correct_option),
+                question_order=Subquery(question_order),
+            )
+            .values(
+                "id",
+                "question",
+                "question_order",
+                "selected_answer",
+                "correct_answer",
+                "is_correct",
+                "is_skipped",
+                "is_marked_for_review",
+                "time_taken_seconds",
+                "created_at",
+                category=F("question__category_id"),
+            )
+            .order_by("question_order", "id")
+        )
+        for answer in answers:
+            answer["user_attempt"] = attempt.id
+
+        return {
+            "id": attempt.id,
+            "user": attempt.user_id,
+            "mock_test": attempt.mock_test_id,
+            "mock_test_title": attempt.mock_test.title_en
+            if attempt.mock_test_id
+            else None,
+            "mode": attempt.mode,
+            "status": attempt.status,
+            "start_time": attempt.start_time,
+            "end_time": attempt.end_time,
+            "total_time_taken": attempt.total_time_taken,
+            "score_obtained": attempt.score_obtained,
+            "total_score": attempt.total_score,
+            "percentage": attempt.percentage,
+            "category_breakdown": attempt.category_breakdown or [],
+            "user_answers": answers,
+        }
+
+    @staticmethod
+    def capture(attempt):
+        """
+        Write the snapshot for a completed attempt. Existing snapshots are
+        never rewritten.
+        """
+        existing = AttemptResult.objects.filter(attempt=attempt).first()
+        if existing:
+            return existing
+
+        payload = AttemptResult.build_payload(attempt)
+        # Round-trip through the encoder so the stored and served bodies match
+        serialized = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+        digest = hashlib.sha256(serialized.encode()).hexdigest()[:32]
+        return AttemptResult.objects.create(
+            attempt=attempt,
+            payload=json.loads(serialized),
+            etag=f'"{attempt.id}-{digest}"',
+        )
+
+
+class AnswerStatsEvent(models.Model):
+    """
+    Append-only log of answer stats deltas
+    Consumed in batches by the process_answer_events task
+    """
+
+    user_attempt = models.ForeignKey(
+        UserAttempt, on_delete=models.CASCADE, related_name="stats_events"
+    )
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="stats_events"
+    )
+    attempted = models.SmallIntegerField(
+        default=0, help_text="1 when the answer was first recorded"
+    )
+    correct = models.SmallIntegerField(
+        default=0, help_text="Change in correctness (-1, 0 or 1)"
+    )
+    time_taken_seconds = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "answer_stats_events"
+        verbose_name = "Answer Stats Event"
+        verbose_name_plural = "Answer Stats Events"
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"Q{self.question_id} +{self.attempted}/{self.correct:+d}"
+
+    @staticmethod
+    def process_pending(batch_size=1000, max_batches=None):
+        """
+        Drain the event log in batches, applying each batch through
+        UserAnswer.apply_stats. Returns the number of events processed.
+        """
+        processed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with transaction.atomic():
+                rows = list(
+                    AnswerStatsEvent.objects.select_for_update(
+                        skip_locked=True, of=("self",)
+                    )
+                    .order_by("id")
+                    .values(
+                        "id",
+                        "question_id",
+                        "attempted",
+                        "correct",
+                        "time_taken_seconds",
+                        user_id=F("user_attempt__user_id"),
+                        category_id=F("question__category_id"),
+                    )[:batch_size]
+                )
+                if not rows:
+                    break
+
+                UserAnswer.apply_stats(
+                    [
+                        {
+                            "user_id": row["user_id"],
+                            "question_id": row["question_id"],
+                            "category_id": row["category_id"],
+                            "attempted": row["attempted"],
+                            "correct": row["correct"],
+                            "time_taken": row["time_taken_seconds"],
+                        }
+                        for row in rows
+                    ]
+                )
+                AnswerStatsEvent.objects.filter(
+                    id__in=[row["id"] for row in rows]
+                ).delete()
+
+            processed += len(rows)
+            batches += 1
+        return processed
+
+
+def _percentage(obtained, total):
+    if not total:
+        return 0.0
+    return round(float(obtained) / float(total) * 100, 2)
+
+
+def _delta_case(field, deltas):
+    """Build a CASE expression mapping each key of `field` to its delta."""
+    return Case(
+        *[When(**{field: key}, then=Value(delta)) for key, delta in deltas.items()],
+        default=Value(0),
+    )
@@ -0,0 +1,246 @@
+import hashlib
+import random
+import unicodedata
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import Count
+
+from src.models.question_answer import Question
+
+# MinHash / LSH parameters: 16 bands of 4 rows put the candidate
+# threshold around 50% Jaccard similarity
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+_MERSENNE = (1 << 61) - 1
+# Fixed seed: signatures must stay comparable across processes and deploys
+_rng = random.Random(7919)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE))
+    for _ in range(NUM_PERM)
+]
+
+
+def _stable_hash(value, signed=False):
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=signed)
+
+
+def normalize_text(text):
+    """Lowercase, NFC-normalize and replace punctuation/symbols with spaces."""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+    return " ".join(text.split())
+
+
+def shingles(text):
+    text = normalize_text(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash signature of a text, or None if it has no content."""
+    hashes = [_stable_hash(s) for s in shingles(text)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(sig_a, sig_b):
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class QuestionSignature(models.Model):
+    """
+    MinHash signatures of a question's English and Nepali text
+    Used with QuestionLSHBucket for near-duplicate detection
+    """
+
+    question = models.OneToOneField(
+        Question, on_delete=models.CASCADE, related_name="signature"
+    )
+    signature_en = models.JSONField(null=True, blank=True)
+    signature_np = models.JSONField(null=True, blank=True)
+    text_hash = models.CharField(
+        max_length=32, help_text="Digest of the text the signatures were built from"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "question_signatures"
+        verbose_name = "Question Signature"
+        verbose_name_plural = "Question Signatures"
+
+    def __str__(self):
+        return f"Signature for Q{self.question_id}"
+
+    @staticmethod
+    def text_digest(question):
+        text = f"{question.question_text_en}\x00{question.question_text_np}"
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def bucket_keys(signatures):
+        """LSH bucket keys for {lang: signature}; band and language are hashed in."""
+        keys = set()
+        for lang, signature in signatures.items():
+            if not signature:
+                continue
+            for band in range(BANDS):
+                rows = signature[band * ROWS : (band + 1) * ROWS]
+                keys.add(_stable_hash(f"{lang}:{band}:{rows}", signed=True))
+        return keys
+
+    @staticmethod
+    def index(question):
+        """
+        Build or refresh the signature and LSH buckets of a question.
+        Skipped when the text has not changed since it was last indexed.
+        """
+        digest = QuestionSignature.text_digest(question)
+        existing = QuestionSignature.objects.filter(question_id=question.id).first()
+        if existing and existing.text_hash == digest:
+            return existing
+
+        built = QuestionSignature.build(question)
+        with transaction.atomic():
+            signature, _ = QuestionSignature.objects.update_or_create(
+                question_id=question.id,
+                defaults={
+                    "signature_en": built.signature_en,
+                    "signature_np": built.signature_np,
+                    "text_hash": digest,
+                },
+            )
+            QuestionLSHBucket.objects.filter(question_id=question.id).delete()
+            QuestionLSHBucket.objects.bulk_create(
+                QuestionLSHBucket(question_id=question.id, bucket=key)
+                for key in signature.get_bucket_keys()
+            )
+        return signature
+
+    @staticmethod
+    def build(question):
+        """Unsaved signature for a question, e.g. one not created yet."""
+        return QuestionSignature(
+            question_id=question.id,
+            signature_en=minhash(question.question_text_en),
+            signature_np=minhash(question.question_text_np),
+            text_hash=QuestionSignature.text_digest(question),
+        )
+
+    def get_bucket_keys(self):
+        return QuestionSignature.bucket_keys(
+            {"en": self.signature_en, "np": self.signature_np}
+        )
+
+    @staticmethod
+    def index_missing(batch_size=500):
+        """Index every question that has no signature yet. Returns the count."""
+        indexed = 0
+        while True:
+            batch = list(
+                Question.objects.filter(signature__isnull=True).only(
+                    "id", "question_text_en", "question_text_np"
+                )[:batch_size]
+            )
+            if not batch:
+                return indexed
+            for question in batch:
+                QuestionSignature.index(question)
+            indexed += len(batch)
+
+    def similarity(self, other):
+        return max(
+            estimate_similarity(self.signature_en, other.signature_en),
+            estimate_similarity(self.signature_np, other.signature_np),
+        )
+
+    def find_similar(self, threshold=0.5, limit=10):
+        """
+        Near-duplicates of this question as [(question_id, similarity)],
+        best first. Only questions sharing an LSH bucket are compared.
+        """
+        candidate_ids = QuestionLSHBucket.objects.filter(
+            bucket__in=self.get_bucket_keys()
+        ).values("question_id")
+        matches = []
+        for candidate in QuestionSignature.objects.filter(
+            question_id__in=candidate_ids
+        ).exclude(question_id=self.question_id):
+            score = self.similarity(candidate)
+            if score >= threshold:
+                matches.append((candidate.question_id, score))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
+
+    @staticmethod
+    def find_duplicate_pairs(threshold=0.5, question_ids=None):
+        """
+        Batch mode: every near-duplicate pair as [(id_a, id_b, similarity)].
+        Only questions that collide in some bucket are compared, so the cost
+        follows the number of collisions rather than N².
+        question_ids optionally restricts the pairs to that set.
+        """
+        shared = (
+            QuestionLSHBucket.objects.values("bucket")
+            .annotate(members=Count("id"))
+            .filter(members__gt=1)
+        )
+        rows = QuestionLSHBucket.objects.filter(
+            bucket__in=shared.values("bucket")
+        ).values_list("bucket", "question_id")
+        if question_ids is not None:
+            rows = rows.filter(question_id__in=question_ids)
+
+        buckets = defaultdict(list)
+        for bucket, question_id in rows:
+            buckets[bucket].append(question_id)
+
+        candidate_pairs = set()
+        for members in buckets.values():
+            members.sort()
+            for i, a in enumerate(members):
+                for b in members[i + 1 :]:
+                    candidate_pairs.add((a, b))
+
+        involved = {qid for pair in candidate_pairs for qid in pair}
+        signatures = {
+            s.question_id: s
+            for s in QuestionSignature.objects.filter(question_id__in=involved)
+        }
+        pairs = []
+        for a, b in candidate_pairs:
+            score = signatures[a].similarity(signatures[b])
+            if score >= threshold:
+                pairs.append((a, b, score))
+        pairs.sort(key=lambda pair: pair[2], reverse=True)
+        return pairs
+
+
+class QuestionLSHBucket(models.Model):
+    """
+    One LSH band hash of a question signature
+    Questions sharing a bucket are near-duplicate candidates
+    """
+
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="lsh_buckets"
+    )
+    bucket = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        db_table = "question_lsh_buckets"
+        verbose_name = "Question LSH Bucket"
+        verbose_name_plural = "Question LSH Buckets"
+        unique_together = [["question", "bucket"]]
+
+    def __str__(self):
+        return f"Q{self.question_id} -> {self.bucket}"
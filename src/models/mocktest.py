@@ -1,11 +1,24 @@
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import F
 from django.utils.text import slugify
 
 from src.models.branch import Branch, SubBranch
 from src.models.question_answer import Question
 
+# Compiled papers are versioned, so entries only need to expire to free memory
+PAPER_CACHE_TIMEOUT = 60 * 60 * 24
+# Test fields rendered into the compiled paper header
+PAPER_HEADER_FIELDS = {
+    "title_en",
+    "title_np",
+    "duration_minutes",
+    "total_questions",
+    "pass_percentage",
+}
+
 
 class MockTest(models.Model):
     """
@@ -64,6 +77,9 @@ class MockTest(models.Model):
     attempt_count = models.IntegerField(
         default=0, help_text="Total attempts by all users"
     )
+    paper_version = models.PositiveIntegerField(
+        default=1, help_text="Bumped whenever the compiled paper must be rebuilt"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -82,29 +98,46 @@ class MockTest(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title_en)
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            # paper_version only moves through F() bumps, never from a stale copy
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "paper_version"
+            ]
         super().save(*args, **kwargs)
+        if update_fields is None or PAPER_HEADER_FIELDS & set(update_fields):
+            MockTest.bump_paper_version([self.pk])
+            self.paper_version = MockTest.objects.values_list(
+                "paper_version", flat=True
+            ).get(pk=self.pk)
 
-    def generate_from_categories(self, category_distribution):
-        # category_distribution: dict {category_id: count}
+    def generate_from_categories(
+        self, category_distribution, difficulty_weights=None, exclude_ids=()
+    ):
+        """
+        Add random public questions to this test.
+        category_distribution: dict {category_id: count}. Questions are drawn
+        from the cached per-category pools, see Question.sample_public.
+        """
         order_counter = 1
         created_questions = []
 
-        # Clear existing questions if any? Or append? Assuming append or fresh test.
-        # But if we want to regenerate, we should probably clear.
-        # self.test_questions.all().delete() # Safer not to delete blindly in a vague method
-
         for category_id, count in category_distribution.items():
-            questions = list(
-                Question.objects.filter(
-                    category_id=category_id, status="PUBLIC"
-                ).order_by("?")[:count]
+            question_ids = Question.sample_public(
+                int(category_id), int(count), difficulty_weights, exclude_ids
             )
 
-            for q in questions:
+            for question_id in question_ids:
                 created_questions.append(
                     MockTestQuestion(
                         mock_test=self,
-                        question=q,
+                        question_id=question_id,
                         question_order=order_counter,
                         marks_allocated=1.0,  # Default/Configs could specify this later
                     )
@@ -112,6 +145,103 @@ class MockTest(models.Model):
                 order_counter += 1
 
         MockTestQuestion.objects.bulk_create(created_questions)
+        # bulk_create skips signals, so invalidate the compiled paper here
+        MockTest.bump_paper_version([self.id])
+
+    def get_paper_etag(self, include_answers=False):
+        variant = "full" if include_answers else "exam"
+        return f'"paper-{self.id}-v{self.paper_version}-{variant}"'
+
+    def get_compiled_paper(self, include_answers=False):
+        """
+        Return the pre-rendered paper for this test from cache, compiling it
+        on a miss. Correct answers and explanations are stripped unless
+        include_answers is set.
+        """
+        key = f"mock_test_paper:{self.id}:v{self.paper_version}"
+        papers = cache.get(key)
+        if papers is None:
+            papers = self.compile_paper()
+            cache.set(key, papers, PAPER_CACHE_TIMEOUT)
+        return papers["full" if include_answers else "exam"]
+
+    def compile_paper(self):
+        """
+        Render both paper variants (with and without answers) in one pass.
+        """
+        test_questions = self.test_questions.select_related(
+            "question", "question__category"
+        ).prefetch_related("question__answers")
+
+        full_questions = []
+        exam_questions = []
+        for mq in test_questions:
+            q = mq.question
+            answers = [
+                {
+                    "id": a.id,
+                    "answer_text_en": a.answer_text_en,
+                    "answer_text_np": a.answer_text_np,
+                    "display_order": a.display_order,
+                    "is_correct": a.is_correct,
+                }
+                for a in q.answers.all()
+            ]
+            question = {
+                "id": q.id,
+                "question_text_en": q.question_text_en,
+                "question_text_np": q.question_text_np,
+                "category": q.category_id,
+                "category_name": q.category.name_en,
+                "difficulty_level": q.difficulty_level,
+                "question_type": q.question_type,
+                "image": q.image.url if q.image else None,
+                "explanation_en": q.explanation_en,
+                "explanation_np": q.explanation_np,
+                "answers": answers,
+            }
+            entry = {
+                "id": mq.id,
+                "question_order": mq.question_order,
+                "marks_allocated": str(mq.marks_allocated),
+            }
+            full_questions.append({**entry, "question": question})
+
+            exam_question = {
+                k: v
+                for k, v in question.items()
+                if k not in ("explanation_en", "explanation_np")
+            }
+            exam_question["answers"] = [
+                {k: v for k, v in a.items() if k != "is_correct"} for a in answers
+            ]
+            exam_questions.append({**entry, "question": exam_question})
+
+        header = {
+            "id": self.id,
+            "title_en": self.title_en,
+            "title_np": self.title_np,
+            "version": self.paper_version,
+            "duration_minutes": self.duration_minutes,
+            "total_questions": self.total_questions,
+            "pass_percentage": str(self.pass_percentage),
+        }
+        return {
+            "full": {**header, "questions": full_questions},
+            "exam": {**header, "questions": exam_questions},
+        }
+
+    @staticmethod
+    def bump_paper_version(mock_test_ids):
+        MockTest.objects.filter(id__in=mock_test_ids).update(
+            paper_version=F("paper_version") + 1
+        )
+
+    @staticmethod
+    def invalidate_papers_for_question(question_id):
+        MockTest.objects.filter(test_questions__question_id=question_id).update(
+            paper_version=F("paper_version") + 1
+        )
 
     def get_average_score(self):
         from django.db.models import Avg
@@ -1,6 +1,6 @@
 import logging
 
-from django.db import models
+from django.db import models, transaction
 
 from src.models.user import User
 
@@ -102,7 +102,31 @@ class Notification(models.Model):
             )
             for user in users
         ]
-        Notification.objects.bulk_create(notifications)
+        Notification.send_many(notifications)
+
+    @staticmethod
+    def send_many(notifications):
+        """
+        Insert notifications with one query; the realtime pushes go out from
+        a background task once the transaction commits.
+        """
+        from src.models.user_stats import UserSummary
+        from src.tasks import push_notifications
+
+        created = Notification.objects.bulk_create(notifications)
+        UserSummary.invalidate(notification.user_id for notification in created)
+        ids = [notification.id for notification in created if notification.id]
+        if ids:
+            transaction.on_commit(lambda: push_notifications.delay(ids))
+        return created
+
+    @staticmethod
+    def push_many(notification_ids):
+        """Send the realtime push of each notification; returns how many."""
+        notifications = list(Notification.objects.filter(id__in=notification_ids))
+        for notification in notifications:
+            notification.send_realtime()
+        return len(notifications)
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
@@ -115,7 +139,7 @@ class Notification(models.Model):
         from channels.layers import get_channel_layer
 
         channel_layer = get_channel_layer()
-        group_name = f"user_{self.user.id}"
+        group_name = f"user_{self.user_id}"
 
         data = {
             "id": self.id,
@@ -1,7 +1,18 @@
-from django.db import models
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
 
 from src.models.user import User
 
+# Serialized public stats; dropped whenever the singleton is saved
+PUBLIC_STATS_CACHE_KEY = "platform_stats:public"
+PUBLIC_STATS_CACHE_TIMEOUT = 60 * 60
+
 
 class PlatformStats(models.Model):
     """
@@ -55,56 +66,56 @@ class PlatformStats(models.Model):
     def __str__(self):
         return f"Platform Stats (Updated: {self.last_updated})"
 
-    def refresh_stats(self):
-        from datetime import timedelta
+    def get_etag(self):
+        return f'"platform-stats-{self.last_updated.timestamp():.6f}"'
 
-        from django.db.models import Count
-        from django.utils import timezone
-
-        from src.models.attempt_answer import UserAnswer, UserAttempt
-        from src.models.question_answer import Question
-
-        now = timezone.now()
-        thirty_days_ago = now - timedelta(days=30)
-        one_day_ago = now - timedelta(hours=24)
-
-        self.total_questions_public = Question.objects.filter(status="PUBLIC").count()
-        self.total_questions_pending = Question.objects.filter(
-            status="PENDING_REVIEW"
-        ).count()
+    def refresh_stats(self):
+        """
+        Rebuild the snapshot from PlatformCounter totals. Only the active
+        user count still queries a table (users, by last_login).
+        """
+        from src.models.branch import Category
 
-        self.total_contributions_this_month = Question.objects.filter(
-            created_at__year=now.year, created_at__month=now.month
-        ).count()
+        now = timezone.localtime()
+        hours = [
+            PlatformCounter.questions_added_key(now - timedelta(hours=h))
+            for h in range(24)
+        ]
+        totals = PlatformCounter.get_values(
+            [
+                PlatformCounter.status_key("PUBLIC"),
+                PlatformCounter.status_key("PENDING_REVIEW"),
+                PlatformCounter.contributions_key(now),
+                PlatformCounter.ATTEMPTS,
+                PlatformCounter.ANSWERS,
+                *hours,
+            ]
+        )
 
+        self.total_questions_public = totals[PlatformCounter.status_key("PUBLIC")]
+        self.total_questions_pending = totals[
+            PlatformCounter.status_key("PENDING_REVIEW")
+        ]
+        self.total_contributions_this_month = totals[
+            PlatformCounter.contributions_key(now)
+        ]
         self.total_users_active = User.objects.filter(
-            last_login__gte=thirty_days_ago
-        ).count()
-        self.total_mock_tests_taken = UserAttempt.objects.count()
-        self.total_answers_submitted = UserAnswer.objects.count()
-
-        self.questions_added_today = Question.objects.filter(
-            created_at__gte=one_day_ago
+            last_login__gte=now - timedelta(days=30)
         ).count()
+        self.total_mock_tests_taken = totals[PlatformCounter.ATTEMPTS]
+        self.total_answers_submitted = totals[PlatformCounter.ANSWERS]
+        self.questions_added_today = sum(totals[name] for name in hours)
 
-        # Calculate top contributor
-        top_contributor = (
-            User.objects.filter(
-                contributed_questions__created_at__year=now.year,
-                contributed_questions__created_at__month=now.month,
-            )
-            .annotate(count=Count("contributed_questions"))
-            .order_by("-count")
-            .first()
+        top_user = PlatformCounter.top_suffix(PlatformCounter.contributor_key(now, ""))
+        self.top_contributor_this_month = (
+            User.objects.filter(id=top_user).first() if top_user else None
+        )
+        top_category = PlatformCounter.top_suffix(
+            PlatformCounter.category_answers_key(now, "")
+        )
+        self.most_attempted_category = (
+            Category.objects.filter(id=top_category).first() if top_category else None
         )
-        self.top_contributor_this_month = top_contributor
-
-        # Calculate most attempted category
-        # Approximate by counting questions in category that have high attempted counts
-        # Or finding category with most UserAnswers (expensive join) in recent times
-        # Simplifying: Category with most public questions for now, or random?
-        # Better: Category.objects.filter(questions__user_responses__created_at__gte=thirty_days_ago).annotate(...)
-        # For efficiency, let's skip deep aggregation or use simple approximation
         self.save()
 
     def reset_monthly_stats(self):
@@ -117,3 +128,215 @@ class PlatformStats(models.Model):
     def scheduled_update():
         obj, _ = PlatformStats.objects.get_or_create(id=1)
         obj.refresh_stats()
+
+
+class PlatformCounter(models.Model):
+    """
+    Sharded counters behind PlatformStats
+    Domain events add to a random shard so concurrent writers rarely touch
+    the same row; totals are the sum over shards
+    """
+
+    SHARDS = 8
+    ATTEMPTS = "attempts"
+    ANSWERS = "answers"
+
+    name = models.CharField(max_length=100)
+    shard = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "platform_counters"
+        verbose_name = "Platform Counter"
+        verbose_name_plural = "Platform Counters"
+        unique_together = [["name", "shard"]]
+
+    def __str__(self):
+        return f"{self.name}[{self.shard}] = {self.value}"
+
+    @staticmethod
+    def status_key(status):
+        return f"questions:{status}"
+
+    @staticmethod
+    def contributions_key(moment):
+        return f"contributions:{moment:%Y-%m}"
+
+    @staticmethod
+    def contributor_key(moment, user_id):
+        return f"contributor:{moment:%Y-%m}:{user_id}"
+
+    @staticmethod
+    def questions_added_key(moment):
+        return f"questions_added:{moment:%Y-%m-%dT%H}"
+
+    @staticmethod
+    def category_answers_key(moment, category_id):
+        return f"category_answers:{moment:%Y-%m}:{category_id}"
+
+    @staticmethod
+    def increment(name, delta=1):
+        if not delta:
+            return
+        shard = random.randrange(PlatformCounter.SHARDS)
+        row = PlatformCounter.objects.filter(name=name, shard=shard)
+        if row.update(value=F("value") + delta):
+            return
+        try:
+            with transaction.atomic():
+                PlatformCounter.objects.create(name=name, shard=shard, value=delta)
+        except IntegrityError:
+            # Another writer created the shard first
+            row.update(value=F("value") + delta)
+
+    @staticmethod
+    def increment_many(deltas):
+        for name, delta in deltas.items():
+            PlatformCounter.increment(name, delta)
+
+    @staticmethod
+    def get_values(names):
+        """{name: total} for the given counters, 0 for unknown ones."""
+        totals = dict.fromkeys(names, 0)
+        totals.update(
+            PlatformCounter.objects.filter(name__in=names)
+            .values_list("name")
+            .annotate(total=Sum("value"))
+            .order_by()
+        )
+        return totals
+
+    @staticmethod
+    def top_suffix(prefix):
+        """Suffix of the largest counter named ``prefix<suffix>``, as an int."""
+        top = (
+            PlatformCounter.objects.filter(name__startswith=prefix)
+            .values("name")
+            .annotate(total=Sum("value"))
+            .filter(total__gt=0)
+            .order_by("-total", "name")
+            .first()
+        )
+        return int(top["name"][len(prefix) :]) if top else None
+
+    @staticmethod
+    def set_values(values, prefixes=()):
+        """
+        Overwrite counters with exact totals, e.g. after a recount. Counters
+        starting with any of ``prefixes`` are dropped first, so families of
+        keys that no longer occur are reset too.
+        """
+        stale = Q(name__in=values)
+        for prefix in prefixes:
+            stale |= Q(name__startswith=prefix)
+        with transaction.atomic():
+            PlatformCounter.objects.filter(stale).delete()
+            PlatformCounter.objects.bulk_create(
+                PlatformCounter(name=name, shard=0, value=value)
+                for name, value in values.items()
+            )
+
+    @staticmethod
+    def record_question(question, created=False, deleted=False):
+        """Count a question's creation, status change or deletion."""
+        # Instances not loaded with their status are assumed unchanged
+        before = (
+            None if created else getattr(question, "_loaded_status", question.status)
+        )
+        after = None if deleted else question.status
+        deltas = {}
+        if before != after:
+            if before:
+                deltas[PlatformCounter.status_key(before)] = -1
+            if after:
+                deltas[PlatformCounter.status_key(after)] = 1
+        if created:
+            now = timezone.localtime()
+            deltas[PlatformCounter.contributions_key(now)] = 1
+            deltas[PlatformCounter.questions_added_key(now)] = 1
+            if question.created_by_id:
+                key = PlatformCounter.contributor_key(now, question.created_by_id)
+                deltas[key] = 1
+        PlatformCounter.increment_many(deltas)
+        question._loaded_status = after
+
+    @staticmethod
+    def record_answers(per_category):
+        """Count newly recorded answers given as {category_id: count}."""
+        now = timezone.localtime()
+        deltas = {PlatformCounter.ANSWERS: sum(per_category.values())}
+        for category_id, count in per_category.items():
+            if category_id:
+                deltas[PlatformCounter.category_answers_key(now, category_id)] = count
+        PlatformCounter.increment_many(deltas)
+
+    @staticmethod
+    def reconcile():
+        """
+        Recount every counter PlatformStats reads from the source tables,
+        correcting drift from bulk deletes or crashed writers, and drop
+        buckets of past hours and months. Meant to run off-peak.
+        Returns the number of counters written.
+        """
+        from src.models.attempt_answer import AnswerStatsEvent, UserAnswer, UserAttempt
+        from src.models.question_answer import Question
+
+        now = timezone.localtime()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        values = {
+            PlatformCounter.status_key(status): 0
+            for status, _ in Question.STATUS_CHOICES
+        }
+        values.update(
+            (PlatformCounter.status_key(status), count)
+            for status, count in Question.objects.values_list("status")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        this_month = Question.objects.filter(created_at__gte=month_start)
+        values[PlatformCounter.contributions_key(now)] = this_month.count()
+        for user_id, count in (
+            this_month.filter(created_by__isnull=False)
+            .values_list("created_by_id")
+            .annotate(count=Count("id"))
+            .order_by()
+        ):
+            values[PlatformCounter.contributor_key(now, user_id)] = count
+        for hour, count in (
+            Question.objects.filter(created_at__gte=now - timedelta(hours=24))
+            .annotate(hour=TruncHour("created_at"))
+            .values_list("hour")
+            .annotate(count=Count("id"))
+            .order_by()
+        ):
+            key = PlatformCounter.questions_added_key(timezone.localtime(hour))
+            values[key] = count
+        values[PlatformCounter.ATTEMPTS] = UserAttempt.objects.count()
+
+        # Answers still queued as stats events are counted once processed
+        queued = defaultdict(int)
+        for category_id, count in (
+            AnswerStatsEvent.objects.filter(attempted__gt=0)
+            .values_list("question__category_id")
+            .annotate(count=Sum("attempted"))
+            .order_by()
+        ):
+            queued[category_id] = count
+        values[PlatformCounter.ANSWERS] = UserAnswer.objects.count() - sum(
+            queued.values()
+        )
+        for category_id, count in (
+            UserAnswer.objects.filter(created_at__gte=month_start)
+            .values_list("question__category_id")
+            .annotate(count=Count("id"))
+            .order_by()
+        ):
+            key = PlatformCounter.category_answers_key(now, category_id)
+            values[key] = count - queued[category_id]
+
+        PlatformCounter.set_values(
+            values,
+            prefixes=["contributor:", "category_answers:", "questions_added:"],
+        )
+        return len(values)
@@ -1,8 +1,16 @@
+import random
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count
+from django.utils import timezone
 
 from src.models.branch import Category
 
+# Public question id pools are kept in sync on write, the timeout only bounds staleness
+QUESTION_POOL_TIMEOUT = 60 * 60 * 24
+
 
 class Question(models.Model):
     """
@@ -94,6 +102,7 @@ class Question(models.Model):
             models.Index(fields=["is_public", "status"]),
             models.Index(fields=["created_by", "status"]),
             models.Index(fields=["scheduled_public_date"]),
+            models.Index(fields=["created_at"]),
         ]
 
     def __str__(self):
@@ -110,23 +119,173 @@ class Question(models.Model):
             qs = qs.filter(user_attempt__user=user)
         return qs
 
-    def check_duplicate(self):
-        from django.db.models import Q
+    def check_duplicate(self, threshold=0.9):
+        from src.models.dedup import QuestionSignature
 
-        return (
-            Question.objects.filter(
-                Q(question_text_en__iexact=self.question_text_en)
-                | Q(question_text_np__iexact=self.question_text_np)
-            )
-            .exclude(id=self.id)
-            .exists()
-        )
+        if self.id:
+            signature = QuestionSignature.index(self)
+        else:
+            signature = QuestionSignature.build(self)
+        return bool(signature.find_similar(threshold, limit=1))
 
     def schedule_publication(self, target_date):
         self.scheduled_public_date = target_date
         self.status = "PENDING_REVIEW"  # Ensure it's not public yet
         self.save(update_fields=["scheduled_public_date", "status"])
 
+    @staticmethod
+    def publish_scheduled(day=None, chunk_size=500):
+        """
+        Publish questions scheduled on or before day (default today) in
+        chunks. Each chunk commits on its own, moving its questions and
+        their approved contributions to public with bulk UPDATEs, notifying
+        contributors and invalidating the public pools once. Published
+        questions leave the PENDING_REVIEW queue, so an interrupted run
+        resumes where it stopped. Returns the number published.
+        """
+        from src.models.analytics import Contribution
+
+        day = day or timezone.localdate()
+        published = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    Question.objects.filter(
+                        scheduled_public_date__lte=day, status="PENDING_REVIEW"
+                    )
+                    .select_for_update(skip_locked=True)
+                    .order_by("id")
+                    .values_list("id", flat=True)[:chunk_size]
+                )
+                if not ids:
+                    break
+                Question.set_status_many(
+                    Question.objects.filter(pk__in=ids), "PUBLIC", is_public=True
+                )
+                Contribution.make_public_many(
+                    Contribution.objects.filter(question_id__in=ids),
+                    publish_questions=False,
+                )
+            published += len(ids)
+        return published
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember where the row sat in the public pools before any edit
+        instance._loaded_pool_entry = instance._pool_entry()
+        if "status" in instance.__dict__:
+            instance._loaded_status = instance.status
+        return instance
+
+    def _pool_entry(self):
+        """(category_id, difficulty bucket) if the question is public, else None."""
+        if self.__dict__.get("status") != "PUBLIC":
+            return None
+        return (self.__dict__.get("category_id"), self.difficulty_level or "UNRATED")
+
+    @staticmethod
+    def pool_cache_key(category_id):
+        return f"question_pool:{category_id}"
+
+    @staticmethod
+    def get_public_pool(category_id):
+        """
+        Return {difficulty: [question ids]} for the public questions of a
+        category, loading it with a single query on a cache miss.
+        """
+        key = Question.pool_cache_key(category_id)
+        pool = cache.get(key)
+        if pool is None:
+            pool = {}
+            for question_id, difficulty in Question.objects.filter(
+                category_id=category_id, status="PUBLIC"
+            ).values_list("id", "difficulty_level"):
+                pool.setdefault(difficulty or "UNRATED", []).append(question_id)
+            cache.set(key, pool, QUESTION_POOL_TIMEOUT)
+        return pool
+
+    def sync_public_pool(self, deleted=False):
+        """
+        Drop the cached pools this question left or joined after a save or
+        delete; they are rebuilt from committed rows on next read.
+        """
+        before = getattr(self, "_loaded_pool_entry", None)
+        after = None if deleted else self._pool_entry()
+        if before == after:
+            return
+
+        Question.invalidate_public_pools(
+            entry[0] for entry in (before, after) if entry is not None
+        )
+        self._loaded_pool_entry = after
+
+    @staticmethod
+    def invalidate_public_pools(category_ids):
+        """
+        Drop the cached pools now and again once the transaction commits, so
+        a pool rebuilt from pre-commit rows in between does not stick.
+        """
+        keys = [Question.pool_cache_key(c) for c in set(category_ids)]
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def set_status_many(queryset, status, is_public):
+        """
+        Bulk status change that keeps the cached public pools and the
+        platform counters in sync. Returns the number of updated questions.
+        """
+        from src.models.platform_stats import PlatformCounter
+
+        category_ids = list(queryset.values_list("category_id", flat=True).distinct())
+        before = dict(
+            queryset.values_list("status").annotate(count=Count("id")).order_by()
+        )
+        updated = queryset.update(status=status, is_public=is_public)
+        Question.invalidate_public_pools(category_ids)
+        deltas = {PlatformCounter.status_key(status): sum(before.values())}
+        for old_status, count in before.items():
+            key = PlatformCounter.status_key(old_status)
+            deltas[key] = deltas.get(key, 0) - count
+        PlatformCounter.increment_many(deltas)
+        return updated
+
+    @staticmethod
+    def sample_public(category_id, count, difficulty_weights=None, exclude_ids=()):
+        """
+        Pick up to `count` random public question ids from a category.
+        difficulty_weights (e.g. {"EASY": 1, "HARD": 2}) splits the count
+        across difficulty buckets; without it every question is equally
+        likely. Ids in exclude_ids are avoided unless the category would
+        otherwise run short. The picks are checked against the table, so a
+        stale cached pool can never hand out a question that is not public.
+        """
+        pool = Question.get_public_pool(category_id)
+        if difficulty_weights is None:
+            difficulty_weights = {level: len(ids) for level, ids in pool.items()}
+
+        exclude = set(exclude_ids)
+        taken = set()
+        picked = []
+        quotas = _allocate(count, difficulty_weights, pool)
+        for level, quota in quotas.items():
+            picked += _sample_excluding(pool[level], quota, exclude, taken)
+        picked += _top_up(pool, count - len(picked), exclude, taken)
+
+        public = set(
+            Question.objects.filter(
+                id__in=picked, category_id=category_id, status="PUBLIC"
+            ).values_list("id", flat=True)
+        )
+        if len(public) < len(picked):
+            # Racing status changes left the pool stale; rebuild it from the table
+            cache.delete(Question.pool_cache_key(category_id))
+            picked = [question_id for question_id in picked if question_id in public]
+            pool = Question.get_public_pool(category_id)
+            picked += _top_up(pool, count - len(picked), exclude, taken)
+        return picked
+
 
 class Answer(models.Model):
     """
@@ -256,8 +415,100 @@ class QuestionReport(models.Model):
                 related_question=self.question,
             )
 
+    @staticmethod
+    def resolve_many(queryset, admin_user, notes):
+        """
+        Set-based resolve_report plus notify_creator: one UPDATE and one
+        notification insert. Returns the number resolved.
+        """
+        from src.models.notification import Notification
+
+        with transaction.atomic():
+            rows = list(
+                queryset.exclude(status="RESOLVED")
+                .select_for_update(of=("self",))
+                .values_list("id", "question_id", "question__created_by_id")
+                .order_by()
+            )
+            QuestionReport.objects.filter(pk__in=[row[0] for row in rows]).update(
+                status="RESOLVED",
+                reviewed_by=admin_user,
+                admin_notes=notes,
+                resolved_at=models.functions.Now(),
+            )
+        Notification.send_many(
+            [
+                Notification(
+                    user_id=creator_id,
+                    notification_type="REPORT_RESOLVED",
+                    title_en="Question Report Resolved",
+                    title_np="प्रश्न रिपोर्ट समाधान गरियो",
+                    message_en=f"A report on your question Q{question_id} has been reviewed.",
+                    message_np=f"तपाईंको प्रश्न Q{question_id} मा गरिएको रिपोर्ट समीक्षा गरिएको छ।",
+                    related_question_id=question_id,
+                )
+                for _, question_id, creator_id in rows
+                if creator_id
+            ]
+        )
+        return len(rows)
+
     @staticmethod
     def get_high_priority_questions():
         # Using the accumulated reported_count on Question model
         # Assuming reported_count is kept in sync via signals
         return Question.objects.filter(reported_count__gte=3, status="PUBLIC")
+
+
+def _allocate(count, weights, pool):
+    """Split count across difficulty buckets by weight (largest remainder)."""
+    weights = {
+        level: weight
+        for level, weight in weights.items()
+        if weight > 0 and pool.get(level)
+    }
+    total = sum(weights.values())
+    if not total:
+        return {}
+    shares = {level: count * weight / total for level, weight in weights.items()}
+    quotas = {level: int(share) for level, share in shares.items()}
+    leftover = count - sum(quotas.values())
+    for level in sorted(
+        shares, key=lambda lvl: shares[lvl] - quotas[lvl], reverse=True
+    ):
+        if leftover <= 0:
+            break
+        quotas[level] += 1
+        leftover -= 1
+    return {level: min(quota, len(pool[level])) for level, quota in quotas.items()}
+
+
+def _top_up(pool, k, exclude, taken):
+    """Up to k more ids from any bucket, falling back to excluded ones."""
+    picked = []
+    for avoid in (exclude, set()):
+        for ids in pool.values():
+            if len(picked) < k:
+                picked += _sample_excluding(ids, k - len(picked), avoid, taken)
+    return picked
+
+
+def _sample_excluding(ids, k, exclude, taken):
+    """
+    Draw k ids not in exclude or taken. Random probes keep this O(k); a
+    filtered scan is only used when most of the bucket is excluded.
+    """
+    result = []
+    probes = 3 * k + 10
+    while ids and len(result) < k and probes:
+        probes -= 1
+        candidate = random.choice(ids)
+        if candidate not in exclude and candidate not in taken:
+            taken.add(candidate)
+            result.append(candidate)
+    if len(result) < k:
+        remaining = [i for i in ids if i not in exclude and i not in taken]
+        extra = random.sample(remaining, min(k - len(result), len(remaining)))
+        taken.update(extra)
+        result += extra
+    return result
@@ -1,6 +1,11 @@
 from django.contrib.auth.models import User
 from django.db import models
 
+from src.ranking import get_ranking_backend
+
+# Live board of active profiles by experience points
+XP_RANKING_KEY = "xp"
+
 
 class UserProfile(models.Model):
     """
@@ -81,10 +86,37 @@ class UserProfile(models.Model):
         self.level = self.calculate_level()
         self.save(update_fields=["experience_points", "level"])
 
+    @staticmethod
+    def xp_ranking():
+        """Ranking backend holding the XP board, loaded from the table on a miss."""
+        backend = get_ranking_backend()
+        if not backend.exists(XP_RANKING_KEY):
+            backend.load(
+                XP_RANKING_KEY,
+                UserProfile.objects.filter(is_active=True).values_list(
+                    "id", "experience_points"
+                ),
+            )
+        return backend
+
+    def sync_xp_rank(self, deleted=False):
+        """Mirror this profile into the XP board, if the board is loaded."""
+        backend = get_ranking_backend()
+        if not backend.exists(XP_RANKING_KEY):
+            return
+        if self.is_active and not deleted:
+            backend.set_score(XP_RANKING_KEY, self.id, self.experience_points)
+        else:
+            backend.remove(XP_RANKING_KEY, self.id)
+
     def get_current_rank(self, time_period="ALL_TIME"):
         # Currently only supporting ALL_TIME based on total experience_points
         # For specific time periods, we would need to aggregate UserStats/DailyActivity
         if time_period == "ALL_TIME":
+            rank = UserProfile.xp_ranking().rank(XP_RANKING_KEY, self.id)
+            if rank is not None:
+                return rank
+            # Inactive profiles are not on the board
             return (
                 UserProfile.objects.filter(
                     experience_points__gt=self.experience_points, is_active=True
@@ -1,12 +1,32 @@
+import json
+import math
+import random
 from datetime import timedelta
+from uuid import uuid4
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.utils import timezone
 
 from src.models.branch import Category
 from src.models.user import User as CustomUser
 
+# Each user's practice feed is served from a ranked pool of this many questions
+PRACTICE_POOL_SIZE = 200
+PRACTICE_POOL_TIMEOUT = 60 * 60
+# Below this many attempts a question's success rate is treated as unknown
+MIN_ATTEMPTS_FOR_RATE = 5
+# An answer's weight in mastery halves every MASTERY_HALF_LIFE_DAYS
+MASTERY_HALF_LIFE_DAYS = 30
+# Mastery starts at 0.5 backed by this much pseudo-evidence
+MASTERY_PRIOR_WEIGHT = 3.0
+# Weak topics need this much decayed evidence below MASTERY_WEAK
+MASTERY_MIN_EVIDENCE = 3.0
+MASTERY_WEAK = 0.4
+
 
 class UserProgress(models.Model):
     """
@@ -41,6 +61,13 @@ class UserProgress(models.Model):
         blank=True,
         help_text="JSON array of specific sub-topics user struggles with",
     )
+    mastery_score = models.FloatField(
+        default=0.5, help_text="Time-decayed mastery from the answer history (0-1)"
+    )
+    difficulty_mastery = models.JSONField(
+        default=dict, blank=True, help_text="Mastery per difficulty level (0-1)"
+    )
+    mastery_updated_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -76,7 +103,7 @@ class UserProgress(models.Model):
             total_seconds_before = self.average_time_seconds * (
                 self.questions_attempted - 1
             )
-            self.average_time_seconds = int(
+            self.average_time_seconds = round(
                 (total_seconds_before + time_taken) / self.questions_attempted
             )
 
@@ -84,18 +111,212 @@ class UserProgress(models.Model):
         self.save()
 
     def analyze_weak_topics(self):
-        # Logic: If accuracy is low, flag this category (or specific tags if available) as weak
-        current_weak = self.weak_topics or []
+        # Logic: flag the difficulty levels the mastery vector shows as weak
+        self.weak_topics = UserProgress.weak_topics_for(
+            self.category.name_en, self.difficulty_mastery
+        )
+        self.save(update_fields=["weak_topics"])
 
-        if self.accuracy_percentage < 40 and self.questions_attempted >= 5:
-            if self.category.name_en not in current_weak:
-                current_weak.append(self.category.name_en)
-        elif self.accuracy_percentage > 60:
-            if self.category.name_en in current_weak:
-                current_weak.remove(self.category.name_en)
+    @staticmethod
+    def weak_topics_for(category_name, difficulty_mastery):
+        """
+        Labels of the difficulty levels mastered below MASTERY_WEAK on enough
+        evidence, e.g. "Constitution (Hard)".
+        """
+        from src.models.question_answer import Question
+
+        labels = dict(Question.DIFFICULTY_CHOICES)
+        return [
+            f"{category_name} ({labels.get(difficulty, difficulty.title())})"
+            for difficulty, (score, evidence) in sorted(difficulty_mastery.items())
+            if score < MASTERY_WEAK and evidence >= MASTERY_MIN_EVIDENCE
+        ]
 
-        self.weak_topics = current_weak
-        self.save(update_fields=["weak_topics"])
+    @staticmethod
+    def recompute_mastery(user_ids=None, now=None, chunk_size=500):
+        """
+        Rebuild mastery from the UserAnswer history, one query per chunk of
+        users. Each answer counts 0.5 ** (age / MASTERY_HALF_LIFE_DAYS), and
+        scores are shrunk towards 0.5 by MASTERY_PRIOR_WEIGHT so a handful of
+        answers cannot swing them. Per category this stores the overall
+        score, a {difficulty: [score, evidence]} vector and the weak topics;
+        the answer counters and average time stay with the stats pipeline.
+        Returns the number of progress rows written.
+        """
+        from src.models.attempt_answer import UserAnswer
+
+        now = now or timezone.now()
+        decay = math.log(2) / (MASTERY_HALF_LIFE_DAYS * 86400)
+        if user_ids is None:
+            user_ids = UserAnswer.objects.values_list(
+                "user_attempt__user_id", flat=True
+            ).distinct()
+        user_ids = sorted(set(user_ids))
+        names = dict(Category.objects.values_list("id", "name_en"))
+
+        written = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start : start + chunk_size]
+            # (user, category) -> {difficulty: [weighted correct, weight]}
+            evidence = {}
+            for user_id, category_id, difficulty, is_correct, created in (
+                UserAnswer.objects.filter(
+                    user_attempt__user_id__in=chunk, is_skipped=False
+                )
+                .values_list(
+                    "user_attempt__user_id",
+                    "question__category_id",
+                    "question__difficulty_level",
+                    "is_correct",
+                    "created_at",
+                )
+                .iterator(chunk_size=5000)
+            ):
+                key = (user_id, category_id)
+                weight = math.exp(-decay * max((now - created).total_seconds(), 0))
+                bucket = evidence.setdefault(key, {}).setdefault(
+                    difficulty or "UNRATED", [0.0, 0.0]
+                )
+                bucket[0] += weight * is_correct
+                bucket[1] += weight
+
+            UserProgress.objects.bulk_create(
+                [
+                    UserProgress(user_id=user_id, category_id=category_id)
+                    for user_id, category_id in evidence
+                ],
+                ignore_conflicts=True,
+            )
+            rows = list(UserProgress.objects.filter(user_id__in=chunk))
+            for progress in rows:
+                key = (progress.user_id, progress.category_id)
+                levels = evidence.get(key, {})
+                correct = sum(bucket[0] for bucket in levels.values())
+                weight = sum(bucket[1] for bucket in levels.values())
+                progress.mastery_score = UserProgress._shrunk(correct, weight)
+                progress.difficulty_mastery = {
+                    difficulty: [
+                        UserProgress._shrunk(*bucket),
+                        round(bucket[1], 2),
+                    ]
+                    for difficulty, bucket in levels.items()
+                }
+                progress.weak_topics = UserProgress.weak_topics_for(
+                    names.get(progress.category_id, ""), progress.difficulty_mastery
+                )
+                progress.mastery_updated_at = now
+            UserProgress.objects.bulk_update(
+                rows,
+                [
+                    "mastery_score",
+                    "difficulty_mastery",
+                    "weak_topics",
+                    "mastery_updated_at",
+                ],
+                batch_size=chunk_size,
+            )
+            UserSummary.invalidate(chunk)
+            written += len(rows)
+        return written
+
+    @staticmethod
+    def _shrunk(correct, weight):
+        prior = MASTERY_PRIOR_WEIGHT
+        return round((correct + 0.5 * prior) / (weight + prior), 4)
+
+    @staticmethod
+    def practice_pool_key(user_id, category_id=None):
+        return f"practice_pool:{user_id}:{category_id or 'all'}"
+
+    @staticmethod
+    def build_practice_pool(user, category_id=None):
+        """
+        Rank unanswered public questions for a user's practice feed.
+        Weaker and weak-topic categories get a bigger share, and questions
+        whose observed success rate is close to the user's accuracy in that
+        category rank first. Candidates come from the cached category pools,
+        so only the sampled rows are read from the question table.
+        """
+        from src.models.attempt_answer import UserAnswer
+        from src.models.question_answer import Question
+
+        if category_id:
+            category_ids = [category_id]
+        else:
+            category_ids = list(
+                Category.get_categories_for_user(user).values_list("id", flat=True)
+            )
+        progress = {
+            p.category_id: p
+            for p in UserProgress.objects.filter(
+                user=user, category_id__in=category_ids
+            )
+        }
+        answered = set(
+            UserAnswer.objects.filter(user_attempt__user=user).values_list(
+                "question_id", flat=True
+            )
+        )
+
+        weights = {}
+        targets = {}
+        for cid in category_ids:
+            p = progress.get(cid)
+            if p is None or not p.questions_attempted:
+                weights[cid], targets[cid] = 1.0, 0.5
+                continue
+            if p.mastery_updated_at:
+                accuracy = p.mastery_score
+            else:
+                accuracy = float(p.accuracy_percentage) / 100
+            weights[cid] = 1.5 - accuracy + (0.5 if p.weak_topics else 0)
+            # Aim slightly above the user's level, within sensible bounds
+            targets[cid] = min(max(accuracy - 0.1, 0.3), 0.8)
+
+        total_weight = sum(weights.values())
+        if not total_weight:
+            return []
+
+        candidates = {}
+        for cid, weight in weights.items():
+            quota = math.ceil(PRACTICE_POOL_SIZE * weight / total_weight)
+            for question_id in Question.sample_public(
+                cid, quota * 2, exclude_ids=answered
+            ):
+                if question_id not in answered:
+                    candidates[question_id] = cid
+
+        scored = []
+        for question_id, attempted, correct in Question.objects.filter(
+            id__in=candidates
+        ).values_list("id", "times_attempted", "times_correct"):
+            cid = candidates[question_id]
+            rate = correct / attempted if attempted >= MIN_ATTEMPTS_FOR_RATE else 0.5
+            fit = 1 - abs(rate - targets[cid])
+            score = weights[cid] * fit + random.random() * 0.25
+            scored.append((score, question_id))
+
+        scored.sort(reverse=True)
+        return [question_id for _, question_id in scored[:PRACTICE_POOL_SIZE]]
+
+    @staticmethod
+    def next_practice_batch(user, size, category_id=None, refresh=False):
+        """
+        Pop the next `size` question ids from the user's cached practice
+        pool, rebuilding it when missing or exhausted.
+        Returns (question_ids, remaining).
+        """
+        key = UserProgress.practice_pool_key(user.id, category_id)
+        pool = None if refresh else cache.get(key)
+        if not pool:
+            pool = UserProgress.build_practice_pool(user, category_id)
+
+        batch, rest = pool[:size], pool[size:]
+        if rest:
+            cache.set(key, rest, PRACTICE_POOL_TIMEOUT)
+        else:
+            cache.delete(key)
+        return batch, len(rest)
 
 
 class StudyCollection(models.Model):
@@ -161,6 +382,37 @@ class StudyCollection(models.Model):
         self.save(update_fields=["is_private"])
 
 
+class BadgeRule:
+    """
+    A badge earned once every listed UserStatistics counter reaches its
+    minimum, e.g. BadgeRule("Streak Master", "7 day streak", study_streak_days=7).
+    """
+
+    def __init__(self, name, description, **minimums):
+        self.name = name
+        self.description = description
+        self.minimums = minimums
+
+    def predicate(self):
+        """The rule as a queryset filter over UserStatistics."""
+        return models.Q(
+            **{f"{field}__gte": value for field, value in self.minimums.items()}
+        )
+
+    def is_met(self, stats):
+        return all(
+            getattr(stats, field) >= value for field, value in self.minimums.items()
+        )
+
+
+# Add a rule here to award a new badge; award_badges picks it up for every user
+BADGE_RULES = [
+    BadgeRule("First Step", "Answered first question", questions_answered=1),
+    BadgeRule("Streak Master", "7 day streak", study_streak_days=7),
+    BadgeRule("Contributor", "Contributed a question", questions_contributed=1),
+]
+
+
 class UserStatistics(models.Model):
     """
     Individual user achievement tracking
@@ -214,8 +466,8 @@ class UserStatistics(models.Model):
     def __str__(self):
         return f"{self.user.username} Stats"
 
-    def update_streak(self):
-        today = timezone.now().date()
+    def update_streak(self, today=None):
+        today = today or timezone.localdate()
         yesterday = today - timedelta(days=1)
 
         if self.last_activity_date == today:
@@ -236,33 +488,81 @@ class UserStatistics(models.Model):
 
     def check_badge_eligibility(self):
         badges = self.badges_earned or {}
-        awarded = False
-
-        # Example Badges
-        if "First Step" not in badges and self.questions_answered >= 1:
-            badges["First Step"] = {
-                "date": str(self.last_updated.date()),
-                "desc": "Answered first question",
-            }
-            awarded = True
-
-        if "Streak Master" not in badges and self.study_streak_days >= 7:
-            badges["Streak Master"] = {
-                "date": str(self.last_updated.date()),
-                "desc": "7 day streak",
-            }
-            awarded = True
-
-        if "Contributor" not in badges and self.questions_contributed >= 1:
-            badges["Contributor"] = {
-                "date": str(self.last_updated.date()),
-                "desc": "Contributed a question",
-            }
-            awarded = True
-
-        if awarded:
+        earned = [
+            rule
+            for rule in BADGE_RULES
+            if rule.name not in badges and rule.is_met(self)
+        ]
+        if earned:
+            day = str(
+                self.last_updated.date() if self.last_updated else timezone.localdate()
+            )
+            for rule in earned:
+                badges[rule.name] = {"date": day, "desc": rule.description}
             self.badges_earned = badges
             self.save(update_fields=["badges_earned"])
+            UserStatistics.notify_badges([(self.user_id, rule) for rule in earned])
+
+    @staticmethod
+    def award_badges(chunk_size=1000):
+        """
+        Award every badge rule to all users who newly meet it: one query per
+        rule finds them, then badges_earned is merged with chunked
+        bulk_updates and MILESTONE notifications go out in bulk.
+        Returns {badge name: users awarded}.
+        """
+        pending = {}
+        for rule in BADGE_RULES:
+            for stats_id in (
+                UserStatistics.objects.filter(rule.predicate())
+                .exclude(badges_earned__has_key=rule.name)
+                .values_list("id", flat=True)
+                .iterator(chunk_size=chunk_size)
+            ):
+                pending.setdefault(stats_id, []).append(rule)
+
+        awarded = {rule.name: 0 for rule in BADGE_RULES}
+        day = str(timezone.localdate())
+        stats_ids = sorted(pending)
+        for start in range(0, len(stats_ids), chunk_size):
+            with transaction.atomic():
+                rows = list(
+                    UserStatistics.objects.select_for_update()
+                    .filter(id__in=stats_ids[start : start + chunk_size])
+                    .only("id", "user_id", "badges_earned")
+                )
+                earned = []
+                for stats in rows:
+                    badges = stats.badges_earned or {}
+                    for rule in pending[stats.id]:
+                        if rule.name not in badges:
+                            badges[rule.name] = {"date": day, "desc": rule.description}
+                            earned.append((stats.user_id, rule))
+                            awarded[rule.name] += 1
+                    stats.badges_earned = badges
+                UserStatistics.objects.bulk_update(rows, ["badges_earned"])
+                # Sending the notifications also invalidates the summaries
+                UserStatistics.notify_badges(earned)
+        return awarded
+
+    @staticmethod
+    def notify_badges(earned):
+        """Bulk MILESTONE notifications for [(user_id, BadgeRule)]."""
+        from src.models.notification import Notification
+
+        Notification.send_many(
+            [
+                Notification(
+                    user_id=user_id,
+                    notification_type="MILESTONE",
+                    title_en=f"Badge Earned: {rule.name}",
+                    title_np=f"ब्याज प्राप्त: {rule.name}",
+                    message_en=f"You earned the {rule.name} badge - {rule.description}.",
+                    message_np=f"तपाईंले {rule.name} ब्याज प्राप्त गर्नुभयो।",
+                )
+                for user_id, rule in earned
+            ]
+        )
 
     def get_accuracy_percentage(self):
         if self.questions_answered == 0:
@@ -271,3 +571,337 @@ class UserStatistics(models.Model):
 
     def get_badges_list(self):
         return self.badges_earned
+
+
+# Streaks at least this long get a reminder when the day is nearly over
+STREAK_ALERT_MIN_DAYS = 2
+ACTIVITY_DAY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _day_bit(day):
+    return 1 << (day.day - 1)
+
+
+def _is_active(bitmaps, user_id, day):
+    """Whether {(user_id, month): days} has the user's bit for day set."""
+    return bitmaps.get((user_id, day.replace(day=1)), 0) & _day_bit(day)
+
+
+class ActivityBitmap(models.Model):
+    """
+    Which days of a month a user was active, one bit per day (bit 0 is the
+    1st). Written once per user and day by record(); streaks are computed
+    from these rows in bulk.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="activity_bitmaps"
+    )
+    month = models.DateField(help_text="First day of the (local) month")
+    days = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "activity_bitmaps"
+        verbose_name = "Activity Bitmap"
+        verbose_name_plural = "Activity Bitmaps"
+        unique_together = [["user", "month"]]
+        indexes = [models.Index(fields=["month", "user"])]
+
+    def __str__(self):
+        return f"{self.user_id} {self.month:%Y-%m} {self.days:031b}"
+
+    @staticmethod
+    def record(user_id, day=None):
+        """
+        Mark the user active on day (default today) and advance their streak.
+        Later actions that day stop at a cache check, which is only set once
+        the bit is committed; the UPDATE only matches while the bit is unset,
+        so racing writers are harmless. Returns True for the first action of
+        the day.
+        """
+        day = day or timezone.localdate()
+        cache_key = f"activity_day:{user_id}:{day}"
+        if cache.get(cache_key):
+            return False
+
+        def mark_day():
+            cache.set(cache_key, 1, ACTIVITY_DAY_CACHE_TIMEOUT)
+
+        bit = _day_bit(day)
+        row = ActivityBitmap.objects.filter(user_id=user_id, month=day.replace(day=1))
+        if not row.exclude(days=F("days").bitor(bit)).update(days=F("days").bitor(bit)):
+            try:
+                with transaction.atomic():
+                    ActivityBitmap.objects.create(
+                        user_id=user_id, month=day.replace(day=1), days=bit
+                    )
+            except IntegrityError:
+                # The month exists and the day is already set
+                transaction.on_commit(mark_day)
+                return False
+
+        stats, _ = UserStatistics.objects.get_or_create(user_id=user_id)
+        stats.update_streak(day)
+        transaction.on_commit(mark_day)
+        return True
+
+    @staticmethod
+    def active_user_ids(day):
+        """Ids of users active on day, from one indexed query."""
+        return set(
+            ActivityBitmap.objects.filter(month=day.replace(day=1))
+            .annotate(hit=F("days").bitand(_day_bit(day)))
+            .filter(hit__gt=0)
+            .values_list("user_id", flat=True)
+        )
+
+    @staticmethod
+    def refresh_streaks(day=None, chunk_size=1000):
+        """
+        Recompute current and longest streaks and last activity dates from
+        the bitmaps for everyone active on day or the day before, then zero
+        the streaks of everyone else. Returns (updated, reset).
+        """
+        day = day or timezone.localdate()
+        yesterday = day - timedelta(days=1)
+        user_ids = sorted(
+            ActivityBitmap.active_user_ids(day)
+            | ActivityBitmap.active_user_ids(yesterday)
+        )
+
+        updated = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start : start + chunk_size]
+            bitmaps = {}
+            for user_id, month, days in ActivityBitmap.objects.filter(
+                user_id__in=chunk, month__lte=day
+            ).values_list("user_id", "month", "days"):
+                bitmaps[(user_id, month)] = days
+
+            UserStatistics.objects.bulk_create(
+                [UserStatistics(user_id=user_id) for user_id in chunk],
+                ignore_conflicts=True,
+            )
+            rows = list(UserStatistics.objects.filter(user_id__in=chunk))
+            for stats in rows:
+                last = day if _is_active(bitmaps, stats.user_id, day) else yesterday
+                streak, current = 0, last
+                while _is_active(bitmaps, stats.user_id, current):
+                    streak += 1
+                    current -= timedelta(days=1)
+                stats.study_streak_days = streak
+                stats.longest_streak = max(stats.longest_streak, streak)
+                stats.last_activity_date = last
+            UserStatistics.objects.bulk_update(
+                rows, ["study_streak_days", "longest_streak", "last_activity_date"]
+            )
+            UserSummary.invalidate(chunk)
+            updated += len(rows)
+
+        broken = UserStatistics.objects.filter(
+            study_streak_days__gt=0, last_activity_date__lt=yesterday
+        )
+        reset_ids = list(broken.values_list("user_id", flat=True))
+        reset = broken.update(study_streak_days=0)
+        UserSummary.invalidate(reset_ids)
+        return updated, reset
+
+    @staticmethod
+    def at_risk_user_ids(day=None):
+        """
+        Users whose streak of STREAK_ALERT_MIN_DAYS or more ends tonight:
+        active yesterday but not yet on day.
+        """
+        day = day or timezone.localdate()
+        candidates = ActivityBitmap.active_user_ids(
+            day - timedelta(days=1)
+        ) - ActivityBitmap.active_user_ids(day)
+        return set(
+            UserStatistics.objects.filter(
+                user_id__in=candidates, study_streak_days__gte=STREAK_ALERT_MIN_DAYS
+            ).values_list("user_id", flat=True)
+        )
+
+    @staticmethod
+    def notify_at_risk(day=None):
+        """Send one batch of STREAK_ALERT notifications; returns how many."""
+        from src.models.notification import Notification
+
+        streaks = dict(
+            UserStatistics.objects.filter(
+                user_id__in=ActivityBitmap.at_risk_user_ids(day)
+            ).values_list("user_id", "study_streak_days")
+        )
+        Notification.send_many(
+            [
+                Notification(
+                    user_id=user_id,
+                    notification_type="STREAK_ALERT",
+                    title_en="Keep your streak alive!",
+                    title_np="आफ्नो स्ट्रिक जारी राख्नुहोस्!",
+                    message_en=f"Your {streak}-day study streak ends at midnight. "
+                    "Answer a question today to keep it.",
+                    message_np=f"तपाईंको {streak} दिनको अध्ययन स्ट्रिक आज मध्यरातमा "
+                    "समाप्त हुन्छ। यसलाई जोगाउन आज एउटा प्रश्नको उत्तर दिनुहोस्।",
+                )
+                for user_id, streak in streaks.items()
+            ]
+        )
+        return len(streaks)
+
+
+SUMMARY_CACHE_TIMEOUT = 60 * 60
+SUMMARY_RECENT_ATTEMPTS = 5
+SUMMARY_STATISTICS_FIELDS = [
+    "questions_contributed",
+    "questions_made_public",
+    "questions_answered",
+    "correct_answers",
+    "mock_tests_completed",
+    "study_streak_days",
+    "longest_streak",
+    "last_activity_date",
+    "badges_earned",
+    "contribution_rank",
+    "accuracy_rank",
+    "last_updated",
+]
+
+
+class UserSummary(models.Model):
+    """
+    Materialized home screen data of a user: statistics, progress per
+    category, unread notification count and recent attempts. Code that
+    changes any of these calls invalidate(), which bumps version; the row
+    is rebuilt on the next read and cached until the following bump.
+    """
+
+    user = models.OneToOneField(
+        CustomUser, on_delete=models.CASCADE, related_name="summary"
+    )
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    version = models.PositiveIntegerField(default=1)
+    built_version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "user_summaries"
+        verbose_name = "User Summary"
+        verbose_name_plural = "User Summaries"
+
+    def __str__(self):
+        return f"{self.user_id} summary v{self.version}"
+
+    @staticmethod
+    def cache_key(user_id, generation):
+        return f"user_summary:{user_id}:{generation}"
+
+    @staticmethod
+    def generation_key(user_id):
+        return f"user_summary_generation:{user_id}"
+
+    @staticmethod
+    def cache_generation(user_id):
+        """
+        Token naming the user's current summary cache entry. invalidate()
+        replaces it, so a build that read the old token caches under a dead key.
+        """
+        key = UserSummary.generation_key(user_id)
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, uuid4().hex, SUMMARY_CACHE_TIMEOUT * 2)
+            generation = cache.get(key)
+        return generation
+
+    @staticmethod
+    def invalidate(user_ids):
+        """Mark the summaries of these users stale: one UPDATE, one cache write."""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        UserSummary.objects.filter(user_id__in=user_ids).update(
+            version=F("version") + 1
+        )
+        cache.set_many(
+            {UserSummary.generation_key(user_id): uuid4().hex for user_id in user_ids},
+            SUMMARY_CACHE_TIMEOUT * 2,
+        )
+
+    @staticmethod
+    def get_for_user(user):
+        """
+        The user's summary data. A cache hit costs nothing else; on a miss
+        the stored row is reused unless a change has bumped its version.
+        """
+        # Read before the row, so an invalidate() in between wins
+        key = UserSummary.cache_key(user.id, UserSummary.cache_generation(user.id))
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+        summary, _ = UserSummary.objects.get_or_create(user=user)
+        if summary.built_version != summary.version:
+            summary.data = UserSummary.build(user)
+            # Only store what was built for the version still current
+            stored = UserSummary.objects.filter(
+                pk=summary.pk, version=summary.version
+            ).update(
+                data=summary.data,
+                built_version=summary.version,
+                updated_at=timezone.now(),
+            )
+            if not stored:
+                return {**summary.data, "version": summary.version}
+        data = {**summary.data, "version": summary.version}
+        cache.set(key, data, SUMMARY_CACHE_TIMEOUT)
+        return data
+
+    @staticmethod
+    def build(user):
+        from src.models.attempt_answer import UserAttempt
+        from src.models.notification import Notification
+
+        # An unsaved default row: creating one here would invalidate the build
+        stats = UserStatistics.objects.filter(user=user).first() or UserStatistics()
+        data = {
+            "profile_id": getattr(getattr(user, "profile", None), "id", None),
+            "statistics": {
+                field: getattr(stats, field) for field in SUMMARY_STATISTICS_FIELDS
+            },
+            "progress": list(
+                UserProgress.objects.filter(user=user)
+                .order_by("category_id")
+                .values(
+                    "id",
+                    "category",
+                    "questions_attempted",
+                    "correct_answers",
+                    "accuracy_percentage",
+                    "average_time_seconds",
+                    "last_attempted_date",
+                    "weak_topics",
+                    "mastery_score",
+                    "difficulty_mastery",
+                    category_name=F("category__name_en"),
+                )
+            ),
+            "unread_notifications": Notification.get_unread_count(user),
+            "recent_attempts": list(
+                UserAttempt.objects.filter(user=user)
+                .order_by("-created_at")
+                .values(
+                    "id",
+                    "mock_test",
+                    "status",
+                    "mode",
+                    "score_obtained",
+                    "total_score",
+                    "percentage",
+                    "start_time",
+                    "end_time",
+                    mock_test_title=F("mock_test__title_en"),
+                )[:SUMMARY_RECENT_ATTEMPTS]
+            ),
+        }
+        # Same shape whether freshly built or loaded back from the row
+        return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
@@ -0,0 +1,205 @@
+"""
+Live ranking backends for leaderboards and XP ranks.
+
+Both backends keep one ordered set of (member, score) per board key:
+
+- RedisRanking uses sorted sets (O(log n) updates and lookups) and is
+  picked when the default cache is django-redis, so every process shares
+  the same boards. Each write pushes a board's expiry RANKING_MEMORY_TTL
+  seconds out, so boards of closed periods leave Redis once idle.
+- InMemoryRanking keeps a sorted array per board (bisect lookups,
+  memmove inserts). With RANKING_BACKEND = "memory" it is authoritative,
+  which is only right for tests and single-process deploys. Otherwise
+  every process holds its own copy, so boards expire after
+  RANKING_MEMORY_TTL seconds and are reloaded from the tables, bounding
+  how far processes drift apart.
+
+Ranks use competition ranking: 1 + number of members with a strictly
+higher score, so tied members share a rank.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+
+class InMemoryRanking:
+    def __init__(self, ttl=None):
+        self._lock = threading.Lock()
+        self.ttl = ttl
+        # key -> ({member: score}, sorted [(-score, member)])
+        self._boards = {}
+        # key -> monotonic time the board was loaded
+        self._loaded = {}
+
+    def clear(self):
+        with self._lock:
+            self._boards.clear()
+            self._loaded.clear()
+
+    def exists(self, key):
+        if key not in self._boards:
+            return False
+        if self.ttl is not None:
+            loaded = self._loaded.get(key, 0)
+            if time.monotonic() - loaded > self.ttl:
+                with self._lock:
+                    self._boards.pop(key, None)
+                    self._loaded.pop(key, None)
+                return False
+        return True
+
+    def load(self, key, items):
+        scores = {member: float(score) for member, score in items}
+        with self._lock:
+            self._boards[key] = (scores, sorted((-s, m) for m, s in scores.items()))
+            self._loaded[key] = time.monotonic()
+
+    def _set(self, key, member, score):
+        scores, order = self._boards.setdefault(key, ({}, []))
+        old = scores.get(member)
+        if old is not None:
+            del order[bisect_left(order, (-old, member))]
+        scores[member] = score
+        insort(order, (-score, member))
+
+    def set_score(self, key, member, score):
+        with self._lock:
+            self._set(key, member, float(score))
+
+    def add_score(self, key, member, delta):
+        with self._lock:
+            score = self._boards.get(key, ({}, []))[0].get(member, 0.0)
+            self._set(key, member, score + float(delta))
+            return score + float(delta)
+
+    def remove(self, key, member):
+        with self._lock:
+            scores, order = self._boards.get(key, ({}, []))
+            old = scores.pop(member, None)
+            if old is not None:
+                del order[bisect_left(order, (-old, member))]
+
+    def score(self, key, member):
+        return self._boards.get(key, ({}, []))[0].get(member)
+
+    def rank(self, key, member):
+        scores, order = self._boards.get(key, ({}, []))
+        score = scores.get(member)
+        if score is None:
+            return None
+        return bisect_left(order, (-score,)) + 1
+
+    def position(self, key, member):
+        scores, order = self._boards.get(key, ({}, []))
+        score = scores.get(member)
+        if score is None:
+            return None
+        return bisect_left(order, (-score, member))
+
+    def range(self, key, start, count):
+        order = self._boards.get(key, ({}, []))[1]
+        return [(member, -neg) for neg, member in order[start : start + count]]
+
+
+class RedisRanking:
+    PREFIX = "ranking:"
+
+    def __init__(self, client, ttl=None):
+        self.client = client
+        self.ttl = ttl
+
+    def _key(self, key):
+        return f"{self.PREFIX}{key}"
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.PREFIX}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def exists(self, key):
+        return bool(self.client.exists(self._key(key)))
+
+    def _expire(self, pipe, key):
+        if self.ttl is not None:
+            pipe.expire(self._key(key), self.ttl)
+
+    def load(self, key, items):
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(key))
+        mapping = {str(member): float(score) for member, score in items}
+        if mapping:
+            pipe.zadd(self._key(key), mapping)
+            self._expire(pipe, key)
+        pipe.execute()
+
+    def set_score(self, key, member, score):
+        pipe = self.client.pipeline()
+        pipe.zadd(self._key(key), {str(member): float(score)})
+        self._expire(pipe, key)
+        pipe.execute()
+
+    def add_score(self, key, member, delta):
+        pipe = self.client.pipeline()
+        pipe.zincrby(self._key(key), float(delta), str(member))
+        self._expire(pipe, key)
+        return pipe.execute()[0]
+
+    def remove(self, key, member):
+        self.client.zrem(self._key(key), str(member))
+
+    def score(self, key, member):
+        return self.client.zscore(self._key(key), str(member))
+
+    def rank(self, key, member):
+        score = self.score(key, member)
+        if score is None:
+            return None
+        return self.client.zcount(self._key(key), f"({score}", "+inf") + 1
+
+    def position(self, key, member):
+        return self.client.zrevrank(self._key(key), str(member))
+
+    def range(self, key, start, count):
+        rows = self.client.zrevrange(
+            self._key(key), start, start + count - 1, withscores=True
+        )
+        return [(int(member), score) for member, score in rows]
+
+
+_backend = None
+
+
+def get_ranking_backend():
+    global _backend
+    if _backend is None:
+        if settings.CACHES["default"]["BACKEND"].startswith("django_redis"):
+            from django_redis import get_redis_connection
+
+            _backend = RedisRanking(
+                get_redis_connection("default"), ttl=settings.RANKING_MEMORY_TTL
+            )
+        elif settings.RANKING_BACKEND == "memory":
+            _backend = InMemoryRanking()
+        else:
+            _backend = InMemoryRanking(ttl=settings.RANKING_MEMORY_TTL)
+    return _backend
+
+
+def window(backend, key, start, count):
+    """
+    ``count`` entries from 0-based position ``start`` as [(rank, member, score)].
+    Only the first row needs a rank lookup; the rest follow from the order.
+    """
+    ranked = []
+    for offset, (member, score) in enumerate(backend.range(key, start, count)):
+        if not ranked:
+            rank = backend.rank(key, member)
+        elif ranked[-1][2] == score:
+            rank = ranked[-1][0]
+        else:
+            rank = start + offset + 1
+        ranked.append((rank, member, score))
+    return ranked
@@ -0,0 +1,242 @@
+"""
+Full-text search over the bilingual question bank.
+
+PostgreSQL: a generated ``search_vector`` tsvector column (English text and
+explanation) with a GIN index, plus a pg_trgm GIN index on the Nepali text.
+SQLite: two FTS5 tables keyed by question id, ``porter`` tokenized for
+English and ``trigram`` tokenized for Devanagari, kept in sync on save.
+Other databases fall back to ``icontains``.
+"""
+
+import logging
+
+from django.db import OperationalError, ProgrammingError, connections
+from django.db.models import BooleanField, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+
+from src.models.question_answer import Question
+
+logger = logging.getLogger(__name__)
+
+EN_TABLE = "question_search_en"
+NP_TABLE = "question_search_np"
+SNIPPET_WORDS = 16
+
+# Databases whose search structures are known to exist, by alias
+_ready = {}
+
+
+def _vendor(using):
+    vendor = connections[using].vendor
+    if vendor == "sqlite" and using not in _ready:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [EN_TABLE],
+            )
+            _ready[using] = cursor.fetchone() is not None
+    if vendor in ("postgresql", "sqlite") and _ready.get(using, True):
+        return vendor
+    return None
+
+
+def ensure_search_index(using="default"):
+    """
+    Create the search structures if they do not exist yet.
+    Safe to run on every migrate.
+    """
+    connection = connections[using]
+    table = Question._meta.db_table
+
+    if connection.vendor == "postgresql":
+        statements = [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"""ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(question_text_en, '')), 'A')
+                    || setweight(to_tsvector('english', coalesce(explanation_en, '')), 'B')
+                ) STORED""",
+            f"""CREATE INDEX IF NOT EXISTS {table}_search_vector_gin
+                ON {table} USING gin (search_vector)""",
+            f"""CREATE INDEX IF NOT EXISTS {table}_text_np_trgm
+                ON {table} USING gin (question_text_np gin_trgm_ops)""",
+        ]
+    elif connection.vendor == "sqlite":
+        statements = [
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {EN_TABLE}
+                USING fts5(question_text, explanation, tokenize='porter unicode61')""",
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {NP_TABLE}
+                USING fts5(question_text, explanation, tokenize='trigram')""",
+        ]
+    else:
+        return
+
+    try:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    except (OperationalError, ProgrammingError):
+        # e.g. SQLite built without FTS5, or no rights to create pg_trgm
+        logger.warning("Question search index unavailable, using icontains.")
+        _ready[using] = False
+        return
+
+    _ready[using] = True
+    if connection.vendor == "sqlite":
+        rebuild_search_index(using)
+
+
+def rebuild_search_index(using="default"):
+    """Re-populate the SQLite FTS tables from the questions table."""
+    if _vendor(using) != "sqlite":
+        return
+    table = Question._meta.db_table
+    with connections[using].cursor() as cursor:
+        for fts_table, lang in ((EN_TABLE, "en"), (NP_TABLE, "np")):
+            cursor.execute(f"DELETE FROM {fts_table}")
+            cursor.execute(
+                f"""INSERT INTO {fts_table}(rowid, question_text, explanation)
+                    SELECT id, question_text_{lang}, explanation_{lang} FROM {table}"""
+            )
+
+
+def index_question(question, using="default"):
+    """
+    Refresh one question in the index. Postgres maintains its generated
+    column itself, so this only has work to do on SQLite.
+    """
+    if _vendor(using) != "sqlite":
+        return
+    with connections[using].cursor() as cursor:
+        for fts_table, lang in ((EN_TABLE, "en"), (NP_TABLE, "np")):
+            cursor.execute(f"DELETE FROM {fts_table} WHERE rowid = %s", [question.id])
+            cursor.execute(
+                f"""INSERT INTO {fts_table}(rowid, question_text, explanation)
+                    VALUES (%s, %s, %s)""",
+                [
+                    question.id,
+                    getattr(question, f"question_text_{lang}"),
+                    getattr(question, f"explanation_{lang}"),
+                ],
+            )
+
+
+def remove_question(question_id, using="default"):
+    if _vendor(using) != "sqlite":
+        return
+    with connections[using].cursor() as cursor:
+        for fts_table in (EN_TABLE, NP_TABLE):
+            cursor.execute(f"DELETE FROM {fts_table} WHERE rowid = %s", [question_id])
+
+
+def search_questions(queryset, query):
+    """
+    Filter a Question queryset by a search phrase, ordered by relevance.
+    Rows are annotated with ``search_rank`` and ``search_snippet`` (matched
+    text wrapped in <mark>, or None when no snippet is available).
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+
+    vendor = _vendor(queryset.db)
+    if vendor == "postgresql":
+        return _search_postgres(queryset, query)
+    if vendor == "sqlite":
+        return _search_sqlite(queryset, query)
+    return queryset.filter(
+        Q(question_text_en__icontains=query) | Q(question_text_np__icontains=query)
+    ).annotate(
+        search_rank=Value(0.0, output_field=FloatField()),
+        search_snippet=Value(None, output_field=TextField()),
+    )
+
+
+def _search_postgres(queryset, query):
+    table = Question._meta.db_table
+    tsquery = "websearch_to_tsquery('english', %s)"
+    like = "%" + _escape_like(query) + "%"
+    headline_options = (
+        f"StartSel=<mark>, StopSel=</mark>, MaxWords={SNIPPET_WORDS}, MinWords=5"
+    )
+    return (
+        queryset.alias(
+            search_match=RawSQL(
+                f"({table}.search_vector @@ {tsquery}"
+                f" OR {table}.question_text_np ILIKE %s)",
+                (query, like),
+                output_field=BooleanField(),
+            )
+        )
+        .filter(search_match=True)
+        .annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd({table}.search_vector, {tsquery})"
+                f" + similarity({table}.question_text_np, %s)",
+                (query, query),
+                output_field=FloatField(),
+            ),
+            search_snippet=RawSQL(
+                f"""CASE WHEN {table}.search_vector @@ {tsquery}
+                    THEN ts_headline('english', {table}.question_text_en, {tsquery}, %s)
+                    ELSE ts_headline('simple', {table}.question_text_np,
+                                     plainto_tsquery('simple', %s), %s)
+                    END""",
+                (query, query, headline_options, query, headline_options),
+                output_field=TextField(),
+            ),
+        )
+        .order_by("-search_rank", "-id")
+    )
+
+
+def _search_sqlite(queryset, query):
+    table = Question._meta.db_table
+    en_query = " ".join('"{}"'.format(t.replace('"', '""')) for t in query.split())
+    sources = [(EN_TABLE, f"{EN_TABLE} MATCH %s", en_query, True)]
+    # The trigram tokenizer cannot match phrases shorter than three characters
+    if len(query) >= 3:
+        np_query = '"{}"'.format(query.replace('"', '""'))
+        sources.append((NP_TABLE, f"{NP_TABLE} MATCH %s", np_query, True))
+    else:
+        like = "%" + _escape_like(query) + "%"
+        sources.append((NP_TABLE, "question_text LIKE %s ESCAPE '\\'", like, False))
+
+    match = Q()
+    for fts_table, where, param, _ in sources:
+        match |= Q(
+            id__in=RawSQL(f"SELECT rowid FROM {fts_table} WHERE {where}", (param,))
+        )
+
+    def per_row(expression, fts_table, where):
+        return (
+            f"(SELECT {expression} FROM {fts_table}"
+            f" WHERE {where} AND {fts_table}.rowid = {table}.id)"
+        )
+
+    ranked = [source for source in sources if source[3]]
+    ranks = [
+        f"COALESCE({per_row(f'-bm25({t})', t, where)}, 0)" for t, where, _, _ in ranked
+    ]
+    snippets = [
+        per_row(
+            f"snippet({t}, -1, '<mark>', '</mark>', '…', {SNIPPET_WORDS})", t, where
+        )
+        for t, where, _, _ in ranked
+    ]
+    params = tuple(param for _, _, param, _ in ranked)
+    snippet_sql = (
+        f"COALESCE({', '.join(snippets)})" if len(snippets) > 1 else snippets[0]
+    )
+    return (
+        queryset.filter(match)
+        .annotate(
+            search_rank=RawSQL(" + ".join(ranks), params, output_field=FloatField()),
+            search_snippet=RawSQL(snippet_sql, params, output_field=TextField()),
+        )
+        .order_by("-search_rank", "-id")
+    )
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -253,6 +253,29 @@ ASGI_APPLICATION = "src.asgi.application"
 CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
 
 
+# Cache
+# Redis when REDIS_URL is configured, otherwise a per-process local memory cache
+REDIS_URL = env("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+# Live rankings share Redis when it is the cache, where idle boards expire
+# after RANKING_MEMORY_TTL. Without it, set RANKING_BACKEND=memory only for a
+# single process; otherwise each process reloads its in-memory boards from
+# the tables after RANKING_MEMORY_TTL.
+RANKING_BACKEND = env("RANKING_BACKEND", default="")
+RANKING_MEMORY_TTL = env.int("RANKING_MEMORY_TTL", default=30)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -287,6 +310,9 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Dashboard exports hold personal data, so they live outside MEDIA_ROOT
+EXPORTS_ROOT = env("EXPORTS_ROOT", default=str(BASE_DIR / "private" / "exports"))
+
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -366,22 +392,46 @@ CELERY_TIMEZONE = TIME_ZONE
 
 
 CELERY_BEAT_SCHEDULE = {
+    "process-answer-events": {
+        "task": "src.tasks.process_answer_events",
+        "schedule": timedelta(seconds=30),
+    },
     "update-platform-stats-hourly": {
         "task": "src.tasks.update_platform_stats",
         "schedule": crontab(minute=0),
     },
+    "reconcile-platform-counters-daily": {
+        "task": "src.tasks.reconcile_platform_counters",
+        "schedule": crontab(hour=3, minute=30),
+    },
     "create-daily-activity-midnight": {
         "task": "src.tasks.create_daily_activity",
         "schedule": crontab(hour=0, minute=0),
     },
+    "update-activity-rollups": {
+        "task": "src.tasks.update_activity_rollups",
+        "schedule": timedelta(minutes=5),
+    },
     "update-user-streaks-midnight": {
         "task": "src.tasks.update_user_streaks",
         "schedule": crontab(hour=0, minute=5),
     },
+    "recompute-mastery-nightly": {
+        "task": "src.tasks.recompute_mastery",
+        "schedule": crontab(hour=1, minute=30),
+    },
     "check-streak-notifications-daily": {
         "task": "src.tasks.check_streak_notifications",
         "schedule": crontab(hour=18, minute=0),  # e.g., 6 PM
     },
+    "refresh-leaderboard-ranks": {
+        "task": "src.tasks.refresh_leaderboard_ranks",
+        "schedule": timedelta(minutes=1),
+    },
+    "archive-leaderboards-daily": {
+        "task": "src.tasks.archive_leaderboards",
+        "schedule": crontab(hour=0, minute=10),  # Periods close at local midnight
+    },
     "recalculate-rankings-weekly": {
         "task": "src.tasks.recalculate_rankings",
         "schedule": crontab(hour=2, minute=0, day_of_week=1),  # Weekly on Monday
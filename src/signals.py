@@ -1,18 +1,35 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 
 from src.models import (
+    ActivityBitmap,
+    Answer,
+    AnswerStatsEvent,
+    AppSettings,
     Contribution,
     LeaderBoard,
+    MockTest,
+    MockTestQuestion,
     Notification,
+    PlatformCounter,
+    PlatformStats,
     Question,
+    QuestionSignature,
     UserAnswer,
     UserAttempt,
     UserProfile,
-    UserProgress,
     UserStatistics,
+    UserSummary,
 )
+from src.models.analytics import (
+    BS_MONTH_STARTS_SETTING,
+    CALENDAR_CACHE_KEY,
+    CALENDAR_SETTING,
+)
+from src.models.platform_stats import PUBLIC_STATS_CACHE_KEY
+from src.search import ensure_search_index, index_question, remove_question
 
 
 @receiver(post_save, sender=User)
@@ -63,59 +80,26 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=UserAnswer)
 def handle_user_answer_save(sender, instance, created, **kwargs):
     """
-    Update Question stats and UserProgress when an answer is saved.
+    Queue the stats delta for this answer.
+    Question, UserProgress and UserStatistics updates are applied in
+    aggregate by the process_answer_events task.
     """
-    if not created and not instance.is_marked_for_review:
-        # Assuming we only update stats on initial answer or if logical "completion" updates happen.
-        # But UserAnswer might be updated (e.g. changing answer).
-        # For simplicity, we might only want to increment counters if it's a "final" submission of that answer.
-        # However, simplistic incrementing on every save can lead to double counting if not careful.
-        # Let's rely on the fact that UserAnswer suggests a distinct interaction.
-        pass
-
-    # We need to act carefully. If a user changes their answer, we might need to decrement old stats and increment new.
-    # But `UserAnswer` doesn't easily track "previous" state unless we query before save or use dirty fields.
-    # For now, let's assume `times_attempted` increments once per UserAnswer creation.
-
-    question = instance.question
-
-    if created:
-        question.times_attempted += 1
-
-    if instance.is_correct:
-        # Note: If user changes from incorrect to correct, we should handle that.
-        # This simple logic might arguably be better placed in a service layer, but per requirements:
-        if created or (
-            not created and instance.is_correct
-        ):  # A bit loose, but keeps it moving
-            question.times_correct += 1
-
-    question.save(update_fields=["times_attempted", "times_correct"])
-
-    # Update User Progress
-    if instance.question.category:
-        user_progress, _ = UserProgress.objects.get_or_create(
-            user=instance.user_attempt.user, category=instance.question.category
-        )
-        # Re-calc average logic is complex in signal without previous state.
-        # Calling the model method which handles increments
-        # We need time_taken. If null, assume 0 or 30s?
-        time_taken = instance.time_taken_seconds or 30
-        user_progress.update_progress(instance.is_correct, time_taken)
-
-    # Update User Statistics (Questions Answered counting)
-    user_stats, _ = UserStatistics.objects.get_or_create(
-        user=instance.user_attempt.user
-    )
     if created:
-        user_stats.questions_answered += 1
-
-    if instance.is_correct:
-        # Again, handling simple increment. ideally need to know if it flipped from wrong to right
-        user_stats.correct_answers += 1
+        ActivityBitmap.record(instance.user_attempt.user_id)
+        attempted, correct = 1, int(instance.is_correct)
+    else:
+        previous = getattr(instance, "_loaded_is_correct", instance.is_correct)
+        attempted, correct = 0, int(instance.is_correct) - int(previous)
+    instance._loaded_is_correct = instance.is_correct
 
-    user_stats.check_badge_eligibility()
-    user_stats.save()
+    if attempted or correct:
+        AnswerStatsEvent.objects.create(
+            user_attempt_id=instance.user_attempt_id,
+            question_id=instance.question_id,
+            attempted=attempted,
+            correct=correct,
+            time_taken_seconds=instance.time_taken_seconds,
+        )
 
 
 @receiver(post_save, sender=Contribution)
@@ -157,15 +141,15 @@ def handle_user_attempt_save(sender, instance, created, **kwargs):
     """
     Update LeaderBoard and Stats when attempt is completed.
     """
-    if instance.status == "COMPLETED" and not created:
-        # Verify this only runs once ideally.
+    if created:
+        PlatformCounter.increment(PlatformCounter.ATTEMPTS)
+        ActivityBitmap.record(instance.user_id)
+    # Only the transition into COMPLETED counts, later saves must not re-add
+    completed_before = getattr(instance, "_loaded_status", None) == "COMPLETED"
+    instance._loaded_status = instance.status
+    if instance.status == "COMPLETED" and not created and not completed_before:
         # Logic: Update LeaderBoard
-        if instance.mock_test and instance.mock_test.branch:
-            LeaderBoard.update_score(
-                user=instance.user,
-                branch=instance.mock_test.branch,
-                score_delta=instance.score_obtained,  # This method needs to exist or be handled differently
-            )
+        LeaderBoard.record_attempt(instance)
 
         # Update Stats
         user_stats, _ = UserStatistics.objects.get_or_create(user=instance.user)
@@ -182,16 +166,122 @@ def handle_user_attempt_save(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Question)
 def handle_question_save(sender, instance, created, **kwargs):
     """
-    Update PlatformStats when question becomes public.
+    Count the question's creation and status changes for PlatformStats.
     """
-    if instance.status == "PUBLIC":
-        # This is a broad hammer, likely we want to increment a counter rather than recount everything.
-        # For low traffic, recounting is fine.
-        # PlatformStats.refresh_stats() might be expensive.
-        # Better to schedule it or increment a specific field if PlatformStats has one.
-        # The TODO said "Update PlatformStats".
-        pass
+    PlatformCounter.record_question(instance, created=created)
 
     if created and instance.created_by:
         # Notify contributor if auto-published?
         pass
+
+
+@receiver(post_save, sender=MockTestQuestion)
+@receiver(post_delete, sender=MockTestQuestion)
+def invalidate_paper_on_test_question_change(sender, instance, **kwargs):
+    """
+    Rebuild the compiled paper when a test's question list changes.
+    """
+    MockTest.bump_paper_version([instance.mock_test_id])
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def invalidate_paper_on_question_change(sender, instance, **kwargs):
+    """
+    Rebuild the compiled papers of every test that includes the question.
+    """
+    question_id = instance.id if sender is Question else instance.question_id
+    MockTest.invalidate_papers_for_question(question_id)
+
+
+@receiver(post_save, sender=Question)
+def sync_question_pool_on_save(sender, instance, **kwargs):
+    """
+    Keep the cached public question pools in step with status changes.
+    """
+    instance.sync_public_pool()
+
+
+@receiver(post_delete, sender=Question)
+def sync_question_pool_on_delete(sender, instance, **kwargs):
+    instance.sync_public_pool(deleted=True)
+
+
+@receiver(post_migrate)
+def create_question_search_index(sender, using, **kwargs):
+    """
+    Create the full-text search structures once the tables exist.
+    """
+    if sender.name == "src":
+        ensure_search_index(using)
+
+
+@receiver(post_save, sender=Question)
+def index_question_on_save(sender, instance, using, **kwargs):
+    index_question(instance, using)
+
+
+@receiver(post_delete, sender=Question)
+def remove_question_from_index(sender, instance, using, **kwargs):
+    remove_question(instance.id, using)
+
+
+@receiver(post_save, sender=Question)
+def index_question_signature(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the near-duplicate signature in step with the question text.
+    """
+    text_fields = {"question_text_en", "question_text_np"}
+    if update_fields is None or text_fields & set(update_fields):
+        QuestionSignature.index(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def sync_xp_rank_on_save(sender, instance, **kwargs):
+    """
+    Keep the live XP board in step with experience points and activity.
+    """
+    instance.sync_xp_rank()
+
+
+@receiver(post_delete, sender=UserProfile)
+def sync_xp_rank_on_delete(sender, instance, **kwargs):
+    instance.sync_xp_rank(deleted=True)
+
+
+@receiver(post_save, sender=AppSettings)
+def reset_leaderboard_calendar(sender, instance, **kwargs):
+    """
+    Pick up a changed leaderboard calendar or BS month table at once.
+    """
+    if instance.setting_key in (CALENDAR_SETTING, BS_MONTH_STARTS_SETTING):
+        cache.delete(CALENDAR_CACHE_KEY)
+
+
+@receiver(post_delete, sender=Question)
+def count_question_on_delete(sender, instance, **kwargs):
+    PlatformCounter.record_question(instance, deleted=True)
+
+
+@receiver(post_delete, sender=UserAttempt)
+def count_attempt_on_delete(sender, instance, **kwargs):
+    # Deleted answers are left to PlatformCounter.reconcile
+    PlatformCounter.increment(PlatformCounter.ATTEMPTS, -1)
+
+
+@receiver(post_save, sender=PlatformStats)
+def invalidate_public_stats(sender, instance, **kwargs):
+    cache.delete(PUBLIC_STATS_CACHE_KEY)
+
+
+@receiver(post_save, sender=UserStatistics)
+@receiver(post_save, sender=UserAttempt)
+@receiver(post_delete, sender=UserAttempt)
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_user_summary(sender, instance, **kwargs):
+    """
+    Rebuild the user's /me/summary on the next read.
+    """
+    UserSummary.invalidate([instance.user_id])
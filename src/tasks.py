@@ -1,7 +1,18 @@
 from django.core.management import call_command
 
 from celery import shared_task
-from src.models import Branch, DailyActivity, LeaderBoard, PlatformStats
+from src.exports import export_and_notify
+from src.models import (
+    ActivityBitmap,
+    ActivityRollup,
+    AnswerStatsEvent,
+    DailyActivity,
+    LeaderBoard,
+    Notification,
+    PlatformCounter,
+    PlatformStats,
+    UserProgress,
+)
 
 
 @shared_task
@@ -12,6 +23,22 @@ def update_platform_stats():
     PlatformStats.scheduled_update()
 
 
+@shared_task
+def reconcile_platform_counters():
+    """
+    Recount platform counters from the source tables to correct drift
+    """
+    return PlatformCounter.reconcile()
+
+
+@shared_task
+def process_answer_events():
+    """
+    Apply queued answer stats deltas in aggregated batches
+    """
+    return AnswerStatsEvent.process_pending()
+
+
 @shared_task
 def create_daily_activity():
     """
@@ -20,6 +47,30 @@ def create_daily_activity():
     DailyActivity.record_today_activity()
 
 
+@shared_task
+def update_activity_rollups():
+    """
+    Fold activity since the high-water mark into the dashboard rollups
+    """
+    return ActivityRollup.process_pending()
+
+
+@shared_task
+def export_dashboard_csv(name, params, user_id):
+    """
+    Write a dashboard export as gzip CSV to storage and notify the requester
+    """
+    return export_and_notify(name, params, user_id)
+
+
+@shared_task
+def push_notifications(notification_ids):
+    """
+    Push bulk-created notifications to connected clients
+    """
+    return Notification.push_many(notification_ids)
+
+
 @shared_task
 def update_user_streaks():
     """
@@ -28,18 +79,37 @@ def update_user_streaks():
     call_command("update_user_streaks")
 
 
+@shared_task
+def recompute_mastery():
+    """
+    Rebuild per-category mastery scores and weak topics from answer history
+    """
+    return UserProgress.recompute_mastery()
+
+
 @shared_task
 def recalculate_rankings():
     """
-    Heavy task: Recalculate leaderboards
+    Heavy task: Recalculate weekly and monthly leaderboards of every active
+    branch and sub-branch in one pass
+    """
+    return LeaderBoard.recalculate_all(["WEEKLY", "MONTHLY"])
+
+
+@shared_task
+def refresh_leaderboard_ranks():
+    """
+    Re-rank leaderboards that received new scores since the last run
+    """
+    return LeaderBoard.refresh_dirty_rankings()
+
+
+@shared_task
+def archive_leaderboards():
     """
-    # Recalculate for active branches
-    branches = Branch.objects.filter(is_active=True)
-    for branch in branches:
-        # Weekly
-        LeaderBoard.recalculate_rankings("WEEKLY", branch=branch)
-        # Monthly - could schedule separately or check date, but OK to run weekly too if acceptable
-        LeaderBoard.recalculate_rankings("MONTHLY", branch=branch)
+    Freeze leaderboards of periods that have just closed
+    """
+    return LeaderBoard.archive_closed_periods()
 
 
 @shared_task
@@ -55,16 +125,14 @@ def monthly_maintenance():
     """
     Perform monthly maintenance tasks:
     - Reset stats
-    - Archive leaderboards
+    - Archive closed leaderboard periods
     - Generate shoutout lists
     """
     # 1. Reset Monthly Counters (PlatformStats)
     PlatformStats.objects.first().reset_monthly_stats()
 
-    # 2. Archive Leaderboards (Example logic: Copy to history table or just rely on 'time_period' logic)
-    # Since existing logic uses time_period specific entries, current month becomes 'past' implicitly
-    # when recalculate_rankings is called for the new month.
-    # But we might want to clean up old 'WEEKLY' entries?
+    # 2. Archive Leaderboards of closed periods (also runs daily on its own)
+    LeaderBoard.archive_closed_periods()
 
     # 3. Generate Shoutout List (Log for now)
     # top_contributors = Contribution.get_top_contributors(...)
@@ -85,5 +153,4 @@ def check_streak_notifications():
     """
     Daily check to notify users whose streaks are about to break
     """
-    # Placeholder for notification service
-    pass
+    return ActivityBitmap.notify_at_risk()
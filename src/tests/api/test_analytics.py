@@ -30,3 +30,20 @@ class AnalyticsApiTests(APITestCase):
         self.client.force_authenticate(user=self.admin)
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_activity_rollups_series(self):
+        url = reverse("dailyactivity-rollups")
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(url, {"start": "2025-01-01", "end": "2025-12-31"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # A year fits the default daily granularity
+        self.assertEqual(response.data["granularity"], "DAY")
+        self.assertEqual(response.data["results"], [])
+
+        response = self.client.get(
+            url, {"start": "2020-01-01", "end": "2025-12-31", "granularity": "HOUR"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
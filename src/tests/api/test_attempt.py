@@ -1,17 +1,29 @@
+from datetime import timedelta
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from src.models.attempt_answer import (
+    AnswerStatsEvent,
+    AttemptResult,
+    UserAnswer,
+    UserAttempt,
+)
 from src.models.branch import Branch, Category
 from src.models.mocktest import MockTest, MockTestQuestion
 from src.models.question_answer import Answer, Question
+from src.models.user_stats import ActivityBitmap, UserProgress, UserStatistics
 
 
 class AttemptApiTests(APITestCase):
     def setUp(self):
+        # Session state is cached per attempt id, which the test DB reuses
+        cache.clear()
         self.email = f"test_{uuid4().hex[:8]}@example.com"
         self.user = User.objects.create_user(
             username="testuser", password="password", email=self.email
@@ -80,3 +92,265 @@ class AttemptApiTests(APITestCase):
             float(response.data["score_obtained"]), 2.0
         )  # 2 marks for correct answer
         self.assertEqual(response.data["status"], "COMPLETED")
+        self.assertEqual(
+            response.data["category_breakdown"],
+            [
+                {
+                    "category_id": self.category.id,
+                    "questions": 1,
+                    "attempted": 1,
+                    "correct": 1,
+                    "score": 2.0,
+                    "total": 2.0,
+                    "percentage": 100.0,
+                }
+            ],
+        )
+
+    def test_scoring_runs_single_query(self):
+        attempt = UserAttempt.objects.create(
+            user=self.user, mock_test=self.mock_test, total_score=0
+        )
+        UserAnswer.objects.create(
+            user_attempt=attempt,
+            question=self.question,
+            selected_answer=self.wrong_ans,
+        )
+        with self.assertNumQueries(1):
+            result = attempt.score_attempt()
+        self.assertEqual(result["total_score"], 2)
+        self.assertEqual(result["score_obtained"], 0)
+        self.assertEqual(result["attempted"], 1)
+
+    def test_batch_submit_answers(self):
+        attempt_id = self.test_start_attempt()
+        question2 = Question.objects.create(
+            question_text_en="Q2", category=self.category, status="PUBLIC"
+        )
+        wrong2 = Answer.objects.create(
+            question=question2, answer_text_en="Wrong", display_order=1
+        )
+        MockTestQuestion.objects.create(
+            mock_test=self.mock_test, question=question2, question_order=2
+        )
+
+        url = reverse("attempt-submit-answers-batch", args=[attempt_id])
+        payload = {
+            "answers": [
+                {"question": self.question.id, "selected_answer": self.wrong_ans.id},
+                {"question": question2.id, "selected_answer": wrong2.id},
+            ]
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["saved"], 2)
+
+        # Changing an answer updates the row without counting a new attempt
+        payload = {
+            "answers": [
+                {"question": self.question.id, "selected_answer": self.correct_ans.id}
+            ]
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Stats side effects are deferred to the answer event log
+        AnswerStatsEvent.process_pending()
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.times_attempted, 1)
+        self.assertEqual(self.question.times_correct, 1)
+        stats = UserStatistics.objects.get(user=self.user)
+        self.assertEqual(stats.questions_answered, 2)
+        self.assertEqual(stats.correct_answers, 1)
+        progress = UserProgress.objects.get(user=self.user, category=self.category)
+        self.assertEqual(progress.questions_attempted, 2)
+        self.assertEqual(progress.correct_answers, 1)
+
+    def test_batch_submit_records_activity(self):
+        """Bulk-created answers mark the day active like single saves do"""
+        attempt_id = self.test_start_attempt()
+        # Forget the activity the attempt itself recorded
+        ActivityBitmap.objects.all().delete()
+        UserStatistics.objects.filter(user=self.user).update(
+            study_streak_days=0, last_activity_date=None
+        )
+        cache.clear()
+
+        url = reverse("attempt-submit-answers-batch", args=[attempt_id])
+        payload = {
+            "answers": [
+                {"question": self.question.id, "selected_answer": self.wrong_ans.id}
+            ]
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        today = timezone.localdate()
+        self.assertIn(self.user.id, ActivityBitmap.active_user_ids(today))
+        stats = UserStatistics.objects.get(user=self.user)
+        self.assertEqual(stats.study_streak_days, 1)
+        self.assertEqual(stats.last_activity_date, today)
+
+    def test_batch_rejects_foreign_answer(self):
+        attempt_id = self.test_start_attempt()
+        question2 = Question.objects.create(
+            question_text_en="Q2", category=self.category, status="PUBLIC"
+        )
+        MockTestQuestion.objects.create(
+            mock_test=self.mock_test, question=question2, question_order=2
+        )
+        url = reverse("attempt-submit-answers-batch", args=[attempt_id])
+        payload = {
+            "answers": [
+                {"question": question2.id, "selected_answer": self.correct_ans.id}
+            ]
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserAnswer.objects.filter(question=question2).exists())
+
+    def test_batch_rejects_question_outside_test(self):
+        attempt_id = self.test_start_attempt()
+        question2 = Question.objects.create(
+            question_text_en="Q2", category=self.category, status="PUBLIC"
+        )
+        answer2 = Answer.objects.create(
+            question=question2, answer_text_en="A", is_correct=True
+        )
+        url = reverse("attempt-submit-answers-batch", args=[attempt_id])
+        payload = {
+            "answers": [{"question": question2.id, "selected_answer": answer2.id}]
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(UserAnswer.objects.filter(question=question2).exists())
+
+        # Practice attempts may still answer any question
+        practice = UserAttempt.objects.create(
+            user=self.user, mode="PRACTICE", total_score=0
+        )
+        url = reverse("attempt-submit-answers-batch", args=[practice.id])
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_results_served_from_snapshot(self):
+        attempt = UserAttempt.objects.create(
+            user=self.user, mock_test=self.mock_test, total_score=0
+        )
+        UserAnswer.objects.create(
+            user_attempt=attempt,
+            question=self.question,
+            selected_answer=self.wrong_ans,
+            time_taken_seconds=12,
+        )
+        attempt.complete_attempt()
+        self.assertTrue(AttemptResult.objects.filter(attempt=attempt).exists())
+
+        url = reverse("attempt-get-results", args=[attempt.id])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        answer = response.data["user_answers"][0]
+        self.assertEqual(answer["selected_answer"], self.wrong_ans.id)
+        self.assertEqual(answer["correct_answer"], self.correct_ans.id)
+        self.assertFalse(answer["is_correct"])
+        self.assertEqual(answer["time_taken_seconds"], 12)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(reverse("attempt-get-results", args=["abc"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_session_autosave_and_resume(self):
+        MockTest.objects.filter(id=self.mock_test.id).update(duration_minutes=60)
+        attempt_id = self.test_start_attempt()
+        url = reverse("attempt-session", args=[attempt_id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["current_index"], 0)
+        self.assertIsNotNone(response.data["time_remaining"])
+
+        # A heartbeat on a warm session is served from the cache alone
+        with self.assertNumQueries(0):
+            response = self.client.patch(
+                url,
+                {
+                    "current_index": 1,
+                    "marked": [self.question.id],
+                    "drafts": {str(self.question.id): self.correct_ans.id},
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["pending_writes"], 1)
+        self.assertFalse(UserAnswer.objects.filter(user_attempt_id=attempt_id).exists())
+
+        # Resuming elsewhere sees the same state
+        response = self.client.get(url)
+        self.assertEqual(response.data["current_index"], 1)
+        self.assertEqual(response.data["marked"], [self.question.id])
+
+        # Pending drafts are flushed when the attempt is submitted
+        self.client.post(reverse("attempt-submit-attempt", args=[attempt_id]))
+        answer = UserAnswer.objects.get(user_attempt_id=attempt_id)
+        self.assertTrue(answer.is_correct)
+        self.assertTrue(answer.is_marked_for_review)
+        self.assertEqual(UserAttempt.objects.get(id=attempt_id).score_obtained, 2)
+        self.assertIsNone(UserAttempt.get_cached_session(attempt_id))
+
+    def test_session_rejects_invalid_and_late_drafts(self):
+        MockTest.objects.filter(id=self.mock_test.id).update(duration_minutes=60)
+        attempt_id = self.test_start_attempt()
+        url = reverse("attempt-session", args=[attempt_id])
+        other = Question.objects.create(
+            question_text_en="Q2", category=self.category, status="PUBLIC"
+        )
+
+        # Questions outside the test are refused before they reach the cache
+        response = self.client.patch(
+            url, {"drafts": {str(other.id): None}}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(
+            url,
+            {"drafts": {str(self.question.id): self.correct_ans.id}},
+            format="json",
+        )
+        self.assertEqual(response.data["pending_writes"], 1)
+
+        # A stale invalid draft does not hold back the valid ones at submit
+        state = UserAttempt.get_cached_session(attempt_id)
+        state["drafts"][other.id] = self.correct_ans.id
+        state["dirty"].add(other.id)
+        cache.set(UserAttempt.session_cache_key(attempt_id), state)
+        response = self.client.post(
+            reverse("attempt-submit-attempt", args=[attempt_id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(
+                UserAnswer.objects.filter(user_attempt_id=attempt_id).values_list(
+                    "question_id", flat=True
+                )
+            ),
+            [self.question.id],
+        )
+
+        # A heartbeat racing the submit cannot revive the session
+        cache.set(UserAttempt.session_cache_key(attempt_id), state)
+        response = self.client.patch(url, {"current_index": 2}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Past the deadline drafts are no longer accepted
+        attempt_id = self.test_start_attempt()
+        UserAttempt.objects.filter(id=attempt_id).update(
+            start_time=timezone.now() - timedelta(hours=2)
+        )
+        response = self.client.patch(
+            reverse("attempt-session", args=[attempt_id]),
+            {"drafts": {str(self.question.id): self.wrong_ans.id}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,17 +1,22 @@
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from src.models.attempt_answer import UserAnswer, UserAttempt
 from src.models.branch import Branch, Category
 from src.models.mocktest import MockTest
-from src.models.question_answer import Question
+from src.models.question_answer import Answer, Question
 
 
 class MockTestApiTests(APITestCase):
     def setUp(self):
+        # Question pools and papers are cached by ids the test DB reuses
+        cache.clear()
         self.email = f"user_{uuid4().hex[:8]}@example.com"
         self.user = User.objects.create_user(
             username="user", password="password", email=self.email
@@ -60,3 +65,140 @@ class MockTestApiTests(APITestCase):
         self.assertEqual(test.test_questions.count(), 3)
         self.assertEqual(test.created_by, self.user)
         self.assertFalse(test.is_public)  # Generated should be private
+
+    def test_paper_strips_answers_and_supports_etag(self):
+        test = MockTest.objects.create(
+            title_en="Paper Test",
+            branch=self.branch,
+            total_questions=3,
+            is_public=True,
+        )
+        test.generate_from_categories({self.category.id: 3})
+        question = test.test_questions.first().question
+        answer = Answer.objects.create(
+            question=question, answer_text_en="A", is_correct=True, display_order=1
+        )
+
+        url = reverse("mocktest-paper", args=[test.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["questions"]), 3)
+        paper_question = next(
+            q["question"]
+            for q in response.data["questions"]
+            if q["question"]["id"] == question.id
+        )
+        self.assertNotIn("is_correct", paper_question["answers"][0])
+        self.assertNotIn("explanation_en", paper_question)
+
+        # Served from cache and revalidated by ETag
+        etag = response["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Editing an answer invalidates the compiled paper
+        answer.answer_text_en = "B"
+        answer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        paper_question = next(
+            q["question"]
+            for q in response.data["questions"]
+            if q["question"]["id"] == question.id
+        )
+        self.assertEqual(paper_question["answers"][0]["answer_text_en"], "B")
+
+        # So does editing the test itself, even from a stale instance
+        etag = response["ETag"]
+        test.title_en = "Renamed"
+        test.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title_en"], "Renamed")
+        test.refresh_from_db()
+        self.assertEqual(response.data["version"], test.paper_version)
+
+    def test_question_pool_follows_publication(self):
+        pool = Question.get_public_pool(self.category.id)
+        self.assertEqual(len(pool["UNRATED"]), 5)
+
+        draft = Question.objects.create(
+            question_text_en="Draft", category=self.category, created_by=self.user
+        )
+        draft.status = "PUBLIC"
+        draft.save()
+        self.assertIn(draft.id, Question.get_public_pool(self.category.id)["UNRATED"])
+
+        draft = Question.objects.get(id=draft.id)
+        draft.status = "PRIVATE"
+        draft.save()
+        self.assertNotIn(
+            draft.id, Question.get_public_pool(self.category.id)["UNRATED"]
+        )
+
+        # A rolled-back publish leaves no trace in the pool
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                draft.status = "PUBLIC"
+                draft.save()
+                raise RuntimeError
+        self.assertNotIn(
+            draft.id, Question.get_public_pool(self.category.id)["UNRATED"]
+        )
+
+        # A pool left stale by a lost update never hands out private questions
+        stale = Question.objects.filter(category=self.category, status="PUBLIC")
+        hidden = list(stale.values_list("id", flat=True)[:2])
+        Question.objects.filter(id__in=hidden).update(status="PRIVATE")
+        picked = Question.sample_public(self.category.id, 5)
+        self.assertEqual(len(picked), 3)
+        self.assertFalse(set(hidden) & set(picked))
+
+        Question.set_status_many(
+            Question.objects.filter(category=self.category), "DRAFT", is_public=False
+        )
+        self.assertEqual(Question.get_public_pool(self.category.id), {})
+
+    def test_generate_weighted_and_excludes_recent(self):
+        hard = [
+            Question.objects.create(
+                question_text_en=f"H{i}",
+                category=self.category,
+                status="PUBLIC",
+                difficulty_level="HARD",
+            )
+            for i in range(3)
+        ]
+        ids = Question.sample_public(
+            self.category.id, 3, difficulty_weights={"HARD": 1}
+        )
+        self.assertEqual(set(ids), {q.id for q in hard})
+
+        # Questions the user answered recently are avoided on request
+        attempt = UserAttempt.objects.create(
+            user=self.user, mode="PRACTICE", total_score=0
+        )
+        seen = list(
+            Question.objects.filter(category=self.category, difficulty_level=None)[:4]
+        )
+        for question in seen:
+            UserAnswer.objects.create(user_attempt=attempt, question=question)
+
+        url = reverse("mocktest-generate")
+        payload = {
+            "title_en": "Fresh Test",
+            "branch_id": self.branch.id,
+            "category_distribution": {str(self.category.id): 4},
+            "exclude_recent": True,
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        chosen = set(
+            MockTest.objects.get(id=response.data["id"]).test_questions.values_list(
+                "question_id", flat=True
+            )
+        )
+        self.assertEqual(len(chosen), 4)
+        self.assertFalse(chosen & {q.id for q in seen})
@@ -1,13 +1,18 @@
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from src.models.platform_stats import PlatformStats
+
 
 class PlatformStatsTests(APITestCase):
     def setUp(self):
+        # The public payload is cached under a fixed key
+        cache.clear()
         self.email = f"admin_{uuid4().hex[:8]}@example.com"
         self.user = User.objects.create_superuser(
             username="admin", password="password", email=self.email
@@ -19,3 +24,24 @@ class PlatformStatsTests(APITestCase):
         url = reverse("platform-stats-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_platform_stats_conditional_requests(self):
+        url = reverse("platform-stats-list")
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertIn("max-age=300", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            )
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A refresh saves the stats and drops the cached payload
+        PlatformStats.scheduled_update()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from src.models.attempt_answer import UserAnswer, UserAttempt
+from src.models.branch import Category
+from src.models.question_answer import Question
+from src.models.user_stats import UserProgress
+
+
+class PracticeFeedTests(APITestCase):
+    def setUp(self):
+        # Practice and question pools are cached by ids the test DB reuses
+        cache.clear()
+        self.email = f"user_{uuid4().hex[:8]}@example.com"
+        self.user = User.objects.create_user(
+            username="user", password="password", email=self.email
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.weak = Category.objects.create(
+            name_en="Weak", slug="weak", scope_type="UNIVERSAL"
+        )
+        self.strong = Category.objects.create(
+            name_en="Strong", slug="strong", scope_type="UNIVERSAL"
+        )
+        self.questions = {
+            category.id: [
+                Question.objects.create(
+                    question_text_en=f"{category.name_en} {i}",
+                    category=category,
+                    status="PUBLIC",
+                )
+                for i in range(10)
+            ]
+            for category in (self.weak, self.strong)
+        }
+        UserProgress.objects.create(
+            user=self.user,
+            category=self.weak,
+            questions_attempted=20,
+            correct_answers=4,
+            accuracy_percentage=20,
+            weak_topics=["Weak"],
+        )
+        UserProgress.objects.create(
+            user=self.user,
+            category=self.strong,
+            questions_attempted=20,
+            correct_answers=19,
+            accuracy_percentage=95,
+        )
+
+    def test_next_skips_answered_and_never_repeats(self):
+        attempt = UserAttempt.objects.create(
+            user=self.user, mode="PRACTICE", total_score=0
+        )
+        answered = self.questions[self.weak.id][0]
+        UserAnswer.objects.create(user_attempt=attempt, question=answered)
+
+        url = reverse("practice-next")
+        response = self.client.get(url, {"size": 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = [q["id"] for q in response.data["results"]]
+        self.assertEqual(len(first), 5)
+        self.assertEqual(response.data["remaining"], 14)
+
+        # Later calls pop from the cached pool: one query plus the answers
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"size": 5})
+        second = [q["id"] for q in response.data["results"]]
+        self.assertFalse(set(first) & set(second))
+        self.assertNotIn(answered.id, first + second)
+
+    def test_weak_categories_rank_first(self):
+        pool = UserProgress.build_practice_pool(self.user)
+        weak_ids = {q.id for q in self.questions[self.weak.id]}
+        head = pool[:10]
+        self.assertGreater(len(weak_ids & set(head)), 5)
+
+    def test_category_filter(self):
+        response = self.client.get(
+            reverse("practice-next"), {"category": self.strong.id, "size": 50}
+        )
+        self.assertEqual(
+            {q["category"] for q in response.data["results"]}, {self.strong.id}
+        )
@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
 from src.models.branch import Category
+from src.models.dedup import QuestionSignature
 from src.models.question_answer import Question
 
 
@@ -127,3 +128,70 @@ class QuestionApiTests(APITestCase):
         response = self.client.post(url)
         # Should be 404 because user can't see DRAFT/Other questions in queryset
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_ranks_and_highlights(self):
+        rivers = Question.objects.create(
+            question_text_en="Which rivers flow through the Terai?",
+            question_text_np="तराईमा कुन नदीहरू बग्छन्?",
+            category=self.category,
+            status="PUBLIC",
+        )
+        Question.objects.create(
+            question_text_en="Who wrote the national anthem?",
+            question_text_np="राष्ट्रिय गान कसले लेख्नुभयो?",
+            category=self.category,
+            status="PUBLIC",
+        )
+
+        # English is stemmed: "river" matches "rivers"
+        response = self.client.get(self.list_url, {"search": "river"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([q["id"] for q in response.data["results"]], [rivers.id])
+        self.assertIn(
+            "<mark>rivers</mark>", response.data["results"][0]["search_snippet"]
+        )
+
+        # Devanagari matches on substrings
+        for term in ("नदी", "नद"):
+            response = self.client.get(self.list_url, {"search": term})
+            self.assertEqual([q["id"] for q in response.data["results"]], [rivers.id])
+
+        # Edits are indexed on save
+        rivers.question_text_en = "Which lakes lie in the Himalaya?"
+        rivers.save()
+        response = self.client.get(self.list_url, {"search": "river"})
+        self.assertEqual(response.data["count"], 0)
+        response = self.client.get(self.list_url, {"search": "lake"})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_create_reports_near_duplicates(self):
+        original = Question.objects.create(
+            question_text_en="What is the capital city of Nepal?",
+            question_text_np="नेपालको राजधानी सहर कुन हो?",
+            category=self.category,
+            status="PUBLIC",
+        )
+        Question.objects.create(
+            question_text_en="Who is known as the father of computers?",
+            question_text_np="कम्प्युटरको पिता कसलाई भनिन्छ?",
+            category=self.category,
+            status="PUBLIC",
+        )
+
+        payload = {
+            "question_text_en": "What is the capital city of Nepal ?",
+            "question_text_np": "नेपालको राजधानी सहर कुन हो ।",
+            "category": self.category.id,
+            "explanation_en": "Kathmandu.",
+            "explanation_np": "काठमाडौं।",
+        }
+        response = self.client.post(self.list_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [d["id"] for d in response.data["possible_duplicates"]], [original.id]
+        )
+
+        pairs = QuestionSignature.find_duplicate_pairs(0.7)
+        self.assertEqual(
+            [(a, b) for a, b, _ in pairs], [(original.id, response.data["id"])]
+        )
@@ -1,11 +1,19 @@
+from unittest import mock
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
-from src.models.user_stats import UserStatistics
+from src.models.analytics import LeaderBoard, LeaderBoardArchive
+from src.models.attempt_answer import UserAttempt
+from src.models.branch import Branch
+from src.models.mocktest import MockTest
+from src.models.notification import Notification
+from src.models.user_stats import UserStatistics, UserSummary
+from src.ranking import get_ranking_backend
 
 
 class UserStatsApiTests(APITestCase):
@@ -23,3 +31,147 @@ class UserStatsApiTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(UserStatistics.objects.filter(user=self.user).exists())
+
+    def test_me_summary_is_cached_until_invalidated(self):
+        cache.clear()
+        url = reverse("me-summary")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["unread_notifications"], 0)
+        self.assertEqual(response.data["rank"], 1)
+        self.assertEqual(response.data["recent_attempts"], [])
+
+        # Served from the cache, apart from the live rank lookup
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data, response.data)
+
+        Notification.objects.create(
+            user=self.user,
+            notification_type="GENERAL",
+            title_en="Hello",
+            title_np="Hello",
+            message_en="Hello",
+            message_np="Hello",
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.data["unread_notifications"], 1)
+
+        self.client.post(reverse("notification-mark-all-as-read"))
+        self.assertEqual(self.client.get(url).data["unread_notifications"], 0)
+
+    def test_summary_invalidated_mid_read_is_not_cached(self):
+        cache.clear()
+        UserSummary.get_for_user(self.user)
+        cache.clear()
+        get_or_create = UserSummary.objects.get_or_create
+
+        def racing_get_or_create(**kwargs):
+            # A change lands after the cache miss but before the cache write
+            result = get_or_create(**kwargs)
+            UserSummary.invalidate([self.user.id])
+            return result
+
+        with mock.patch.object(
+            UserSummary.objects, "get_or_create", side_effect=racing_get_or_create
+        ):
+            UserSummary.get_for_user(self.user)
+        current = UserSummary.cache_key(
+            self.user.id, UserSummary.cache_generation(self.user.id)
+        )
+        self.assertIsNone(cache.get(current))
+
+
+class LiveLeaderBoardApiTests(APITestCase):
+    def setUp(self):
+        # Live boards are keyed by ids the test DB reuses
+        cache.clear()
+        get_ranking_backend().clear()
+        self.branch = Branch.objects.create(name_en="Branch", name_np="Branch")
+        self.mock_test = MockTest.objects.create(
+            title_en="Live Test", branch=self.branch, total_questions=1
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f"live{i}", email=f"live{i}_{uuid4().hex[:8]}@example.com"
+            )
+            for i in range(4)
+        ]
+        for user, score in zip(self.users, [40, 30, 30, 10], strict=True):
+            LeaderBoard.objects.create(
+                user=user,
+                time_period="ALL_TIME",
+                branch=self.branch,
+                rank=0,
+                total_score=score,
+                accuracy_percentage=50,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.users[3])
+
+    def ranks(self, response):
+        return [(row["user_name"], row["rank"]) for row in response.data["results"]]
+
+    def test_live_top_and_around_me(self):
+        for user in self.users:
+            user.profile.full_name = user.username
+            user.profile.save()
+
+        response = self.client.get(
+            reverse("leaderboard-live"), {"branch": self.branch.id, "limit": 3}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Tied scores share a rank
+        self.assertEqual(
+            self.ranks(response), [("live0", 1), ("live1", 2), ("live2", 2)]
+        )
+
+        # A completed attempt moves the live board without a rank refresh
+        attempt = UserAttempt.objects.create(
+            user=self.users[3],
+            mock_test=self.mock_test,
+            total_score=40,
+            score_obtained=25,
+        )
+        attempt.status = "COMPLETED"
+        attempt.save()
+
+        response = self.client.get(
+            reverse("leaderboard-around-me"), {"branch": self.branch.id, "radius": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.ranks(response), [("live0", 1), ("live3", 2), ("live1", 3)]
+        )
+
+        response = self.client.get(reverse("leaderboard-live"), {"time_period": "X"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_history_endpoints(self):
+        for period_start, rank in [("2026-08-01", 3), ("2026-09-01", 1)]:
+            LeaderBoardArchive.objects.create(
+                user=self.users[3],
+                time_period="MONTHLY",
+                period_start=period_start,
+                branch=self.branch,
+                rank=rank,
+                total_score=10,
+                tests_completed=1,
+                accuracy_percentage=50,
+            )
+
+        response = self.client.get(
+            reverse("leaderboard-history"),
+            {"branch": self.branch.id, "time_period": "MONTHLY"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Defaults to the latest archived period
+        self.assertEqual(str(response.data["period_start"]), "2026-09-01")
+        self.assertEqual([row["rank"] for row in response.data["results"]], [1])
+
+        response = self.client.get(
+            reverse("leaderboard-my-history"), {"time_period": "MONTHLY"}
+        )
+        self.assertEqual(
+            [(row["period_start"], row["rank"]) for row in response.data],
+            [("2026-09-01", 1), ("2026-08-01", 3)],
+        )
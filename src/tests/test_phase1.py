@@ -1,19 +1,38 @@
+from datetime import date, timedelta
+from unittest import mock
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
 from django.test import TestCase
 from django.utils import timezone
 
-from src.models.analytics import LeaderBoard
-from src.models.attempt_answer import UserAnswer, UserAttempt
+from src.models.analytics import (
+    ActivityRollup,
+    ActivityRollupUser,
+    Contribution,
+    DailyActivity,
+    LeaderBoard,
+    LeaderBoardArchive,
+)
+from src.models.app_settings import AppSettings
+from src.models.attempt_answer import AnswerStatsEvent, UserAnswer, UserAttempt
 from src.models.branch import Branch, Category, SubBranch
 from src.models.mocktest import MockTest, MockTestQuestion
-from src.models.platform_stats import PlatformStats
-from src.models.question_answer import Answer, Question
+from src.models.notification import Notification
+from src.models.platform_stats import PlatformCounter, PlatformStats
+from src.models.question_answer import Answer, Question, QuestionReport
+from src.models.user import UserProfile
+from src.models.user_stats import ActivityBitmap, UserProgress, UserStatistics
+from src.ranking import InMemoryRanking, RedisRanking, get_ranking_backend
 
 
 class Phase1LogicTests(TestCase):
     def setUp(self):
+        # Question pools, papers and live boards are keyed by ids the test DB reuses
+        cache.clear()
+        get_ranking_backend().clear()
         # Setup basic data
         self.email = f"test_{uuid4().hex[:8]}@example.com"
         self.user = User.objects.create_user(
@@ -64,6 +83,34 @@ class Phase1LogicTests(TestCase):
 
         self.assertEqual(self.profile.get_current_rank(), 2)
 
+    def test_xp_rank_reloads_when_other_processes_write(self):
+        """Per-process boards expire, so ranks catch up with the table"""
+        backend = InMemoryRanking(ttl=30)
+        user2 = User.objects.create_user(
+            username="user2", email=f"user2_{uuid4().hex[:8]}@example.com"
+        )
+        with mock.patch("src.models.user.get_ranking_backend", return_value=backend):
+            self.assertEqual(self.profile.get_current_rank(), 1)
+            # Another worker's save never reaches this process's board
+            UserProfile.objects.filter(pk=user2.profile.pk).update(
+                experience_points=500
+            )
+            self.assertEqual(self.profile.get_current_rank(), 1)
+            with mock.patch("src.ranking.time.monotonic", return_value=10**9):
+                self.assertEqual(self.profile.get_current_rank(), 2)
+
+    def test_redis_boards_expire_when_idle(self):
+        """Every Redis board write refreshes the board's expiry"""
+        client = mock.MagicMock()
+        pipe = client.pipeline.return_value
+        backend = RedisRanking(client, ttl=30)
+        backend.load("board", [(1, 10)])
+        backend.set_score("board", 2, 5)
+        backend.add_score("board", 1, 3)
+        self.assertEqual(
+            pipe.expire.call_args_list, [mock.call("ranking:board", 30)] * 3
+        )
+
     def test_question_logic(self):
         """Test Question methods: get_accuracy_rate"""
         question = Question.objects.create(
@@ -145,12 +192,14 @@ class Phase1LogicTests(TestCase):
             is_correct=True,
         )
 
-        # Submit Answer (should trigger signals)
+        # Submit Answer (signal queues a stats event)
         UserAnswer.objects.create(
             user_attempt=attempt, question=question, selected_answer=correct_ans
         )
+        self.assertEqual(AnswerStatsEvent.objects.count(), 1)
 
-        # Verify Question stats updated by signal
+        # Verify Question stats updated once the event log is drained
+        AnswerStatsEvent.process_pending()
         question.refresh_from_db()
         self.assertEqual(question.times_attempted, 1)
         self.assertEqual(question.times_correct, 1)
@@ -168,6 +217,36 @@ class Phase1LogicTests(TestCase):
         self.assertEqual(leaderboard_entry.total_score, 1.0)
         self.assertEqual(leaderboard_entry.tests_completed, 1)
 
+    def test_answer_change_emits_correctness_delta(self):
+        """Changing an answer queues only the correctness change"""
+        question = Question.objects.create(
+            question_text_en="Q1", category=self.category, status="PUBLIC"
+        )
+        right = Answer.objects.create(
+            question=question, answer_text_en="Right", is_correct=True
+        )
+        wrong = Answer.objects.create(
+            question=question, answer_text_en="Wrong", display_order=1
+        )
+        attempt = UserAttempt.objects.create(user=self.user, total_score=1)
+
+        answer = UserAnswer.objects.create(
+            user_attempt=attempt, question=question, selected_answer=wrong
+        )
+        answer = UserAnswer.objects.get(pk=answer.pk)
+        answer.selected_answer = right
+        answer.save()
+        # Saving again without a change must not queue anything
+        answer.save()
+
+        self.assertEqual(AnswerStatsEvent.process_pending(), 2)
+        question.refresh_from_db()
+        self.assertEqual(question.times_attempted, 1)
+        self.assertEqual(question.times_correct, 1)
+        progress = UserProgress.objects.get(user=self.user, category=self.category)
+        self.assertEqual(progress.questions_attempted, 1)
+        self.assertEqual(progress.correct_answers, 1)
+
     def test_platform_stats(self):
         """Test PlatformStats refresh"""
         PlatformStats.objects.create(
@@ -184,6 +263,428 @@ class Phase1LogicTests(TestCase):
         self.assertGreaterEqual(stats.total_questions_public, 1)
         self.assertGreaterEqual(stats.total_mock_tests_taken, 1)
 
+    def test_platform_counters(self):
+        """PlatformStats is built from event counters; reconcile fixes drift"""
+        drafts = [
+            Question.objects.create(
+                category=self.category, status="DRAFT", created_by=self.user
+            )
+            for _ in range(3)
+        ]
+        question = Question.objects.get(pk=drafts[0].pk)
+        question.status = "PUBLIC"
+        question.save()
+        Question.set_status_many(
+            Question.objects.filter(pk=drafts[1].pk), "PENDING_REVIEW", False
+        )
+        attempt = UserAttempt.objects.create(user=self.user, total_score=1)
+        UserAnswer.objects.create(user_attempt=attempt, question=question)
+        AnswerStatsEvent.process_pending()
+
+        def snapshot():
+            PlatformStats.scheduled_update()
+            stats = PlatformStats.objects.get(id=1)
+            return (
+                stats.total_questions_public,
+                stats.total_questions_pending,
+                stats.total_contributions_this_month,
+                stats.questions_added_today,
+                stats.total_mock_tests_taken,
+                stats.total_answers_submitted,
+                stats.top_contributor_this_month_id,
+                stats.most_attempted_category_id,
+            )
+
+        expected = (1, 1, 3, 3, 1, 1, self.user.id, self.category.id)
+        self.assertEqual(snapshot(), expected)
+
+        # Drift, e.g. from a bulk delete that bypassed the signals
+        PlatformCounter.objects.filter(name="attempts").update(value=7)
+        PlatformCounter.objects.filter(name__startswith="questions:").delete()
+        PlatformCounter.reconcile()
+        self.assertEqual(snapshot(), expected)
+
+    def test_daily_activity_backfill(self):
+        """Backfill writes every day in range with distinct active users"""
+        today = timezone.localdate()
+        two_days_ago = timezone.now() - timedelta(days=2)
+        question = Question.objects.create(category=self.category, status="PUBLIC")
+        old_attempt = UserAttempt.objects.create(
+            user=self.user, total_score=1, start_time=two_days_ago
+        )
+        attempt = UserAttempt.objects.create(user=self.user, total_score=1)
+        UserAnswer.objects.create(user_attempt=attempt, question=question)
+        UserAnswer.objects.create(user_attempt=old_attempt, question=question)
+
+        # One grouped query per source, plus the distinct-user queries and upsert
+        with self.assertNumQueries(8):
+            written = DailyActivity.backfill(today - timedelta(days=3), today)
+        self.assertEqual(written, 4)
+
+        rows = {a.date: a for a in DailyActivity.objects.all()}
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[today].mock_tests_taken, 1)
+        self.assertEqual(rows[today].total_answers_submitted, 2)
+        self.assertEqual(rows[today].questions_added, 1)
+        self.assertEqual(rows[today].active_users, 1)
+        past = rows[timezone.localtime(two_days_ago).date()]
+        self.assertEqual((past.mock_tests_taken, past.active_users), (1, 1))
+
+        # Re-running updates the rows in place
+        DailyActivity.backfill(today, today)
+        self.assertEqual(DailyActivity.objects.count(), 4)
+
+    def test_activity_rollups(self):
+        """Rollups fold new rows past the mark and count active users once"""
+        user2 = User.objects.create_user(
+            username="user2_roll", email=f"u2_{uuid4().hex[:8]}@e.com"
+        )
+        mt = MockTest.objects.create(
+            title_en="Rollup Test", branch=self.branch, total_questions=1
+        )
+        question = Question.objects.create(category=self.category, status="PUBLIC")
+        attempt = UserAttempt.objects.create(
+            user=self.user, mock_test=mt, total_score=1
+        )
+        UserAnswer.objects.create(user_attempt=attempt, question=question)
+        UserAttempt.objects.create(user=user2, total_score=1)
+
+        # Everything so far happened ten minutes into yesterday's noon hour
+        hour = timezone.make_aware(
+            timezone.datetime.combine(
+                timezone.localdate() - timedelta(days=1),
+                timezone.datetime.min.time(),
+            )
+        ) + timedelta(hours=12)
+        for model in (Question, UserAttempt, UserAnswer):
+            model.objects.update(created_at=hour + timedelta(minutes=10))
+
+        with mock.patch(
+            "src.models.analytics.timezone.now",
+            return_value=hour + timedelta(minutes=20),
+        ):
+            self.assertEqual(ActivityRollup.process_pending(), 1)
+
+        def total(granularity, **dimension):
+            return ActivityRollup.objects.get(
+                granularity=granularity,
+                branch=dimension.get("branch"),
+                category=dimension.get("category"),
+            )
+
+        for granularity in ("HOUR", "DAY", "WEEK", "MONTH"):
+            row = total(granularity)
+            self.assertEqual(
+                (row.attempts, row.answers, row.questions_added, row.active_users),
+                (2, 1, 1, 2),
+            )
+        by_branch = total("MONTH", branch=self.branch)
+        self.assertEqual((by_branch.attempts, by_branch.active_users), (1, 1))
+        by_category = total("DAY", category=self.category)
+        self.assertEqual((by_category.answers, by_category.questions_added), (1, 1))
+        self.assertEqual(total("HOUR").bucket_start, hour)
+
+        # A later attempt by a counted user raises attempts but not users
+        late = UserAttempt.objects.create(user=self.user, mock_test=mt, total_score=1)
+        UserAttempt.objects.filter(pk=late.pk).update(
+            created_at=hour + timedelta(minutes=40)
+        )
+        ActivityRollup.process_pending()
+        row = total("HOUR")
+        self.assertEqual((row.attempts, row.active_users), (3, 2))
+        # Rows already folded are never counted twice
+        ActivityRollup.process_pending()
+        self.assertEqual(total("MONTH").attempts, 3)
+        # Members of closed buckets are pruned
+        self.assertFalse(ActivityRollupUser.objects.filter(granularity="HOUR").exists())
+
+        series = ActivityRollup.series("HOUR", hour - timedelta(hours=1), hour)
+        self.assertEqual([r.attempts for r in series], [3])
+
+    def test_bulk_moderation(self):
+        """Bulk transitions run in a fixed number of queries"""
+        today = timezone.localdate()
+        contributions = Contribution.objects.bulk_create(
+            Contribution(
+                user=self.user,
+                question=Question.objects.create(
+                    category=self.category,
+                    question_text_en=f"Contributed {i}",
+                    created_by=self.user,
+                ),
+                contribution_month=today.month,
+                contribution_year=today.year,
+            )
+            for i in range(6)
+        )
+        selected = Contribution.objects.filter(pk__in=[c.pk for c in contributions[:4]])
+
+        # Lock and read, update, notify, invalidate summaries (plus savepoints)
+        with self.assertNumQueries(6):
+            self.assertEqual(Contribution.approve_many(selected), 4)
+        self.assertEqual(Contribution.approve_many(selected), 0)
+        notifications = Notification.objects.filter(
+            user=self.user, notification_type="CONTRIBUTION_APPROVED"
+        )
+        self.assertEqual(notifications.count(), 4)
+
+        rejected = Contribution.objects.filter(pk=contributions[4].pk)
+        self.assertEqual(Contribution.reject_many(rejected, "Unclear"), 1)
+        self.assertEqual(rejected.get().rejection_reason, "Unclear")
+
+        # A failed publish leaves the contributions approved
+        with mock.patch.object(
+            Question, "set_status_many", side_effect=RuntimeError("boom")
+        ):
+            with self.assertRaises(RuntimeError):
+                Contribution.make_public_many(Contribution.objects.all())
+        self.assertEqual(selected.filter(status="APPROVED").count(), 4)
+
+        self.assertEqual(Contribution.make_public_many(Contribution.objects.all()), 4)
+        published = Question.objects.filter(contribution_records__in=selected)
+        self.assertEqual(
+            set(published.values_list("status", "is_public")), {("PUBLIC", True)}
+        )
+        self.assertEqual(
+            PlatformCounter.get_values([PlatformCounter.status_key("PUBLIC")])[
+                PlatformCounter.status_key("PUBLIC")
+            ],
+            4,
+        )
+
+        question = contributions[0].question
+        QuestionReport.objects.bulk_create(
+            QuestionReport(question=question, reason="TYPO", description="Typo")
+            for _ in range(3)
+        )
+        self.assertEqual(
+            QuestionReport.resolve_many(
+                QuestionReport.objects.all(), self.user, "Fixed"
+            ),
+            3,
+        )
+        self.assertFalse(QuestionReport.objects.exclude(status="RESOLVED").exists())
+        self.assertEqual(
+            Notification.objects.filter(notification_type="REPORT_RESOLVED").count(),
+            3,
+        )
+
+    def test_publish_scheduled_questions(self):
+        """Scheduled questions publish in chunks with their contributions"""
+        today = timezone.localdate()
+        questions = [
+            Question.objects.create(
+                category=self.category,
+                question_text_en=f"Scheduled {i}",
+                status="PENDING_REVIEW",
+                scheduled_public_date=today - timedelta(days=i),
+            )
+            for i in range(5)
+        ]
+        later = Question.objects.create(
+            category=self.category,
+            status="PENDING_REVIEW",
+            scheduled_public_date=today + timedelta(days=1),
+        )
+        Contribution.objects.bulk_create(
+            Contribution(
+                user=self.user,
+                question=question,
+                contribution_month=today.month,
+                contribution_year=today.year,
+                status="APPROVED",
+            )
+            for question in questions[:3]
+        )
+
+        pool_key = Question.pool_cache_key(self.category.id)
+        with mock.patch("src.tasks.push_notifications.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(Question.publish_scheduled(today, chunk_size=2), 5)
+                # A pool rebuilt from pre-commit rows is dropped once committed
+                cache.set(pool_key, {})
+        self.assertIsNone(cache.get(pool_key))
+        self.assertEqual(
+            Question.objects.filter(status="PUBLIC", is_public=True).count(), 5
+        )
+        later.refresh_from_db()
+        self.assertEqual(later.status, "PENDING_REVIEW")
+        self.assertEqual(Contribution.objects.filter(status="MADE_PUBLIC").count(), 3)
+        self.assertEqual(
+            Notification.objects.filter(notification_type="QUESTION_PUBLIC").count(),
+            3,
+        )
+        # Nothing left to resume
+        self.assertEqual(Question.publish_scheduled(today), 0)
+
+    def test_award_badges_in_bulk(self):
+        """Each badge rule is one query; awards merge into existing badges"""
+        stats = []
+        for i, answered in enumerate([0, 5, 5]):
+            user = User.objects.create_user(
+                username=f"badge{i}", email=f"badge{i}_{uuid4().hex[:8]}@e.com"
+            )
+            stats.append(
+                UserStatistics.objects.create(
+                    user=user, questions_answered=answered, study_streak_days=7 * i
+                )
+            )
+        stats[2].badges_earned = {"First Step": {"date": "2025-01-01", "desc": ""}}
+        stats[2].save()
+
+        # Three rule queries, then lock, bulk_update, notify and invalidate summaries
+        with self.assertNumQueries(9):
+            awarded = UserStatistics.award_badges()
+        self.assertEqual(
+            awarded, {"First Step": 1, "Streak Master": 2, "Contributor": 0}
+        )
+        for row in stats:
+            row.refresh_from_db()
+        self.assertEqual(stats[0].badges_earned, {})
+        self.assertEqual(set(stats[1].badges_earned), {"First Step", "Streak Master"})
+        self.assertEqual(stats[2].badges_earned["First Step"]["date"], "2025-01-01")
+        self.assertEqual(
+            Notification.objects.filter(notification_type="MILESTONE").count(), 3
+        )
+        # Nothing new the second time
+        self.assertEqual(sum(UserStatistics.award_badges().values()), 0)
+
+    def test_activity_bitmap_streaks(self):
+        """Streaks come from per-day activity bits, across month boundaries"""
+        day = date(2026, 3, 2)
+        for offset in (3, 2, 1):
+            self.assertTrue(
+                ActivityBitmap.record(self.user.id, day - timedelta(days=offset))
+            )
+        # Later actions the same day are no-ops, even with a cold cache
+        self.assertFalse(ActivityBitmap.record(self.user.id, day - timedelta(days=1)))
+        cache.clear()
+        self.assertFalse(ActivityBitmap.record(self.user.id, day - timedelta(days=1)))
+        self.assertEqual(
+            dict(ActivityBitmap.objects.values_list("month", "days")),
+            {date(2026, 2, 1): (1 << 26) | (1 << 27), date(2026, 3, 1): 1},
+        )
+        stats = UserStatistics.objects.get(user=self.user)
+        self.assertEqual(stats.study_streak_days, 3)
+
+        lapsed = User.objects.create_user(
+            username="lapsed", email=f"lapsed_{uuid4().hex[:8]}@e.com"
+        )
+        UserStatistics.objects.create(
+            user=lapsed, study_streak_days=5, last_activity_date=date(2026, 2, 20)
+        )
+        stats.study_streak_days = 0
+        stats.save()
+
+        self.assertEqual(ActivityBitmap.refresh_streaks(day), (1, 1))
+        stats.refresh_from_db()
+        self.assertEqual(
+            (stats.study_streak_days, stats.longest_streak, stats.last_activity_date),
+            (3, 3, date(2026, 3, 1)),
+        )
+        self.assertEqual(UserStatistics.objects.get(user=lapsed).study_streak_days, 0)
+
+        self.assertEqual(ActivityBitmap.at_risk_user_ids(day), {self.user.id})
+        self.assertEqual(ActivityBitmap.notify_at_risk(day), 1)
+        self.assertEqual(
+            Notification.objects.get(notification_type="STREAK_ALERT").user, self.user
+        )
+
+        # Starting an attempt counts as today's activity
+        UserAttempt.objects.create(user=self.user, total_score=1)
+        self.assertIn(
+            self.user.id, ActivityBitmap.active_user_ids(timezone.localdate())
+        )
+
+        # A rolled-back action leaves no day guard behind
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                ActivityBitmap.record(self.user.id, day)
+                raise RuntimeError
+        self.assertIsNone(cache.get(f"activity_day:{self.user.id}:{day}"))
+        self.assertTrue(ActivityBitmap.record(self.user.id, day))
+
+    def test_recompute_mastery(self):
+        """Mastery decays old answers and pinpoints weak difficulty levels"""
+        attempt = UserAttempt.objects.create(user=self.user, total_score=1)
+
+        def answer(difficulty, is_correct, seconds=None):
+            question = Question.objects.create(
+                category=self.category, status="PUBLIC", difficulty_level=difficulty
+            )
+            option = Answer.objects.create(
+                question=question, answer_text_en="A", is_correct=is_correct
+            )
+            return UserAnswer.objects.create(
+                user_attempt=attempt,
+                question=question,
+                selected_answer=option,
+                time_taken_seconds=seconds,
+            )
+
+        for _ in range(6):
+            answer("EASY", True, 3)
+            answer("HARD", False, 4)
+        # Old misses on easy questions barely count any more
+        old = answer("EASY", False)
+        UserAnswer.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=365)
+        )
+
+        self.assertEqual(UserProgress.recompute_mastery(), 1)
+        progress = UserProgress.objects.get(user=self.user, category=self.category)
+        easy_score, easy_weight = progress.difficulty_mastery["EASY"]
+        hard_score, hard_weight = progress.difficulty_mastery["HARD"]
+        self.assertGreater(easy_score, 0.8)
+        self.assertLess(hard_score, 0.3)
+        self.assertAlmostEqual(easy_weight, 6, places=1)
+        self.assertAlmostEqual(progress.mastery_score, (6 + 1.5) / (12 + 3), places=2)
+        self.assertEqual(progress.weak_topics, ["Category 1 (Hard)"])
+        # The average time is left to the stats pipeline
+        self.assertIsNone(progress.average_time_seconds)
+        self.assertIsNotNone(progress.mastery_updated_at)
+
+    def test_leaderboard_incremental_updates(self):
+        """Completed attempts fold into every board and re-rank in bulk"""
+        user2 = User.objects.create_user(
+            username="user2_inc", email=f"u2_{uuid4().hex[:8]}@e.com"
+        )
+        mt = MockTest.objects.create(
+            title_en="Inc Test",
+            branch=self.branch,
+            sub_branch=self.sub_branch,
+            total_questions=1,
+        )
+
+        def complete(user, score):
+            attempt = UserAttempt.objects.create(
+                user=user, mock_test=mt, total_score=20, score_obtained=score
+            )
+            attempt.status = "COMPLETED"
+            attempt.save()
+            return attempt
+
+        complete(self.user, 10)
+        complete(user2, 15)
+        # Branch-wide and sub-branch boards for each period
+        self.assertEqual(LeaderBoard.objects.filter(user=self.user).count(), 6)
+        self.assertEqual(LeaderBoard.refresh_dirty_rankings(), 6)
+
+        board = {"time_period": "WEEKLY", "branch": self.branch, "sub_branch": None}
+        self.assertEqual(LeaderBoard.objects.get(user=user2, **board).rank, 1)
+
+        attempt = complete(self.user, 10)
+        # Saving a completed attempt again must not count it twice
+        attempt.save()
+        LeaderBoard.refresh_dirty_rankings()
+
+        entry = LeaderBoard.objects.get(user=self.user, **board)
+        self.assertEqual(entry.total_score, 20)
+        self.assertEqual(entry.tests_completed, 2)
+        self.assertEqual((entry.rank, entry.previous_rank), (1, 2))
+        self.assertEqual(LeaderBoard.objects.get(user=user2, **board).rank, 2)
+        self.assertEqual(LeaderBoard.refresh_dirty_rankings(), 0)
+
     def test_leaderboard_recalculation(self):
         """Test LeaderBoard.recalculate_rankings"""
         # Create 2 users with attempts
@@ -230,3 +731,127 @@ class Phase1LogicTests(TestCase):
 
         self.assertEqual(lb2.rank, 1)  # Higher score
         self.assertEqual(lb1.rank, 2)
+
+    def test_leaderboard_single_pass_recalculation(self):
+        """recalculate_all builds branch-wide and sub-branch boards together"""
+        user2 = User.objects.create_user(
+            username="user2_all", email=f"u2_{uuid4().hex[:8]}@e.com"
+        )
+        branch_test = MockTest.objects.create(
+            title_en="Branch Test", branch=self.branch, total_questions=1
+        )
+        sub_test = MockTest.objects.create(
+            title_en="Sub Test",
+            branch=self.branch,
+            sub_branch=self.sub_branch,
+            total_questions=1,
+        )
+        for user, mock_test, score, percentage in [
+            (self.user, branch_test, 10, 50),
+            (self.user, sub_test, 4, 20),
+            (user2, sub_test, 12, 60),
+        ]:
+            UserAttempt.objects.create(
+                user=user,
+                mock_test=mock_test,
+                status="COMPLETED",
+                score_obtained=score,
+                percentage=percentage,
+                total_score=20,
+            )
+        # Left over from an attempt that no longer counts
+        stale_user = User.objects.create_user(
+            username="stale", email=f"s_{uuid4().hex[:8]}@e.com"
+        )
+        LeaderBoard.objects.create(
+            user=stale_user,
+            time_period="MONTHLY",
+            period_start=LeaderBoard.current_period_start("MONTHLY"),
+            branch=self.branch,
+            rank=1,
+            total_score=99,
+            accuracy_percentage=0,
+        )
+
+        result = LeaderBoard.recalculate_all(["WEEKLY", "MONTHLY"])
+
+        self.assertEqual(result["boards"], 4)
+        self.assertEqual(result["deleted"], 1)
+        self.assertEqual(
+            set(result["timings"]), {"aggregate", "load", "write", "rerank", "live"}
+        )
+        wide = LeaderBoard.objects.get(
+            user=self.user, time_period="WEEKLY", branch=self.branch, sub_branch=None
+        )
+        self.assertEqual(
+            (wide.total_score, wide.tests_completed, wide.accuracy_percentage),
+            (14, 2, 35),
+        )
+        self.assertEqual(wide.rank, 1)
+        sub = LeaderBoard.objects.get(
+            user=self.user, time_period="WEEKLY", sub_branch=self.sub_branch
+        )
+        self.assertEqual((sub.total_score, sub.rank), (4, 2))
+        self.assertFalse(LeaderBoard.objects.filter(user=stale_user).exists())
+        self.assertFalse(LeaderBoard.objects.filter(time_period="ALL_TIME").exists())
+
+    def test_leaderboard_calendar_periods(self):
+        """Weeks start on Sunday; months follow AD or the configured BS table"""
+        wednesday = date(2026, 10, 14)
+        self.assertEqual(
+            LeaderBoard.period_bounds("WEEKLY", wednesday),
+            (date(2026, 10, 11), date(2026, 10, 18)),
+        )
+        self.assertEqual(
+            LeaderBoard.period_bounds("MONTHLY", wednesday),
+            (date(2026, 10, 1), date(2026, 11, 1)),
+        )
+        self.assertIsNone(LeaderBoard.period_bounds("ALL_TIME", wednesday))
+
+        AppSettings.set_setting("leaderboard_calendar", "BS")
+        AppSettings.set_setting(
+            "bs_month_starts", '["2026-09-17", "2026-10-17", "2026-11-16"]'
+        )
+        self.assertEqual(
+            LeaderBoard.period_bounds("MONTHLY", date(2026, 10, 20)),
+            (date(2026, 10, 17), date(2026, 11, 16)),
+        )
+        # Outside the configured table the AD month is used
+        with self.assertLogs("src.models.analytics", "WARNING"):
+            bounds = LeaderBoard.period_bounds("MONTHLY", date(2026, 12, 5))
+        self.assertEqual(bounds, (date(2026, 12, 1), date(2027, 1, 1)))
+
+    def test_leaderboard_archive_closed_periods(self):
+        """Closed periods are ranked, frozen into the archive and removed"""
+        user2 = User.objects.create_user(
+            username="user2_arc", email=f"u2_{uuid4().hex[:8]}@e.com"
+        )
+        current = LeaderBoard.current_period_start("MONTHLY")
+        last_month = (current - timedelta(days=1)).replace(day=1)
+        for user, score, start in [
+            (self.user, 10, last_month),
+            (user2, 30, last_month),
+            (self.user, 5, current),
+        ]:
+            LeaderBoard.objects.create(
+                user=user,
+                time_period="MONTHLY",
+                period_start=start,
+                branch=self.branch,
+                rank=0,
+                total_score=score,
+                accuracy_percentage=50,
+            )
+
+        self.assertEqual(LeaderBoard.archive_closed_periods(), 1)
+        self.assertEqual(LeaderBoard.archive_closed_periods(), 0)
+
+        archived = LeaderBoardArchive.objects.get(user=self.user)
+        self.assertEqual((archived.period_start, archived.rank), (last_month, 2))
+        self.assertEqual(LeaderBoardArchive.objects.get(user=user2).rank, 1)
+        self.assertEqual(
+            list(LeaderBoard.objects.values_list("period_start", flat=True)),
+            [current],
+        )
+        with self.assertRaises(ValueError):
+            archived.save()
@@ -37,3 +37,68 @@ class ScheduledTasksTests(TestCase):
         # Verify
         stats = PlatformStats.objects.first()
         self.assertEqual(stats.total_contributions_this_month, 0)
+
+    def test_dashboard_export_job(self):
+        """Background exports write gzip CSV to storage and notify the user"""
+        import gzip
+        import tempfile
+
+        from django.contrib.auth.models import User
+        from django.test import override_settings
+        from django.urls import reverse
+
+        from src.exports import export_path, export_storage
+        from src.models import Category, Notification, Question
+        from src.tasks import export_dashboard_csv
+
+        staff = User.objects.create_user(
+            username="staff", email="staff@example.com", is_staff=True
+        )
+        other = User.objects.create_user(
+            username="other", email="other@example.com", is_staff=True
+        )
+        category = Category.objects.create(name_en="Cat", name_np="Cat")
+        Question.objects.create(
+            category=category, question_text_en="Q1", status="PUBLIC"
+        )
+        Question.objects.create(category=category, question_text_en="Q2")
+
+        with tempfile.TemporaryDirectory() as root:
+            with override_settings(EXPORTS_ROOT=root):
+                filename = export_dashboard_csv(
+                    "questions", {"status": "PUBLIC"}, staff.id
+                )
+                with export_storage().open(export_path(staff.id, filename)) as stored:
+                    lines = gzip.decompress(stored.read()).decode().splitlines()
+
+                url = reverse("dashboard:download_export", args=[filename])
+                # Only the requester can download it
+                self.client.force_login(other)
+                self.assertEqual(self.client.get(url).status_code, 404)
+                self.client.force_login(staff)
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    gzip.decompress(b"".join(response.streaming_content))
+                    .decode()
+                    .splitlines(),
+                    lines,
+                )
+                response.close()
+
+                # Bad filters are refused before any CSV is sent
+                stream_url = reverse("dashboard:export_questions")
+                response = self.client.get(stream_url, {"category": "abc"})
+                self.assertEqual(response.status_code, 400)
+                response = self.client.get(stream_url, {"category": category.id})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    len(b"".join(response.streaming_content).splitlines()), 3
+                )
+
+        self.assertTrue(filename.endswith(".csv.gz"))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("ID,Question (EN)"))
+        self.assertIn("Q1", lines[1])
+        notification = Notification.objects.get(user=staff)
+        self.assertEqual(notification.action_url, url)